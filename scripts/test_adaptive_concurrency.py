@@ -0,0 +1,185 @@
+"""
+Tests for the AIMD record concurrency controller (run from the project root: python -m pytest scripts)
+"""
+
+import asyncio
+from uuid import uuid4
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from src.adaptive_concurrency import AdaptiveConcurrencyController
+
+
+class OverloadedError(Exception):
+    pass
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _controller(clock, **kwargs) -> AdaptiveConcurrencyController:
+    return AdaptiveConcurrencyController(clock=clock, **kwargs)
+
+
+async def _complete(controller, records: int):
+    for _ in range(records):
+        async with controller.slot():
+            pass
+
+
+def test_limit_grows_by_one_per_window_of_clean_records(clock):
+    controller = _controller(clock, initial=2, max_limit=10)
+
+    limits = []
+    for _ in range(6):
+        asyncio.run(_complete(controller, 1))
+        limits.append(round(controller.limit, 3))
+
+    # +1/limit per record: one full window (the current limit's worth of records) adds about one slot
+    assert limits == [2.5, 2.9, 3.245, 3.553, 3.834, 4.095]
+    assert controller.current_limit == 4
+    assert controller.get_stats()["increases"] == 6
+
+
+def test_limit_stays_within_its_bounds(clock):
+    controller = _controller(clock, initial=4, min_limit=2, max_limit=4)
+
+    asyncio.run(_complete(controller, 5))
+    assert controller.limit == 4
+
+    for _ in range(3):
+        controller.record_error(OverloadedError())
+        clock.advance(11)
+    assert controller.limit == 2
+    assert controller.decreases["error"] == 3
+
+
+def test_congestion_halves_the_limit_once_per_cooldown(clock):
+    controller = _controller(clock, initial=8, cooldown=10)
+
+    controller.record_error(OverloadedError())
+    controller.record_error(OverloadedError())
+    assert controller.current_limit == 4
+
+    clock.advance(9.9)
+    controller.record_error(type("RateLimitError", (Exception,), {})())
+    assert controller.current_limit == 4
+
+    clock.advance(0.1)
+    controller.record_error(type("HTTPError", (Exception,), {"status_code": 529})())
+    assert controller.current_limit == 2
+    assert controller.decreases == {"error": 2, "latency": 0}
+
+
+def test_other_errors_do_not_change_the_limit(clock):
+    controller = _controller(clock, initial=8)
+
+    controller.record_error(ValueError("bad prompt"))
+    controller.record_error(type("HTTPError", (Exception,), {"status_code": 400})())
+
+    assert controller.current_limit == 8
+
+
+def test_records_running_during_a_decrease_do_not_grow_the_limit(clock):
+    controller = _controller(clock, initial=8)
+
+    async def run():
+        async with controller.slot():
+            clock.advance(1)
+            controller.record_error(OverloadedError())
+        clock.advance(1)
+        async with controller.slot():
+            pass
+
+    asyncio.run(run())
+
+    assert controller.limit == 4 + 1 / 4
+    assert controller.increases == 1
+
+
+def test_latency_spikes_count_after_a_baseline(clock):
+    controller = _controller(clock, initial=8, latency_spike_factor=3)
+
+    controller.record_latency("gpt-4.1", 1.0)
+    controller.record_latency("gpt-4.1", 5.0)  # Too few samples for a spike
+    assert controller.current_limit == 8
+    for _ in range(4):
+        controller.record_latency("gpt-4.1", 1.0)
+    baseline = controller.baseline_latency["gpt-4.1"]
+
+    controller.record_latency("o4-mini", 20.0)  # Other models have their own baseline
+    controller.record_latency("gpt-4.1", 3 * baseline + 0.1)
+
+    assert controller.current_limit == 4
+    assert controller.decreases == {"error": 0, "latency": 1}
+    assert controller.baseline_latency["gpt-4.1"] == baseline
+
+
+def test_callback_measures_latency_on_the_clock(clock):
+    controller = _controller(clock, initial=8)
+    callback = controller.callback_handler()
+    cached = LLMResult(generations=[[ChatGeneration(message=AIMessage(content="ok"), generation_info={"cache_hit": True})]])
+    fresh = LLMResult(generations=[[ChatGeneration(message=AIMessage(content="ok"))]])
+
+    for response, seconds in ((fresh, 2.0), (cached, 0.0), (fresh, 4.0)):
+        run_id = uuid4()
+        callback.on_chat_model_start({}, [], run_id=run_id, metadata={"ls_model_name": "gpt-4.1"})
+        clock.advance(seconds)
+        callback.on_llm_end(response, run_id=run_id)
+
+    assert controller.latency_samples == {"gpt-4.1": 2}
+    assert controller.baseline_latency == {"gpt-4.1": pytest.approx(2.2)}
+
+    run_id = uuid4()
+    callback.on_llm_start({}, [], run_id=run_id)
+    callback.on_llm_error(OverloadedError(), run_id=run_id)
+    assert controller.current_limit == 4
+
+
+def test_slots_never_exceed_the_current_limit(clock):
+    controller = _controller(clock, initial=3, max_limit=3)
+    entries = []  # (in flight, limit, after the decrease) when a record got its slot
+
+    async def record(index):
+        async with controller.slot():
+            entries.append((controller.in_flight, controller.current_limit, controller.decreases["error"] > 0))
+            await asyncio.sleep(0.01)
+            clock.advance(1)
+            if index == 2:
+                controller.record_error(OverloadedError())  # 3 -> 1.5 while records 0-2 are in flight
+
+    async def run():
+        await asyncio.gather(*(record(index) for index in range(12)))
+
+    asyncio.run(run())
+
+    assert all(in_flight <= limit for in_flight, limit, _ in entries)
+    assert max(in_flight for in_flight, _, decreased in entries if not decreased) == 3
+    # The first record admitted after the decrease runs alone; records finishing cleanly then grow the limit again
+    after = [(in_flight, limit) for in_flight, limit, decreased in entries if decreased]
+    assert after[0] == (1, 1)
+    assert after[-1][1] == 3
+    assert controller.in_flight == 0
+    assert controller.status() == "concurrency 0/3 (min 1, max 3)"
+
+
+def test_invalid_bounds_are_rejected():
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyController(min_limit=0)
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyController(min_limit=5, max_limit=4)
@@ -0,0 +1,42 @@
+"""
+Tests for the structured analysis tools (run from the project root: python -m pytest scripts)
+"""
+
+import re
+
+import pandas as pd
+import pytest
+
+from src.data_tools.analysis_tools import find_duplicates
+
+pa = pytest.importorskip("pyarrow")
+
+TEXTS = ["蔡英文論文是假的！", "蔡英文 論文 是真的", "論文門 真相"]
+
+
+def _groups(result: str) -> dict:
+    """example -> count of the rows of a find_duplicates table"""
+    rows = (re.match(r"\d+\s+(\d+)\s+(.*?)\s+\d+$", line) for line in result.splitlines()[2:])
+    return {row.group(2): int(row.group(1)) for row in rows}
+
+
+@pytest.mark.parametrize("dtype", [pd.ArrowDtype(pa.string()), "str", object])
+def test_cjk_duplicates_are_grouped_by_text(dtype):
+    df = pd.DataFrame({
+        "text": pd.Series([TEXTS[i % 3] for i in range(1500)], dtype=dtype),
+        "author": [f"user{i % 10}" for i in range(1500)],
+    })
+
+    result = find_duplicates(df, "text", by="author")
+
+    assert result.startswith("1500 texts, 3 duplicate groups with >= 2 rows covering 1500 rows")
+    assert _groups(result) == {text: 500 for text in TEXTS}
+
+
+def test_normalisation_ignores_width_case_spacing_and_punctuation():
+    df = pd.DataFrame({"text": pd.Series(["蔡英文 論文是假的!", "蔡英文  論文是假的！", "ＦＡＫＥ， News", "fake news"],
+                                         dtype=pd.ArrowDtype(pa.string()))})
+
+    result = find_duplicates(df, "text")
+
+    assert result.startswith("4 texts, 2 duplicate groups with >= 2 rows covering 4 rows")
@@ -0,0 +1,101 @@
+"""
+Tests for the JSONL checkpoint store and --continue-from (run from the project root: python -m pytest scripts)
+"""
+
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+
+from src.config import ModelConfig
+from src.excel_processing.checkpoint import CheckpointStore, checkpoint_path_for
+from src.excel_processing.processor import CoVeEvaluator
+
+
+def _result(iteration, assessment="UNVERIFIED"):
+    return {"iteration": iteration, "evidence_count": 1, "final_assessment": assessment}
+
+
+def test_load_keeps_the_last_entry_per_iteration(tmp_path):
+    checkpoint = CheckpointStore(str(tmp_path / "run.jsonl"))
+    checkpoint.extend([_result(1, "first"), _result(2), _result(1, "narrated"), {"note": "no iteration"}])
+
+    records = checkpoint.load()
+
+    assert records == [_result(1, "narrated"), _result(2), {"note": "no iteration"}]
+
+
+def test_values_are_stored_as_plain_json(tmp_path):
+    checkpoint = CheckpointStore(str(tmp_path / "run.jsonl"))
+    checkpoint.append({"iteration": np.int64(7), "final_assessment": AIMessage(content="VERIFIED")})
+
+    assert checkpoint.load() == [{"iteration": 7, "final_assessment": "VERIFIED"}]
+
+
+def test_torn_final_line_is_ignored_and_appends_continue_after_it(tmp_path):
+    checkpoint = CheckpointStore(str(tmp_path / "run.jsonl"))
+    checkpoint.extend([_result(1), _result(2)])
+    with open(checkpoint.path, "a", encoding="utf-8") as file:
+        file.write('{"iteration": 3, "final_assess')  # Killed mid-write
+
+    assert checkpoint.load() == [_result(1), _result(2)]
+
+    # A resumed run appends the record again; it must not be glued onto the torn line
+    resumed = CheckpointStore(checkpoint.path)
+    resumed.append(_result(3))
+    assert resumed.load() == [_result(1), _result(2), _result(3)]
+
+
+@pytest.fixture
+def evaluator(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    data_path = tmp_path / "processed.xlsx"
+    pd.DataFrame({"iteration": [1, 2, 3, 4], "found_evidence": ["a", "b", "c", "d"]}).to_excel(data_path, index=False)
+    model_config = ModelConfig(
+        verification_question_model=FakeListChatModel(responses=["{}"]),
+        react_model=FakeListChatModel(responses=["done"]),
+        final_assessment_model=FakeListChatModel(responses=["{}"]),
+        aggregation_model=FakeListChatModel(responses=["{}"]),
+    )
+    evaluator = CoVeEvaluator(str(data_path), model_config, output_dir=str(tmp_path / "results"))
+    evaluator.evaluated = []
+
+    async def evaluate_record(row):
+        evaluator.evaluated.append(int(row["iteration"]))
+        return _result(int(row["iteration"]), "resumed")
+
+    evaluator.evaluate_record = evaluate_record
+    return evaluator
+
+
+def test_continue_from_checkpoint_only_evaluates_missing_records(tmp_path, evaluator):
+    previous = CheckpointStore(str(tmp_path / "results" / "cove_results_20250101_120000.jsonl"))
+    previous.extend([_result(1), _result(2)])
+    with open(previous.path, "a", encoding="utf-8") as file:
+        file.write('{"iteration": 3')
+
+    results_df = asyncio.run(evaluator.evaluate_data(continue_from=previous.path))
+
+    assert sorted(evaluator.evaluated) == [3, 4]
+    assert evaluator.checkpoint.path == previous.path
+    assert evaluator.results_file == previous.path.replace(".jsonl", ".xlsx")
+    assert sorted(results_df["iteration"]) == [1, 2, 3, 4]
+    report = pd.read_excel(evaluator.results_file).set_index("iteration")
+    assert report["final_assessment"].to_dict() == {1: "UNVERIFIED", 2: "UNVERIFIED", 3: "resumed", 4: "resumed"}
+
+
+def test_continue_from_excel_report_seeds_a_checkpoint(tmp_path, evaluator):
+    report_file = tmp_path / "results" / "cove_results_20250101_120000.xlsx"
+    pd.DataFrame([_result(2), _result(4)]).to_excel(report_file, index=False)
+
+    asyncio.run(evaluator.evaluate_data(continue_from=str(report_file)))
+
+    assert sorted(evaluator.evaluated) == [1, 3]
+    assert evaluator.checkpoint.path == checkpoint_path_for(str(report_file))
+    with open(evaluator.checkpoint.path, encoding="utf-8") as file:
+        iterations = [json.loads(line)["iteration"] for line in file]
+    assert iterations[:2] == [2, 4] and sorted(iterations[2:]) == [1, 3]
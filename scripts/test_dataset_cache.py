@@ -0,0 +1,54 @@
+"""
+Tests for the memory-mapped dataset cache (run from the project root: python -m pytest scripts)
+"""
+
+import pandas as pd
+import pytest
+
+from src.data_tools import DatasetCache
+
+pa = pytest.importorskip("pyarrow")
+
+
+def _buffer_addresses(column) -> set:
+    """Addresses of the data buffers behind an Arrow-backed column"""
+    chunked = column.array.__arrow_array__() if isinstance(column, pd.Series) else column
+    return {buffer.address for chunk in chunked.chunks for buffer in chunk.buffers() if buffer is not None}
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    data_path = tmp_path / "comments.csv"
+    pd.DataFrame({
+        "author": [f"user{i % 7}" for i in range(1000)],
+        "comment": [f"蔡英文 論文 {i}" for i in range(1000)],
+        "likes": range(1000),
+    }).to_csv(data_path, index=False)
+    return str(data_path)
+
+
+def test_sessions_share_the_mapped_buffers(dataset):
+    cache = DatasetCache()
+    table = cache.load_table(dataset)
+    first = cache.load_dataframe(dataset)
+    second = cache.load_dataframe(dataset)
+
+    for name in ("author", "comment", "likes"):
+        mapped = _buffer_addresses(table.column(name))
+        assert _buffer_addresses(first[name]) == mapped
+        assert _buffer_addresses(second[name]) == mapped
+
+
+def test_session_edits_stay_private(dataset):
+    cache = DatasetCache()
+    first = cache.load_dataframe(dataset)
+    second = cache.load_dataframe(dataset)
+
+    first.loc[0, "likes"] = -1
+    first["comment"] = first["comment"].str.upper()
+    first.drop(columns=["author"], inplace=True)
+
+    assert second.loc[0, "likes"] == 0
+    assert second.loc[0, "comment"] == "蔡英文 論文 0"
+    assert "author" in second.columns
+    assert cache.load_dataframe(dataset).loc[0, "likes"] == 0
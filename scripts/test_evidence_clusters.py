@@ -0,0 +1,125 @@
+"""
+Tests for the MinHash/LSH near-duplicate evidence clusters (run from the project root: python -m pytest scripts)
+"""
+
+import random
+
+import pytest
+
+from src.evidence_clusters import EvidenceClusterIndex, MinHasher, _lsh_bands, evidence_shingles
+from src.evidence_memo import evidence_key
+
+
+CLAIM = ("根據網路流傳的說法，蔡英文於1984年取得倫敦政經學院博士學位，"
+         "但其論文在2019年前未存放於學校圖書館，引發外界質疑其學歷真偽的爭議。")
+OTHER = "The election commission confirmed that 14,464,571 votes were cast in the 2020 presidential election."
+
+
+def jaccard(first, second):
+    first, second = set(evidence_shingles(first)), set(evidence_shingles(second))
+    return len(first & second) / len(first | second)
+
+
+def mutations(text, count, seed=3):
+    """Variants of text with 0..count-1 characters replaced"""
+    rng = random.Random(seed)
+    variants = []
+    for changed in range(count):
+        chars = list(text)
+        for position in rng.sample(range(len(chars)), changed):
+            chars[position] = "字"
+        variants.append("".join(chars))
+    return variants
+
+
+def same_cluster(threshold, first, second):
+    index = EvidenceClusterIndex(threshold)
+    return index.add(first) == index.add(second)
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.8, 0.9])
+def test_lsh_bands_put_the_s_curve_midpoint_near_the_threshold(threshold):
+    bands, rows = _lsh_bands(threshold, 128)
+    assert bands * rows <= 128
+
+    def probability(similarity):
+        return 1 - (1 - similarity ** rows) ** bands
+
+    assert abs((1 / bands) ** (1 / rows) - threshold) < 0.1
+    assert probability(threshold - 0.2) < 0.1
+    assert probability(min(1.0, threshold + 0.15)) > 0.95
+
+
+def test_signature_similarity_estimates_the_shingle_jaccard():
+    hasher = MinHasher()
+    for variant in mutations(CLAIM, 12):
+        estimate = hasher.similarity(hasher.signature(CLAIM), hasher.signature(variant))
+        assert abs(estimate - jaccard(CLAIM, variant)) < 0.1
+    assert hasher.similarity(hasher.signature(CLAIM), hasher.signature(OTHER)) < 0.05
+    # Signatures depend only on the seed, so clusters are the same in every run
+    assert (MinHasher().signature(CLAIM) == hasher.signature(CLAIM)).all()
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.8, 0.9])
+def test_variants_cluster_well_above_the_threshold_and_not_well_below(threshold):
+    checked = {"above": 0, "below": 0}
+    for variant in mutations(CLAIM, 12):
+        similarity = jaccard(CLAIM, variant)
+        if similarity >= min(1.0, threshold + 0.1):
+            assert same_cluster(threshold, CLAIM, variant), similarity
+            checked["above"] += 1
+        elif similarity <= threshold - 0.2:
+            assert not same_cluster(threshold, CLAIM, variant), similarity
+            checked["below"] += 1
+    assert checked["above"] and checked["below"]
+
+
+def test_whitespace_punctuation_and_number_variants_join_one_cluster():
+    variants = [
+        CLAIM,
+        CLAIM.replace("，", "、").replace("。", ""),
+        "  " + CLAIM.replace("，", "；") + "  ",
+    ]
+    index = EvidenceClusterIndex(threshold=0.8)
+    assert index.add_all(variants + [OTHER, OTHER.replace(" ", "   ").replace(",", "")]) == 2
+    assert {index.cluster_key(variant) for variant in variants} == {"cluster-0"}
+    assert index.cluster_key(OTHER) == "cluster-1"
+    # One changed digit in a long claim keeps it well above the threshold
+    long_claim = CLAIM + "校方隨後公開口試紀錄與指導教授的信件，說明學位授予程序並無瑕疵，相關訴訟亦遭法院駁回。"
+    changed = long_claim.replace("1984", "1985")
+    assert jaccard(long_claim, changed) > 0.9
+    assert same_cluster(0.8, long_claim, changed)
+
+
+def test_threshold_one_only_merges_identical_shingles():
+    index = EvidenceClusterIndex(threshold=1.0)
+    assert index.add(CLAIM) == index.add(CLAIM.replace("，", "、"))
+    assert evidence_key(CLAIM) != evidence_key(CLAIM.replace("，", "、"))
+    # Whitespace between words is part of the shingles
+    assert index.add(CLAIM.replace("，", "， ")) != index.add(CLAIM)
+    assert index.add(CLAIM.replace("1984", "1985")) != index.add(CLAIM)
+
+
+def test_stats_count_repeats_members_and_clusters():
+    index = EvidenceClusterIndex(threshold=0.9)
+    index.add_all([CLAIM, CLAIM, " " + CLAIM, CLAIM.replace("，", "、"), OTHER])
+    # An evidence first seen by cluster_key is indexed on the fly
+    assert index.cluster_key("A claim that appears nowhere else in the evidence list") == "cluster-2"
+    stats = index.get_stats()
+    bands, rows = _lsh_bands(0.9, 128)
+    assert stats == {
+        "threshold": 0.9,
+        "bands": bands,
+        "rows": rows,
+        "evidences": 6,
+        "unique_evidences": 4,
+        "clusters": 3,
+        "multi_member_clusters": 1,
+    }
+    assert "4 unique evidences in 3 clusters, 1 with near-duplicates" in index.format_stats()
+
+
+@pytest.mark.parametrize("threshold", [0, -0.5, 1.5])
+def test_invalid_threshold_is_rejected(threshold):
+    with pytest.raises(ValueError):
+        EvidenceClusterIndex(threshold)
@@ -0,0 +1,163 @@
+"""
+Tests for the per-record evidence fan-out (run from the project root: python -m pytest scripts)
+"""
+
+import asyncio
+import json
+import time
+
+import pandas as pd
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.config import ModelConfig
+from src.data_tools import AnalysisSession, DatasetCache
+from src.osint_verification_chain import OSINTCOVEChain
+
+
+ASSESSMENT = '{"status": "UNVERIFIED", "confidence": "LOW", "reasoning": "fake", "key_findings": []}'
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    data_path = tmp_path / "comments.csv"
+    pd.DataFrame({"author": ["a", "b", "a"], "likes": [1, 2, 3]}).to_csv(data_path, index=False)
+    return str(data_path)
+
+
+def _chain(model_settings=None, **kwargs) -> OSINTCOVEChain:
+    model_config = ModelConfig(
+        verification_question_model=FakeListChatModel(responses=["{}"]),
+        react_model=FakeListChatModel(responses=["done"]),
+        final_assessment_model=FakeListChatModel(responses=[ASSESSMENT]),
+        aggregation_model=FakeListChatModel(responses=["{}"]),
+        model_settings=model_settings,
+    )
+    chain = OSINTCOVEChain(model_config=model_config, **kwargs)
+    chain.load_prompts()
+    return chain
+
+
+def test_in_process_fanout_keeps_each_session_output(dataset, capsys):
+    chain = _chain(data_path=dataset, max_concurrent_evidences=4)
+    cache = DatasetCache()
+
+    def verify(evidence_id, evidence):
+        # Stand-in for the ReAct run: analysis code executed in an in-process session
+        session = AnalysisSession(dataset, dataset_cache=cache)
+        try:
+            output = session.run(f"import time\nfor _ in range(20):\n    print({evidence!r}, len(df))\n    time.sleep(0.001)")
+        finally:
+            session.close()
+        return [f"question {evidence_id}"], f"[Evidence {evidence_id}] {output.rstrip()}"
+
+    chain._verify_evidence = verify
+    evidences = [f"evidence-{i}" for i in range(1, 9)]
+    outputs = chain.process_individual_evidences({"collected_evidence": evidences})
+
+    answers = outputs["all_verification_answers"].split("\n\n")
+    for index, (evidence, answer) in enumerate(zip(evidences, answers), 1):
+        assert answer.startswith(f"[Evidence {index}] ")
+        assert answer.split("] ", 1)[1].splitlines() == [f"{evidence} 3"] * 20
+
+    print("after the run")
+    assert "after the run" in capsys.readouterr().out
+
+
+# Early exit: evidence 2 is decisive and finishes long before the others; with two workers evidence 1 is
+# still running, evidence 3 may just have taken the freed worker and evidence 4 never starts
+EVIDENCES = ["slow", "decisive", "slow", "slow"]
+DELAYS = {"slow": 0.5, "decisive": 0.05}
+
+
+def _evidence_result(evidence_id, evidence):
+    status, confidence = ("VERIFIED", "HIGH") if evidence == "decisive" else ("UNVERIFIED", "MEDIUM")
+    assessment = json.dumps({"status": status, "confidence": confidence, "reasoning": evidence, "key_findings": []})
+    return OSINTCOVEChain.tag_evidence_result(evidence_id, [f"question about {evidence}"],
+                                              f"[Evidence {evidence_id}] answers about {evidence}", assessment)
+
+
+def _early_exit_chain(max_concurrent_evidences):
+    chain = _chain(model_settings={"aggregation": {"mode": "rule"}},
+                   max_concurrent_evidences=max_concurrent_evidences, early_exit=True)
+    started = []
+
+    def process(evidence_id, evidence):
+        started.append(evidence_id)
+        time.sleep(DELAYS[evidence])
+        return _evidence_result(evidence_id, evidence)
+
+    async def aprocess(evidence_id, evidence):
+        started.append(evidence_id)
+        try:
+            await asyncio.sleep(DELAYS[evidence])
+        except asyncio.CancelledError:
+            started.append(f"cancelled {evidence_id}")
+            raise
+        return _evidence_result(evidence_id, evidence)
+
+    chain._process_evidence = process
+    chain._aprocess_evidence = aprocess
+    return chain, started
+
+
+def _assert_tagged_in_order(outputs):
+    for key in ("all_verification_answers", "all_credibility_assessments"):
+        texts = outputs[key].split("\n\n")
+        assert [text.split("]")[0] for text in texts] == [f"[Evidence {i}" for i in range(1, len(EVIDENCES) + 1)]
+
+
+def _assert_skipped(outputs, skipped):
+    assert outputs["skipped_evidences"] == skipped
+    statuses = ["SKIPPED" if verdict.get("skipped") else verdict["status"] for verdict in outputs["evidence_verdicts"]]
+    assert statuses == ["SKIPPED" if str(i) in skipped else status
+                        for i, status in enumerate(["UNVERIFIED", "VERIFIED", "UNVERIFIED", "UNVERIFIED"], 1)]
+    for evidence_id in skipped:
+        assert f"[Evidence {evidence_id}] SKIPPED (decisive early exit: Evidence 2" in outputs["all_credibility_assessments"]
+    result = json.loads(outputs["final_verification_result"])
+    assert (result["final_result"], result["confidence"]) == ("VERIFIED", "HIGH")
+    assert [entry["status"] for entry in result["evidence_summary"]] == statuses
+
+
+def test_sequential_early_exit_stops_after_the_decisive_evidence():
+    chain, started = _early_exit_chain(max_concurrent_evidences=1)
+
+    outputs = chain.process_individual_evidences({"collected_evidence": EVIDENCES})
+
+    assert started == ["1", "2"]
+    _assert_skipped(outputs, ["3", "4"])
+    _assert_tagged_in_order(outputs)
+    assert outputs["all_verification_questions"] == ["[Evidence 1] question about slow", "[Evidence 2] question about decisive"]
+
+
+def test_parallel_early_exit_discards_running_evidences():
+    chain, started = _early_exit_chain(max_concurrent_evidences=2)
+
+    outputs = chain.process_individual_evidences({"collected_evidence": EVIDENCES})
+
+    # Evidences that were already running are not interrupted; their late results are discarded
+    assert {"1", "2"} <= set(started) <= {"1", "2", "3"}
+    _assert_skipped(outputs, ["1", "3", "4"])
+    _assert_tagged_in_order(outputs)
+
+
+def test_async_early_exit_cancels_running_evidences():
+    chain, started = _early_exit_chain(max_concurrent_evidences=2)
+
+    outputs = asyncio.run(chain.aprocess_individual_evidences({"collected_evidence": EVIDENCES}))
+
+    assert {"1", "2", "cancelled 1"} <= set(started)
+    assert set(started) - {"1", "2", "cancelled 1"} in (set(), {"3", "cancelled 3"})
+    _assert_skipped(outputs, ["1", "3", "4"])
+    _assert_tagged_in_order(outputs)
+
+
+def test_without_early_exit_every_evidence_is_verified_in_order():
+    chain, started = _early_exit_chain(max_concurrent_evidences=4)
+    chain.early_exit = False
+
+    outputs = asyncio.run(chain.aprocess_individual_evidences({"collected_evidence": EVIDENCES}))
+
+    assert sorted(started) == ["1", "2", "3", "4"]
+    assert outputs["skipped_evidences"] == []
+    _assert_tagged_in_order(outputs)
@@ -0,0 +1,160 @@
+"""
+Tests for the single-flight evidence memo (run from the project root: python -m pytest scripts)
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.evidence_memo import EvidenceMemo, evidence_key
+
+
+def test_normalised_duplicates_share_one_key():
+    assert evidence_key("  蔡英文  論文　造假 ") == evidence_key("蔡英文 論文 造假")
+    assert evidence_key("ＦＡＫＥ News") == evidence_key("fake news")
+    assert evidence_key("fake news") != evidence_key("fake  new")
+    assert EvidenceMemo.count_unique(["a b", "A  B", "c"]) == (3, 2)
+
+
+def test_concurrent_threads_verify_an_evidence_once():
+    memo = EvidenceMemo()
+    calls = []
+    started = threading.Event()
+
+    def verify():
+        calls.append(threading.current_thread().name)
+        started.set()
+        time.sleep(0.1)
+        return ("1", "verified")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        owner = executor.submit(memo.get_or_compute, "Evidence A", verify)
+        started.wait()
+        followers = [executor.submit(memo.get_or_compute, " evidence   a ", verify) for _ in range(7)]
+        outcomes = [owner.result()] + [future.result() for future in followers]
+
+    assert len(calls) == 1
+    assert outcomes == [("1", "verified")] * 8
+    assert memo.get_stats() == {"lookups": 8, "unique_verified": 1, "reused": 7, "dedup_ratio": 0.875}
+    assert memo.get_or_compute("EVIDENCE A", verify) == ("1", "verified")
+    assert len(calls) == 1
+
+
+def test_failed_owner_hands_the_verification_to_a_follower():
+    memo = EvidenceMemo()
+    started = threading.Event()
+    follower_waiting = threading.Event()
+    calls = []
+
+    def failing():
+        calls.append("owner")
+        started.set()
+        follower_waiting.wait(5)
+        raise RuntimeError("ReAct run failed")
+
+    def verify():
+        calls.append("follower")
+        return ("2", "verified by the follower")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        owner = executor.submit(memo.get_or_compute, "evidence", failing)
+        started.wait()
+        key, outcome, pending = memo.begin("evidence", count=False)
+        assert (outcome, pending is not None) == (None, True)
+        follower = executor.submit(memo.get_or_compute, "evidence", verify)
+        time.sleep(0.05)
+        follower_waiting.set()
+
+        with pytest.raises(RuntimeError):
+            owner.result()
+        assert follower.result() == ("2", "verified by the follower")
+
+    assert calls == ["owner", "follower"]
+    assert memo.outcomes == {key: ("2", "verified by the follower")}
+    # A failure is not memoised: the follower's fresh verification is not counted as a reuse
+    assert memo.get_stats()["reused"] == 0
+
+
+def test_async_tasks_follow_the_owner():
+    memo = EvidenceMemo()
+    calls = []
+
+    async def verify():
+        calls.append("verify")
+        await asyncio.sleep(0.05)
+        return ("1", "verified")
+
+    async def run():
+        return await asyncio.gather(*(memo.aget_or_compute("evidence", verify) for _ in range(5)))
+
+    assert asyncio.run(run()) == [("1", "verified")] * 5
+    assert calls == ["verify"]
+    assert memo.get_stats()["reused"] == 4
+
+
+def test_cancelled_owner_is_replaced_by_a_follower():
+    memo = EvidenceMemo()
+    calls = []
+
+    async def verify(name, delay):
+        calls.append(name)
+        await asyncio.sleep(delay)
+        return (name, "verified")
+
+    async def run():
+        owner = asyncio.ensure_future(memo.aget_or_compute("evidence", lambda: verify("owner", 10)))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(memo.aget_or_compute("evidence", lambda: verify("follower", 0.01)))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        return await follower
+
+    assert asyncio.run(run()) == ("follower", "verified")
+    assert calls == ["owner", "follower"]
+    assert list(memo.outcomes.values()) == [("follower", "verified")]
+    assert memo._pending == {}
+
+
+def test_cancelled_follower_does_not_cancel_the_owner():
+    memo = EvidenceMemo()
+
+    async def verify():
+        await asyncio.sleep(0.05)
+        return ("1", "verified")
+
+    async def run():
+        owner = asyncio.ensure_future(memo.aget_or_compute("evidence", verify))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(memo.aget_or_compute("evidence", verify))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await owner
+
+    assert asyncio.run(run()) == ("1", "verified")
+    assert memo.get_stats()["unique_verified"] == 1
+
+
+def test_async_follower_waits_for_a_thread_owner():
+    memo = EvidenceMemo()
+    started = threading.Event()
+
+    def verify():
+        started.set()
+        time.sleep(0.1)
+        return ("1", "verified in a thread")
+
+    async def follow():
+        return await memo.aget_or_compute("evidence", pytest.fail)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        owner = executor.submit(memo.get_or_compute, "evidence", verify)
+        started.wait()
+        assert asyncio.run(follow()) == ("1", "verified in a thread")
+        assert owner.result() == ("1", "verified in a thread")
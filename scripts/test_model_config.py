@@ -0,0 +1,31 @@
+"""
+Tests for the stage model configuration (run from the project root: python -m pytest scripts)
+"""
+
+import pytest
+
+from src.config import ModelConfig
+
+
+@pytest.fixture(autouse=True)
+def api_keys(monkeypatch):
+    for provider in ModelConfig.MODEL_PROVIDERS.values():
+        monkeypatch.setenv(provider["api_key_env"], "test-key")
+
+
+def test_provider_clients_leave_retries_to_the_gateway():
+    model_config = ModelConfig(model_settings={
+        "react": {
+            "model_provider": "anthropic",
+            "model_name": "claude-3-5-haiku-20241022",
+            "fallbacks": [
+                {"model_provider": "google", "model_name": "gemini-2.0-flash"},
+                {"model_provider": "xai", "model_name": "grok-3-mini"},
+            ],
+        },
+    })
+
+    models = list(model_config._all_models())
+    assert {settings["model_provider"] for _, settings, _ in models} == {"openai", "anthropic", "google", "xai"}
+    for model_type, settings, model in models:
+        assert model.max_retries == 0, ModelConfig.model_label(settings)
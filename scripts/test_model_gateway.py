@@ -0,0 +1,211 @@
+"""
+Tests for the model gateway's retries, failover, circuit breakers and hedging (run from the project root: python -m pytest scripts)
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_openai import ChatOpenAI
+
+from src.model_gateway import CircuitBreakerRegistry, HedgePolicy, ModelGateway, RetryPolicy
+
+
+class ServiceUnavailable(Exception):
+    status_code = 503
+
+
+class FakeModel(BaseChatModel):
+    """Chat model failing its first `failures` calls with HTTP 503 (all of them when failures < 0)"""
+
+    answer: str = "ok"
+    failures: int = 0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        if self.failures < 0 or self.calls <= self.failures:
+            raise ServiceUnavailable("busy")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+
+class SlowModel(BaseChatModel):
+    """Async chat model answering after `delay` seconds; records calls that were cancelled while waiting"""
+
+    answer: str = "ok"
+    delay: float = 0.0
+    calls: int = 0
+    cancelled: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-slow"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        raise NotImplementedError
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+
+def _gateway(primary, fallbacks=(), max_retries=2, hedging=None) -> ModelGateway:
+    return ModelGateway.wrap(primary, stage="test", policy=RetryPolicy(max_retries=max_retries, base_delay=0),
+                             name="primary", fallbacks=list(fallbacks),
+                             breakers=CircuitBreakerRegistry(failure_threshold=3, reset_timeout=60),
+                             hedging=hedging)
+
+
+def _hedging(max_rate=1.0, samples=100, latency=0.01) -> HedgePolicy:
+    """Policy whose trigger is already known: `latency` seconds, the p50 of `samples` recorded calls"""
+    policy = HedgePolicy("test", percentile=50, max_rate=max_rate, min_samples=samples, window=1000, min_delay=0)
+    for _ in range(samples):
+        policy.record_latency(latency)
+    return policy
+
+
+def test_failing_primary_fails_over_and_opens_its_breaker():
+    primary = FakeModel(failures=-1)
+    fallback = FakeModel(answer="from fallback")
+    gateway = _gateway(primary, [("fallback", fallback)])
+
+    answers = [gateway.invoke("hi").content for _ in range(5)]
+
+    assert answers == ["from fallback"] * 5
+    # Three failed attempts open the primary's circuit; later calls go straight to the fallback
+    assert primary.calls == 3
+    assert gateway.candidates[0].breaker.state == "open"
+    assert gateway.candidates[0].breaker.trips == 1
+    assert gateway.stats.to_dict() == {
+        "calls": 5, "retries": 0, "exhausted": 0, "failovers": 3, "backoff_time": 0.0,
+        "errors": {"ServiceUnavailable": 3}, "served_by": {"fallback": 5},
+    }
+
+
+def test_retries_are_counted_per_round_until_exhausted():
+    primary = FakeModel(failures=-1)
+    fallback = FakeModel(failures=-1)
+    gateway = _gateway(primary, [("fallback", fallback)], max_retries=2)
+
+    with pytest.raises(ServiceUnavailable):
+        gateway.invoke("hi")
+
+    # One attempt per candidate and round: the first try plus max_retries retries
+    assert (primary.calls, fallback.calls) == (3, 3)
+    stats = gateway.stats.to_dict()
+    assert (stats["calls"], stats["retries"], stats["exhausted"], stats["failovers"]) == (1, 2, 1, 3)
+
+
+def test_transient_failure_is_retried_on_the_async_path():
+    primary = FakeModel(failures=1)
+    gateway = _gateway(primary)
+
+    assert asyncio.run(gateway.ainvoke("hi")).content == "ok"
+    assert primary.calls == 2
+    assert gateway.stats.retries == 1
+    assert gateway.stats.served_by == {"primary": 1}
+
+
+def test_each_gateway_attempt_is_one_http_request():
+    requests = []
+
+    def overloaded(request):
+        requests.append(request)
+        return httpx.Response(503, json={"error": {"message": "overloaded"}})
+
+    primary = ChatOpenAI(model="gpt-4.1-mini", api_key="test-key", base_url="http://openai.test/v1", max_retries=0,
+                         http_client=httpx.Client(transport=httpx.MockTransport(overloaded)))
+    gateway = _gateway(primary, max_retries=2)
+
+    with pytest.raises(Exception) as error:
+        gateway.invoke("hi")
+
+    assert getattr(error.value, "status_code", None) == 503
+    assert len(requests) == 3
+    assert gateway.stats.retries == 2
+
+
+def test_hedge_delay_is_the_latency_percentile_once_enough_samples_are_known():
+    policy = HedgePolicy("test", percentile=95, min_samples=20, window=20, min_delay=0.5)
+    for latency in range(1, 20):
+        policy.record_latency(float(latency))
+        assert policy.hedge_delay() is None
+    policy.record_latency(20.0)
+    # ceil(0.95 * 20) = 19th smallest of 1..20
+    assert policy.hedge_delay() == 19.0
+    # The window slides: the 20 most recent latencies are 0.1 and 2..20
+    policy.record_latency(0.1)
+    assert policy.hedge_delay() == 19.0
+    for _ in range(20):
+        policy.record_latency(0.1)
+    # Never earlier than min_delay
+    assert policy.hedge_delay() == 0.5
+    assert policy.calls == 22
+
+
+def test_slow_primary_is_hedged_to_the_fallback_and_cancelled():
+    primary = SlowModel(answer="from primary", delay=60)
+    fallback = SlowModel(answer="from fallback")
+    gateway = _gateway(primary, [("fallback", fallback)], hedging=_hedging())
+
+    async def main():
+        answer = await gateway.ainvoke("hi")
+        # Let the cancellation of the losing call reach it, before asyncio.run cancels leftover tasks itself
+        await asyncio.sleep(0.05)
+        return answer, (primary.calls, primary.cancelled, fallback.calls, fallback.cancelled)
+
+    answer, calls = asyncio.run(main())
+    assert answer.content == "from fallback"
+    assert calls == (1, 1, 1, 0)
+    assert gateway.hedging.to_dict() == {"percentile": 50, "max_rate": 1.0, "calls": 1, "hedges": 1, "hedge_wins": 1}
+    assert gateway.stats.served_by == {"fallback": 1}
+    # The losing call is not an error of the primary
+    assert gateway.candidates[0].breaker.state == "closed"
+    assert gateway.stats.errors == {}
+
+
+def test_fast_primary_and_too_few_samples_are_not_hedged():
+    primary = SlowModel(answer="from primary", delay=0.05)
+    fallback = SlowModel(answer="from fallback")
+
+    # Calls faster than the trigger
+    gateway = _gateway(primary, [("fallback", fallback)], hedging=_hedging(latency=5.0))
+    assert asyncio.run(gateway.ainvoke("hi")).content == "from primary"
+    # A slow call before min_samples latencies are known
+    gateway = _gateway(primary, [("fallback", fallback)],
+                       hedging=HedgePolicy("test", percentile=50, min_samples=1, min_delay=0))
+    assert asyncio.run(gateway.ainvoke("hi")).content == "from primary"
+
+    assert (primary.calls, fallback.calls) == (2, 0)
+    assert gateway.hedging.to_dict()["hedges"] == 0
+    assert len(gateway.hedging.latencies) == 1
+
+
+def test_hedge_rate_caps_the_duplicated_calls():
+    primary = SlowModel(answer="from primary", delay=0.2)
+    fallback = SlowModel(answer="from fallback")
+    gateway = _gateway(primary, [("fallback", fallback)], hedging=_hedging(max_rate=0.25))
+
+    async def main():
+        answers = [(await gateway.ainvoke("hi")).content for _ in range(8)]
+        await asyncio.sleep(0.05)
+        return answers, (primary.calls, primary.cancelled, fallback.calls)
+
+    answers, calls = asyncio.run(main())
+
+    # hedges + 1 <= 0.25 * calls first holds at the 4th and the 8th call
+    assert [index for index, answer in enumerate(answers, 1) if answer == "from fallback"] == [4, 8]
+    assert gateway.hedging.to_dict()["hedges"] == 2
+    assert calls == (8, 2, 2)
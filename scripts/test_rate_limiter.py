@@ -0,0 +1,149 @@
+"""
+Tests for the RPM/TPM token-bucket rate limiters (run from the project root: python -m pytest scripts)
+"""
+
+import asyncio
+
+import pytest
+
+from src.rate_limiter import ModelRateLimiter, RateLimiterRegistry, TokenBucket
+
+
+class FakeClock:
+    """Simulated monotonic clock whose sleeps only advance the time"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds: float):
+        self.sleep(seconds)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _limiter(clock, **kwargs) -> ModelRateLimiter:
+    return ModelRateLimiter("openai/gpt-4.1-mini", clock=clock, sleep=clock.sleep, async_sleep=clock.async_sleep, **kwargs)
+
+
+def test_bucket_refills_continuously_up_to_its_burst(clock):
+    bucket = TokenBucket(60, burst_seconds=10, clock=clock)  # 1 per second, bursts of 10
+    assert bucket.capacity == 10
+
+    bucket.consume(10)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    clock.advance(0.25)
+    assert bucket.wait_time(1) == pytest.approx(0.75)
+    # Requests larger than the burst only wait for a full bucket
+    assert bucket.wait_time(50) == pytest.approx(9.75)
+
+    clock.advance(60)
+    assert bucket.wait_time(10) == 0
+    bucket.credit(5)
+    assert bucket.tokens == 10
+
+
+def test_bucket_balance_goes_negative_on_overuse(clock):
+    bucket = TokenBucket(60, burst_seconds=10, clock=clock)
+
+    bucket.consume(15)
+
+    assert bucket.tokens == -5
+    assert bucket.wait_time(1) == pytest.approx(6.0)
+
+
+def test_requests_beyond_the_burst_wait_for_the_refill(clock):
+    limiter = _limiter(clock, rpm=60, burst_seconds=10)
+
+    assert all(limiter.acquire(blocking=False) for _ in range(10))
+    assert limiter.acquire(blocking=False) is False
+    assert clock.sleeps == []
+
+    assert limiter.acquire() is True
+    assert clock.sleeps == [pytest.approx(1.0)]
+    assert limiter.to_dict() == {"rpm": 60, "tpm": None, "requests": 11, "throttled": 1, "wait_time": 1.0, "tokens_used": 0}
+
+
+def test_token_budget_is_reconciled_with_the_reported_usage(clock):
+    limiter = _limiter(clock, tpm=6000, burst_seconds=10, initial_token_estimate=1000)  # 100 tokens per second
+
+    assert limiter.acquire(blocking=False)
+    assert limiter.acquire(blocking=False) is False
+
+    # The request used 200 of the 1000 reserved tokens: the rest is available again
+    limiter.record_usage(200)
+    assert limiter.token_estimate == pytest.approx(840)
+    assert limiter.tokens_bucket.tokens == pytest.approx(800)
+    assert limiter.acquire(blocking=False) is False
+    clock.advance(0.4)
+    assert limiter.acquire(blocking=False)
+
+    # A failed request gives its reservation back
+    limiter.refund()
+    assert limiter.tokens_bucket.tokens == pytest.approx(840)
+
+
+def test_blocking_waits_are_rechecked_every_second(clock):
+    limiter = _limiter(clock, tpm=6000, burst_seconds=10, initial_token_estimate=1000)
+    limiter.acquire()
+
+    limiter.acquire()
+
+    # 10s until 1000 tokens are back, re-checked once per second
+    assert clock.sleeps == [pytest.approx(1.0)] * 10
+    assert limiter.throttled == 1
+    assert limiter.wait_time == pytest.approx(10.0)
+
+
+def test_async_acquire_waits_with_the_async_sleep(clock):
+    limiter = _limiter(clock, rpm=15, burst_seconds=1)  # One request per 4s, no burst
+
+    async def acquire_twice():
+        return [await limiter.aacquire(), await limiter.aacquire(blocking=False), await limiter.aacquire()]
+
+    assert asyncio.run(acquire_twice()) == [True, False, True]
+    assert clock.sleeps == [1.0] * 4
+    assert limiter.requests == 2
+
+
+def test_parse_limits():
+    limits = RateLimiterRegistry.parse_limits(" openai=500/200000, anthropic/claude-3-5-haiku-20241022=50/,google=/1000000,, ")
+
+    assert limits == {
+        "openai": {"rpm": 500.0, "tpm": 200000.0},
+        "anthropic/claude-3-5-haiku-20241022": {"rpm": 50.0},
+        "google": {"tpm": 1000000.0},
+    }
+    assert RateLimiterRegistry.parse_limits("") == {}
+    assert RateLimiterRegistry.parse_limits(None) == {}
+
+
+def test_model_limits_override_provider_limits_and_defaults():
+    registry = RateLimiterRegistry(RateLimiterRegistry.parse_limits("openai=100/,openai/o4-mini=/5000"))
+
+    assert registry.resolve_limits("openai", "o4-mini", {"rpm": 500, "tpm": 200000}) == {"rpm": 100, "tpm": 5000}
+    assert registry.resolve_limits("openai", "gpt-4.1", {"rpm": 500, "tpm": 200000}) == {"rpm": 100, "tpm": 200000}
+    assert registry.resolve_limits("anthropic", "claude", None) == {}
+
+
+def test_stages_using_the_same_model_share_one_limiter():
+    registry = RateLimiterRegistry()
+
+    limiter = registry.for_model("openai", "gpt-4.1", {"rpm": 500})
+
+    assert registry.for_model("openai", "gpt-4.1") is limiter
+    assert registry.for_model("openai", "o4-mini") is not limiter
+    assert limiter.to_dict()["rpm"] == 500
@@ -0,0 +1,80 @@
+"""
+Tests for the command-line model settings of run_examples (run from the project root: python -m pytest scripts)
+"""
+
+import argparse
+import copy
+
+import pytest
+
+from src.config import ModelConfig
+from src.run_examples import build_model_settings, parse_fallbacks, parse_stages
+
+
+def _args(**overrides) -> argparse.Namespace:
+    args = dict(max_questions=3, aggregation_mode="llm", aggregation_narrative="none", no_cache_stages=[],
+                fallbacks=None, hedge=[], hedge_percentile=95, hedge_max_rate=0.1)
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+def _parse(option, value, parse=parse_stages):
+    parser = argparse.ArgumentParser()
+    parser.add_argument(option, type=parse, default="")
+    return parser.parse_args([option, value])
+
+
+def test_stage_names_are_validated(capsys):
+    assert _parse("--no-cache-stages", " react, aggregation ,").no_cache_stages == ["react", "aggregation"]
+    with pytest.raises(SystemExit):
+        _parse("--no-cache-stages", "react,agregation")
+    error = capsys.readouterr().err
+    assert "unknown stage 'agregation'" in error
+    assert "final_assessment" in error
+
+
+def test_run_settings_do_not_modify_the_class_defaults():
+    defaults = copy.deepcopy(ModelConfig.DEFAULTS)
+
+    settings = build_model_settings(_args(max_questions=7, aggregation_mode="rule", no_cache_stages=["react"]))
+
+    assert settings["verification_question"]["max_questions"] == 7
+    assert settings["aggregation"]["mode"] == "rule"
+    assert settings["react"]["cache"] is False
+    assert ModelConfig.DEFAULTS == defaults
+    # A second run (or another ModelConfig in the same process) starts from the untouched defaults
+    assert build_model_settings(_args())["verification_question"]["max_questions"] == 3
+    assert "cache" not in build_model_settings(_args())["react"]
+
+
+def test_fallback_stages_and_candidates_are_validated(capsys):
+    fallbacks = _parse("--fallbacks", "react=openai/gpt-4.1-mini, google/gemini-2.0-flash; final_assessment=xai/grok-3",
+                       parse_fallbacks).fallbacks
+    assert fallbacks == {
+        "react": [{"model_provider": "openai", "model_name": "gpt-4.1-mini"},
+                  {"model_provider": "google", "model_name": "gemini-2.0-flash"}],
+        "final_assessment": [{"model_provider": "xai", "model_name": "grok-3"}],
+    }
+    for value, message in [("final-assessment=openai/gpt-4.1-mini", "unknown stage 'final-assessment'"),
+                           ("react=gpt-4.1-mini", "invalid fallback 'gpt-4.1-mini'"),
+                           ("react=opena/gpt-4.1-mini", "invalid fallback 'opena/gpt-4.1-mini'")]:
+        with pytest.raises(SystemExit):
+            _parse("--fallbacks", value, parse_fallbacks)
+        assert message in capsys.readouterr().err
+
+    settings = build_model_settings(_args(fallbacks=fallbacks))
+    assert settings["react"]["fallbacks"] == fallbacks["react"]
+    # The class-level default list is left untouched
+    assert ModelConfig.DEFAULTS["verification_question"]["fallbacks"] == []
+
+
+def test_hedged_stages_are_validated(capsys):
+    with pytest.raises(SystemExit):
+        _parse("--hedge", "final_assesment")
+    assert "unknown stage 'final_assesment'" in capsys.readouterr().err
+
+    stages = _parse("--hedge", "final_assessment,aggregation").hedge
+    settings = build_model_settings(_args(hedge=stages, hedge_percentile=90))
+    assert settings["final_assessment"]["hedge"] == settings["aggregation"]["hedge"] == {"percentile": 90, "max_rate": 0.1}
+    assert settings["verification_question"]["hedge"] is None
+    assert "hedge" not in ModelConfig.DEFAULTS["final_assessment"]
@@ -0,0 +1,46 @@
+"""
+Tests for the in-process analysis sessions (run from the project root: python -m pytest scripts)
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from src.data_tools import AnalysisSession, DatasetCache
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    data_path = tmp_path / "comments.csv"
+    pd.DataFrame({"author": ["a", "b", "a"], "likes": [1, 2, 3]}).to_csv(data_path, index=False)
+    return str(data_path)
+
+
+def test_concurrent_sessions_get_their_own_output(dataset):
+    cache = DatasetCache()
+    sessions = [AnalysisSession(dataset, dataset_cache=cache) for _ in range(10)]
+    stdout = sys.stdout
+    code = "import time\nfor i in range(20):\n    print(TAG, len(df))\n    time.sleep(0.001)"
+
+    def run(index):
+        session = sessions[index]
+        session.start()
+        session.namespace["TAG"] = f"session-{index}"
+        return session.run(code)
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        outputs = list(executor.map(run, range(10)))
+
+    for index, output in enumerate(outputs):
+        assert output.splitlines() == [f"session-{index} 3"] * 20
+    assert sys.stdout is stdout
+
+
+def test_errors_restore_stdout(dataset):
+    stdout = sys.stdout
+    session = AnalysisSession(dataset, dataset_cache=DatasetCache())
+    assert session.run("print('before')\nraise ValueError('boom')") == "ValueError('boom')"
+    assert sys.stdout is stdout
+    assert session.run("print(df['likes'].sum())") == "6\n"
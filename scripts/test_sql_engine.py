@@ -0,0 +1,36 @@
+"""
+Tests for the read-only DuckDB query_data engine (run from the project root: python -m pytest scripts)
+"""
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("duckdb")
+
+from src.data_tools import DatasetCache
+from src.data_tools.sql_engine import SQLEngine
+
+
+@pytest.fixture
+def engine(tmp_path):
+    data_path = tmp_path / "comments.csv"
+    pd.DataFrame({"author": ["a", "b", "a"], "likes": [1, 2, 3]}).to_csv(data_path, index=False)
+    return SQLEngine(str(data_path), dataset_cache=DatasetCache())
+
+
+def test_select_queries_run(engine):
+    assert "(2 rows;" in engine.query("SELECT author, SUM(likes) FROM df GROUP BY 1;")
+    assert "(1 rows;" in engine.query("WITH t AS (SELECT * FROM df) SELECT COUNT(*) FROM t")
+
+
+@pytest.mark.parametrize("sql", [
+    "select 1; create table t as select 42 x",
+    "select 1; drop table df",
+    "create table t as select 42 x",
+    "copy (select 1) to 'out.csv'",
+    "attach 'other.db'",
+    "",
+])
+def test_everything_but_one_select_is_refused(engine, sql):
+    assert engine.query(sql).startswith("Error:")
+    assert engine.query("SELECT COUNT(*) FROM information_schema.tables WHERE table_name = 't'").splitlines()[1].strip() == "0"
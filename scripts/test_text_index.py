@@ -0,0 +1,53 @@
+"""
+Tests for the CJK-aware text index (run from the project root: python -m pytest scripts)
+"""
+
+import pandas as pd
+
+from src.data_tools import DatasetTextIndex, tokenize
+from src.data_tools.text_index import search_text
+
+
+DF = pd.DataFrame({
+    "author": ["user1", "user2", "fake_news_bot", "user1", "user3"],
+    "text": ["蔡英文 論文 是 假的", "fake thesis", "論文門 真相", "這個 影片 很 好", "Fake  Thesis!"],
+})
+
+
+def test_cjk_text_is_split_into_unigrams_and_bigrams():
+    assert tokenize("論文門") == ["論", "文", "門", "論文", "文門"]
+    assert tokenize("Fake  Thesis!") == ["fake", "thesis"]
+
+
+def test_single_column_queries():
+    index = DatasetTextIndex.from_dataframe(DF)
+    assert index.search("論文", column="text").tolist() == [0, 2]
+    assert index.search('"fake thesis"', column="text").tolist() == [1, 4]
+    assert index.search("論文 OR 影片", column="text").tolist() == [0, 2, 3]
+    assert index.search("論文 -真相", column="text").tolist() == [0]
+
+
+def test_exclusions_apply_across_columns():
+    index = DatasetTextIndex.from_dataframe(DF)
+    # "fake" is in the text of rows 1 and 4 and the author of row 2; none of them may match
+    assert index.search("NOT fake").tolist() == [0, 3]
+    assert index.search("論文 -fake").tolist() == [0]
+
+
+def test_and_terms_may_match_in_different_columns():
+    index = DatasetTextIndex.from_dataframe(DF)
+    assert index.search("user1 論文").tolist() == [0]
+    assert index.count("user1 影片") == 1
+
+
+def test_search_text_reports_rows_and_texts(tmp_path):
+    index = DatasetTextIndex.from_dataframe(DF)
+    path = str(tmp_path / "text_index.npz")
+    index.save(path)
+    loaded = DatasetTextIndex.load(path)
+    assert loaded.search("NOT fake").tolist() == [0, 3]
+
+    report = search_text(loaded, DF, "論文 -fake", by="author")
+    assert report.startswith("1 of 5 rows match")
+    assert "蔡英文 論文 是 假的" in report and "論文門" not in report
+    assert "1 distinct author" in report
@@ -0,0 +1,109 @@
+"""
+Tests for the sorted time index against brute-force pandas counts (run from the project root: python -m pytest scripts)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_tools import DatasetTimeIndex, TimeIndex
+
+
+def _timestamps(seed=7) -> pd.Series:
+    """Background timestamps over two hours, a burst of 300 within 4 seconds, exact repeats and missing values"""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2022-06-15 05:00:00")
+    background = start + pd.to_timedelta(rng.integers(0, 7200 * 1000, 700), unit="ms")
+    burst = pd.Timestamp("2022-06-15 06:15:08") + pd.to_timedelta(rng.integers(0, 4000, 300), unit="ms")
+    repeats = [pd.Timestamp("2022-06-15 05:30:00")] * 20
+    values = list(background) + list(burst) + repeats + [pd.NaT] * 5
+    return pd.Series(pd.to_datetime(values)).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+SERIES = _timestamps()
+VALID = SERIES.dropna()
+INDEX = TimeIndex(SERIES.to_numpy())
+
+
+def _brute_count(start, end) -> int:
+    return int(((VALID >= start) & (VALID < end)).sum())
+
+
+def test_range_counts_match_a_full_scan():
+    rng = np.random.default_rng(1)
+    low, high = VALID.min() - pd.Timedelta("1min"), VALID.max() + pd.Timedelta("1min")
+    span = (high - low).value
+    for _ in range(200):
+        start, end = sorted(low + pd.to_timedelta(rng.integers(0, span, 2), unit="ns"))
+        assert INDEX.count_between(start, end) == _brute_count(start, end)
+        assert INDEX.count_between(str(start), str(end)) == _brute_count(start, end)
+    # Exact timestamps on both bounds: the start is included, the end is not
+    repeat = pd.Timestamp("2022-06-15 05:30:00")
+    assert INDEX.count_between(repeat, repeat + pd.Timedelta("1ns")) == _brute_count(repeat, repeat + pd.Timedelta("1ns"))
+    assert INDEX.count_between(repeat, repeat) == 0
+    assert INDEX.count_between("2022-06-15 07:00", "2022-06-15 06:00") == 0
+    assert INDEX.count_between() == len(INDEX) == len(VALID) == 1020
+    assert len(INDEX.between("2022-06-15 06:15:08", "2022-06-15 06:15:12")) == _brute_count(
+        pd.Timestamp("2022-06-15 06:15:08"), pd.Timestamp("2022-06-15 06:15:12"))
+
+
+@pytest.mark.parametrize("unit, counts", [("s", "per_second"), ("min", "per_minute")])
+def test_per_unit_counts_match_value_counts(unit, counts):
+    expected = VALID.dt.floor(unit).value_counts().sort_index()
+    actual = getattr(INDEX, counts)
+    assert actual.index.equals(pd.DatetimeIndex(expected.index))
+    assert actual.tolist() == expected.tolist()
+    top = INDEX.top_seconds(5) if unit == "s" else INDEX.top_minutes(5)
+    assert top.tolist() == expected.sort_values(ascending=False).head(5).tolist()
+
+
+@pytest.mark.parametrize("window", ["1s", "4s", "1min", "10min"])
+def test_densest_windows_match_brute_force_counts(window):
+    width = pd.Timedelta(window)
+    windows = INDEX.densest_windows(window, top=5)
+
+    # Every reported count is the number of timestamps in [start, end)
+    assert (windows["end"] - windows["start"] == width).all()
+    for row in windows.itertuples():
+        assert row.count == _brute_count(row.start, row.end)
+
+    # Greedy choice: each window is the densest one starting at a timestamp that overlaps none chosen before it
+    starts = pd.Series(VALID.sort_values().unique())
+    brute = pd.Series([_brute_count(start, start + width) for start in starts], index=starts)
+    chosen = []
+    for row in windows.itertuples():
+        free = [start for start in brute.index
+                if all(start + width <= other or other + width <= start for other in chosen)]
+        assert row.count == brute[free].max()
+        chosen.append(row.start)
+    assert windows["count"].is_monotonic_decreasing
+
+
+def test_burst_is_the_densest_short_window():
+    windows = INDEX.densest_windows("4s", top=1)
+    assert windows["start"][0] >= pd.Timestamp("2022-06-15 06:15:08")
+    assert windows["count"][0] >= 300
+    assert TimeIndex(np.array([], dtype="datetime64[ns]")).densest_windows("4s").empty
+
+
+def test_dataset_index_parses_text_dates_and_survives_save_and_load(tmp_path):
+    df = pd.DataFrame({
+        "created": SERIES,
+        "created_text": SERIES.dt.strftime("%Y-%m-%d %H:%M:%S.%f").where(SERIES.notna()),
+        "created_utc": SERIES.dt.tz_localize("Asia/Taipei"),
+        "views": np.arange(len(SERIES)),
+        "text": ["蔡英文論文"] * len(SERIES),
+    })
+    dataset_index = DatasetTimeIndex.from_dataframe(df)
+    assert set(dataset_index.columns) == {"created", "created_text", "created_utc"}
+    for column in dataset_index.columns:
+        assert (dataset_index[column].values == INDEX.values).all()
+
+    path = str(tmp_path / "dataset.time_index.npz")
+    dataset_index.save(path)
+    loaded = DatasetTimeIndex.load(path)
+    assert loaded.columns == dataset_index.columns
+    assert loaded["created"].count_between("2022-06-15 06:15:08", "2022-06-15 06:15:12") == _brute_count(
+        pd.Timestamp("2022-06-15 06:15:08"), pd.Timestamp("2022-06-15 06:15:12"))
+    with pytest.raises(KeyError, match="views"):
+        loaded["views"]
@@ -0,0 +1,61 @@
+"""
+Tests for the verdict store configuration key (run from the project root: python -m pytest scripts)
+"""
+
+import copy
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.config import ModelConfig
+from src.osint_verification_chain import OSINTCOVEChain
+from src.verdict_store import stage_config_hash
+
+
+SETTINGS = {
+    "verification_question": {"model_provider": "openai", "model_name": "gpt-4.1-mini", "max_questions": 3},
+    "react": {"model_provider": "openai", "model_name": "gpt-4.1-mini"},
+    "final_assessment": {"model_provider": "openai", "model_name": "gpt-4.1-mini"},
+}
+PROMPTS = {"react_agent.txt": "Verify {verification_question}"}
+AGENT = {"tools": ["analyze_data", "query_data"], "dataset_profile": True}
+
+
+def test_stage_config_hash_is_stable():
+    assert stage_config_hash(SETTINGS, PROMPTS, AGENT) == stage_config_hash(copy.deepcopy(SETTINGS), dict(PROMPTS), dict(AGENT))
+
+
+def test_fallbacks_change_the_key():
+    settings = copy.deepcopy(SETTINGS)
+    settings["react"]["fallbacks"] = [{"model_provider": "google", "model_name": "gemini-2.0-flash"}]
+    assert stage_config_hash(settings, PROMPTS, AGENT) != stage_config_hash(SETTINGS, PROMPTS, AGENT)
+
+
+def test_agent_setup_changes_the_key():
+    without_sql = {**AGENT, "tools": ["analyze_data"]}
+    without_profile = {**AGENT, "dataset_profile": False}
+    keys = {stage_config_hash(SETTINGS, PROMPTS, agent) for agent in (AGENT, without_sql, without_profile)}
+    assert len(keys) == 3
+
+
+def _chain() -> OSINTCOVEChain:
+    model_config = ModelConfig(
+        verification_question_model=FakeListChatModel(responses=["{}"]),
+        react_model=FakeListChatModel(responses=["done"]),
+        final_assessment_model=FakeListChatModel(responses=["{}"]),
+        aggregation_model=FakeListChatModel(responses=["{}"]),
+    )
+    return OSINTCOVEChain(model_config=model_config)
+
+
+def test_chain_key_follows_the_react_toolset():
+    chain = _chain()
+    key = chain.verdict_config_hash()
+
+    chain._data_verification_chain().structured_tools = False
+    assert chain.verdict_config_hash() != key
+
+    chain._data_verification_chain().structured_tools = True
+    assert chain.verdict_config_hash() == key
+
+    chain._data_verification_chain().dataset_profile = False
+    assert chain.verdict_config_hash() != key
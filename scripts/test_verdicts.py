@@ -0,0 +1,110 @@
+"""
+Tests for verdict parsing and rule-based aggregation (run from the project root: python -m pytest scripts)
+"""
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.verdicts import CONFIDENCE_LEVELS, VERDICT_STATUSES, aggregate_verdicts, parse_assessment
+
+
+def _verdict(status, confidence=None, skipped=False):
+    verdict = {"status": status, "confidence": confidence, "reasoning": f"{status} reasoning", "key_findings": []}
+    if skipped:
+        verdict["skipped"] = True
+    return verdict
+
+
+@pytest.mark.parametrize("status", VERDICT_STATUSES)
+@pytest.mark.parametrize("confidence", CONFIDENCE_LEVELS)
+def test_every_label_is_parsed(status, confidence):
+    assessment = f'{{"status": "{status}", "confidence": "{confidence}", "reasoning": "r", "key_findings": ["k"]}}'
+
+    assert parse_assessment(assessment) == {"status": status, "confidence": confidence, "reasoning": "r", "key_findings": ["k"]}
+    assert parse_assessment(AIMessage(content=f"```json\n{assessment.lower()}\n```"))["status"] == status
+    assert parse_assessment(AIMessage(content=[{"type": "text", "text": assessment}]))["confidence"] == confidence
+
+
+def test_malformed_json_falls_back_to_the_labels():
+    verdict = parse_assessment('{"status": "Debunked", "confidence": "medium", reasoning: unquoted}')
+
+    assert (verdict["status"], verdict["confidence"]) == ("DEBUNKED", "MEDIUM")
+    assert verdict["reasoning"] == ""
+
+
+@pytest.mark.parametrize("assessment", [
+    None,
+    "",
+    "The evidence looks credible.",
+    '{"status": null, "confidence": null}',
+    '{"status": "PARTIALLY_VERIFIED", "confidence": "VERY HIGH"}',
+    AIMessage(content=""),
+])
+def test_unparseable_assessments_have_no_verdict(assessment):
+    verdict = parse_assessment(assessment)
+
+    assert (verdict["status"], verdict["confidence"]) == (None, None)
+
+
+def test_any_verified_evidence_decides_with_its_highest_confidence():
+    result = aggregate_verdicts(["a", "b", "c"], [
+        _verdict("DEBUNKED", "HIGH"), _verdict("VERIFIED", "LOW"), _verdict("VERIFIED", "MEDIUM"),
+    ])
+
+    assert (result["final_result"], result["confidence"]) == ("VERIFIED", "MEDIUM")
+    assert [entry["status"] for entry in result["evidence_summary"]] == ["DEBUNKED", "VERIFIED", "VERIFIED"]
+
+
+def test_verified_wins_a_tie_with_debunked():
+    result = aggregate_verdicts(["a", "b"], [_verdict("DEBUNKED", "HIGH"), _verdict("VERIFIED", "LOW")])
+
+    assert (result["final_result"], result["confidence"]) == ("VERIFIED", "LOW")
+
+
+def test_all_debunked_uses_the_lowest_confidence():
+    result = aggregate_verdicts(["a", "b"], [_verdict("DEBUNKED", "HIGH"), _verdict("DEBUNKED", "MEDIUM")])
+
+    assert (result["final_result"], result["confidence"]) == ("DEBUNKED", "MEDIUM")
+
+
+def test_debunked_and_unverified_is_unverified():
+    result = aggregate_verdicts(["a", "b"], [_verdict("DEBUNKED", "HIGH"), _verdict("UNVERIFIED", "MEDIUM")])
+
+    assert (result["final_result"], result["confidence"]) == ("UNVERIFIED", "MEDIUM")
+
+
+def test_unparsed_verdicts_count_as_unverified():
+    result = aggregate_verdicts(["a", "b"], [_verdict("DEBUNKED", "HIGH"), parse_assessment(None)])
+
+    assert (result["final_result"], result["confidence"]) == ("UNVERIFIED", "LOW")
+    assert "1 assessment(s) without a parseable verdict counted as UNVERIFIED" in result["explanation"]
+
+
+@pytest.mark.parametrize("verdicts", [
+    [],
+    [_verdict("VERIFIED", "HIGH", skipped=True)],
+    [parse_assessment(None), parse_assessment("no verdict")],
+])
+def test_insufficient_evidence_is_unverified_with_low_confidence(verdicts):
+    evidences = [f"evidence {i}" for i in range(len(verdicts))]
+
+    result = aggregate_verdicts(evidences, verdicts)
+
+    assert (result["final_result"], result["confidence"]) == ("UNVERIFIED", "LOW")
+
+
+def test_missing_confidence_of_the_deciding_evidence_is_low():
+    result = aggregate_verdicts(["a"], [_verdict("VERIFIED")])
+
+    assert (result["final_result"], result["confidence"]) == ("VERIFIED", "LOW")
+
+
+def test_skipped_evidences_are_reported_and_ignored():
+    result = aggregate_verdicts(["a", "b", "c"], [
+        _verdict("VERIFIED", "HIGH"), _verdict(None, skipped=True), _verdict(None, skipped=True),
+    ])
+
+    assert (result["final_result"], result["confidence"]) == ("VERIFIED", "HIGH")
+    assert [entry["status"] for entry in result["evidence_summary"]] == ["VERIFIED", "SKIPPED", "SKIPPED"]
+    assert result["explanation"] == ("Rule-based aggregation of 1 evidence assessments (1 VERIFIED, 0 UNVERIFIED, 0 DEBUNKED); "
+                                     "2 evidence(s) skipped by decisive early exit")
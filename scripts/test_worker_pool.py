@@ -0,0 +1,74 @@
+"""
+Tests for the REPL worker pool (run from the project root: python -m pytest scripts)
+"""
+
+import pandas as pd
+import pytest
+
+from src.data_tools import DatasetCache, REPLWorkerPool
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    data_path = tmp_path / "comments.csv"
+    pd.DataFrame({"author": ["a", "b", "a"], "likes": [1, 2, 3]}).to_csv(data_path, index=False)
+    return str(data_path)
+
+
+@pytest.fixture
+def make_pool(tmp_path):
+    pools = []
+
+    def make(data_path, **kwargs):
+        pool = REPLWorkerPool(data_path, dataset_cache=DatasetCache(str(tmp_path / "cache")), **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def test_unreadable_dataset_is_reported_by_the_sessions(tmp_path, make_pool):
+    data_path = tmp_path / "comments.parquet"
+    data_path.write_text("not a parquet file")
+    pool = make_pool(str(data_path), workers=1)
+
+    session = pool.open_session()
+
+    assert pool.load_error.startswith(f"Could not preload dataset {data_path}")
+    assert session.run("print(data_path)").startswith(f"Could not preload dataset {data_path}")
+    assert session.run("print(data_path)").endswith(f"{data_path}\n")
+    assert session.call("count_rows", {"where": None}).startswith("Could not preload dataset")
+
+
+def test_crashed_worker_reports_lost_sessions(dataset, make_pool):
+    pool = make_pool(dataset, workers=1)
+    survivor = pool.open_session()
+    crasher = pool.open_session()
+    assert survivor.run("x = len(df)\nprint(x)") == "3\n"
+
+    assert crasher.run("import os\nos._exit(1)").startswith("Error: analysis worker crashed")
+    assert pool.handles[0].restarts == 1
+
+    # The other session is told once that its variables are gone, then runs on the new worker
+    assert survivor.run("print(x)").startswith("Error: the analysis worker was restarted")
+    assert survivor.run("print(x)") == "NameError(\"name 'x' is not defined\")"
+    assert survivor.run("print(len(df))") == "3\n"
+    assert crasher.run("print(len(df))") == "3\n"
+
+
+def test_timed_out_code_restarts_the_worker(dataset, make_pool):
+    pool = make_pool(dataset, workers=1)
+    survivor = pool.open_session()
+    slow = pool.open_session()
+    assert survivor.run("x = 1") == ""
+
+    pool.timeout = 1
+    assert slow.run("import time\ntime.sleep(30)").startswith("Error: code execution exceeded 1s")
+    pool.timeout = 120
+
+    assert survivor.run("print(x)").startswith("Error: the analysis worker was restarted")
+    survivor.close()
+    assert pool.handles[0].sessions == {slow.session_id}
+    assert pool.handles[0].lost_sessions == set()
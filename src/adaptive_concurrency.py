@@ -0,0 +1,215 @@
+"""
+Adaptive (AIMD) concurrency control for record processing
+
+Instead of a fixed number of in-flight records, the limit grows additively while
+LLM calls are healthy. It is cut multiplicatively when a provider reports overload
+or rate limiting, or when call latency spikes well above its baseline. The
+signals come from a callback handler attached to every stage model, so they are
+seen even when the chain later catches the error.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+# HTTP status codes and exception names that signal provider congestion
+CONGESTION_STATUS_CODES = (429, 503, 529)
+CONGESTION_ERROR_NAMES = ("OverloadedError", "RateLimitError", "ResourceExhausted", "ServiceUnavailableError")
+
+
+def is_congestion_error(error: BaseException) -> bool:
+    """True for OverloadedError, rate-limit errors and equivalent HTTP statuses of any provider"""
+    if type(error).__name__ in CONGESTION_ERROR_NAMES:
+        return True
+    return getattr(error, "status_code", None) in CONGESTION_STATUS_CODES
+
+
+class AdaptiveConcurrencyController:
+    """
+    AIMD limit on the number of records processed at the same time
+
+    Usage:
+        controller = AdaptiveConcurrencyController(initial=5, min_limit=1, max_limit=20)
+        model_config.add_callback(controller.callback_handler())
+        async with controller.slot():
+            await process_record(...)
+        print(controller.status())
+    """
+
+    def __init__(self, initial: int = 5, min_limit: int = 1, max_limit: int = 20,
+                 increase: float = 1.0, decrease_factor: float = 0.5,
+                 latency_spike_factor: float = 3.0, cooldown: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            initial: Starting number of in-flight records
+            min_limit: Lower bound of the limit
+            max_limit: Upper bound of the limit
+            increase: Records added to the limit per limit's worth of healthy completions
+            decrease_factor: Multiplier applied to the limit on a congestion signal
+            latency_spike_factor: A call slower than this multiple of its model's baseline latency is a congestion signal
+            cooldown: Seconds after a decrease during which further signals are treated as the same event
+            clock: Monotonic time source for the cooldown and call latencies (replaced by a simulated clock in tests)
+        """
+        if min_limit < 1 or max_limit < min_limit:
+            raise ValueError(f"Invalid concurrency bounds: min={min_limit}, max={max_limit}")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_spike_factor = latency_spike_factor
+        self.cooldown = cooldown
+        self.clock = clock
+
+        self.in_flight = 0
+        self.peak_limit = self.limit
+        self.increases = 0
+        self.decreases: Dict[str, int] = {"error": 0, "latency": 0}
+        self.last_decrease = float("-inf")
+        self.baseline_latency: Dict[str, float] = {}
+        self.latency_samples: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._condition: Optional[asyncio.Condition] = None
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Created lazily so the controller can be built outside the event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self) -> float:
+        """Wait for a free slot and return the time this moment (used to attribute congestion)"""
+        condition = self._get_condition()
+        async with condition:
+            while self.in_flight >= self.current_limit:
+                try:
+                    # Signals from callback threads change the limit without notifying, so re-check periodically
+                    await asyncio.wait_for(condition.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+            self.in_flight += 1
+        return self.clock()
+
+    async def release(self, started: float):
+        """Free a slot; the limit grows if no congestion was signalled while the record ran"""
+        with self._lock:
+            if self.last_decrease < started:
+                # Additive increase: +increase once a full window of records completed cleanly
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+                if self.limit > self.peak_limit:
+                    self.peak_limit = self.limit
+                self.increases += 1
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self):
+        started = await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release(started)
+
+    def _decrease(self, reason: str) -> bool:
+        """Multiplicative decrease, at most once per cooldown period"""
+        with self._lock:
+            now = self.clock()
+            if now - self.last_decrease < self.cooldown:
+                return False
+            self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+            self.last_decrease = now
+            self.decreases[reason] += 1
+            return True
+
+    def record_error(self, error: BaseException):
+        """Feed an LLM call error; only congestion errors reduce the limit"""
+        if is_congestion_error(error):
+            if self._decrease("error"):
+                print(f"Concurrency reduced to {self.current_limit} after {type(error).__name__}")
+
+    def record_latency(self, key: str, seconds: float):
+        """Feed the latency of a successful LLM call of one model"""
+        with self._lock:
+            baseline = self.baseline_latency.get(key)
+            samples = self.latency_samples.get(key, 0) + 1
+            self.latency_samples[key] = samples
+            spike = baseline is not None and samples > 5 and seconds > self.latency_spike_factor * baseline
+            if not spike:
+                # Slow moving baseline that spikes do not inflate
+                self.baseline_latency[key] = seconds if baseline is None else 0.9 * baseline + 0.1 * seconds
+        if spike and self._decrease("latency"):
+            print(f"Concurrency reduced to {self.current_limit} after a {seconds:.1f}s {key} call "
+                  f"(baseline {baseline:.1f}s)")
+
+    def callback_handler(self) -> "AdaptiveConcurrencyCallback":
+        return AdaptiveConcurrencyCallback(self)
+
+    def status(self) -> str:
+        """Short progress string, e.g. "concurrency 6/8 (min 1, max 20)" """
+        return f"concurrency {self.in_flight}/{self.current_limit} (min {self.min_limit}, max {self.max_limit})"
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.current_limit,
+            "peak_limit": int(self.peak_limit),
+            "in_flight": self.in_flight,
+            "increases": self.increases,
+            "decreases": dict(self.decreases),
+            "baseline_latency": {key: round(value, 3) for key, value in self.baseline_latency.items()},
+        }
+
+    def format_stats(self) -> str:
+        return (
+            f"Adaptive concurrency: final limit {self.current_limit} (peak {int(self.peak_limit)}, "
+            f"bounds {self.min_limit}-{self.max_limit}), decreases on errors={self.decreases['error']}, "
+            f"on latency={self.decreases['latency']}"
+        )
+
+
+class AdaptiveConcurrencyCallback(BaseCallbackHandler):
+    """Reports LLM call latency and errors of the stage models to the controller"""
+
+    # Run in the caller's thread/event loop instead of an executor
+    run_inline = True
+
+    def __init__(self, controller: AdaptiveConcurrencyController):
+        self.controller = controller
+        self._started: Dict[UUID, tuple] = {}
+
+    def _start(self, run_id: UUID, metadata: Optional[Dict[str, Any]]):
+        key = (metadata or {}).get("ls_model_name") or "llm"
+        self._started[run_id] = (key, self.controller.clock())
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs: Any) -> None:
+        self._start(run_id, metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, metadata=None, **kwargs: Any) -> None:
+        self._start(run_id, metadata)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        generation_info = (response.generations[0][0].generation_info or {}) if response.generations and response.generations[0] else {}
+        if generation_info.get("cache_hit"):
+            return
+        key, started_at = started
+        self.controller.record_latency(key, self.controller.clock() - started_at)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started.pop(run_id, None)
+        self.controller.record_error(error)
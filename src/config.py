@@ -1,12 +1,16 @@
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.language_models import BaseLanguageModel
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_xai import ChatXAI
 
+from .llm_cache import LLMResponseCache
+from .rate_limiter import RateLimiterRegistry, RateLimitUsageCallback
+
 
 
 class ModelConfig:
@@ -19,7 +23,10 @@ class ModelConfig:
             "model_name": "gpt-4.1",
             "model_provider": "openai",  # 默認使用 OpenAI
             "temperature": 0.0,
-            "max_questions": 3  # 默認最大問題數量為 3
+            "max_questions": 3,  # 默認最大問題數量為 3
+            "max_retries": 3,  # 每次模型呼叫遇到暫時性錯誤（Overloaded、429、timeout、5xx）的重試次數
+            "fallbacks": [],  # 依序備援的模型，例如 [{"model_provider": "anthropic", "model_name": "claude-3-5-haiku-20241022"}]
+            "hedge": None  # 對沖請求，例如 {"percentile": 95, "max_rate": 0.1}：超過近期延遲 p95 時再送一個請求，最多對沖 10% 的呼叫
         },
         "react": {
             "model_name": "claude-3-5-haiku-20241022",
@@ -40,27 +47,34 @@ class ModelConfig:
             "model_provider": "openai",
             #"temperature": 0.0,
             "model_name": "o4-mini",
-            "reasoning_effort": "high"
+            "reasoning_effort": "high",
+            "mode": "llm",  # "llm": 呼叫 aggregation model；"rule": 依 prompts/aggregation.txt 規則本地計算
+            "narrative": "none"  # rule 模式下的 LLM 摘要："none"、"inline" 或 "deferred"
         }
     }
     
     # 支援的模型提供商
+    # rate_limits: 啟用 rate limiter 時每個模型的預設 RPM/TPM（保守的 tier 1 額度，請依帳號實際配額調整）
     MODEL_PROVIDERS = {
         "openai": {
             "class": ChatOpenAI,
             "api_key_env": "OPENAI_API_KEY",
+            "rate_limits": {"rpm": 500, "tpm": 200000},
         },
         "anthropic": {
             "class": ChatAnthropic,
             "api_key_env": "ANTHROPIC_API_KEY",
+            "rate_limits": {"rpm": 50, "tpm": 50000},
         },
         "google": {
             "class": ChatGoogleGenerativeAI,
             "api_key_env": "GOOGLE_API_KEY",
+            "rate_limits": {"rpm": 150, "tpm": 1000000},
         },
         "xai": {
             "class": ChatXAI,
             "api_key_env": "XAI_API_KEY",
+            "rate_limits": {"rpm": 60, "tpm": 100000},
         }
     }
     
@@ -71,7 +85,17 @@ class ModelConfig:
         final_assessment_model: BaseLanguageModel = None,
         aggregation_model: BaseLanguageModel = None,
         model_settings: Dict = None,
+        llm_cache: Optional[LLMResponseCache] = None,
+        rate_limiter: Optional[RateLimiterRegistry] = None,
     ):
+        """
+        Args:
+            verification_question_model, react_model, final_assessment_model, aggregation_model:
+                Pre-built models; missing ones are created from model_settings
+            model_settings: Per-stage settings overriding DEFAULTS
+            llm_cache: Persistent response cache shared by all stages; a stage opts out with "cache": False
+            rate_limiter: RPM/TPM limiters keyed by provider and model, acquired before every API request
+        """
         # Set default model settings if none provided
         if model_settings is None:
             model_settings = {}
@@ -89,6 +113,10 @@ class ModelConfig:
                                    None),
                 "max_questions": model_settings.get("verification_question", {}).get("max_questions", 
                                  self.DEFAULTS["verification_question"]["max_questions"]),
+                "cache": model_settings.get("verification_question", {}).get("cache", True),
+                "max_retries": model_settings.get("verification_question", {}).get("max_retries", 3),
+                "fallbacks": model_settings.get("verification_question", {}).get("fallbacks", []),
+                "hedge": model_settings.get("verification_question", {}).get("hedge"),
             },
             "react": {
                 "model_name": model_settings.get("react", {}).get("model_name", 
@@ -99,6 +127,10 @@ class ModelConfig:
                                self.DEFAULTS["react"].get("temperature", 0.0)),
                 "reasoning_effort": model_settings.get("react", {}).get("reasoning_effort", 
                                    self.DEFAULTS["react"].get("reasoning_effort")),
+                "cache": model_settings.get("react", {}).get("cache", True),
+                "max_retries": model_settings.get("react", {}).get("max_retries", 3),
+                "fallbacks": model_settings.get("react", {}).get("fallbacks", []),
+                "hedge": model_settings.get("react", {}).get("hedge"),
             },
             "final_assessment": {
                 "model_name": model_settings.get("final_assessment", {}).get("model_name", 
@@ -109,6 +141,10 @@ class ModelConfig:
                                self.DEFAULTS["final_assessment"].get("temperature", 0.0)),
                 "reasoning_effort": model_settings.get("final_assessment", {}).get("reasoning_effort", 
                                    self.DEFAULTS["final_assessment"].get("reasoning_effort")),
+                "cache": model_settings.get("final_assessment", {}).get("cache", True),
+                "max_retries": model_settings.get("final_assessment", {}).get("max_retries", 3),
+                "fallbacks": model_settings.get("final_assessment", {}).get("fallbacks", []),
+                "hedge": model_settings.get("final_assessment", {}).get("hedge"),
             },
             "aggregation": {
                 "model_name": model_settings.get("aggregation", {}).get("model_name", 
@@ -119,9 +155,22 @@ class ModelConfig:
                                self.DEFAULTS["aggregation"].get("temperature", 0.0)),
                 "reasoning_effort": model_settings.get("aggregation", {}).get("reasoning_effort", 
                                    self.DEFAULTS["aggregation"].get("reasoning_effort")),
+                "mode": model_settings.get("aggregation", {}).get("mode", 
+                        self.DEFAULTS["aggregation"].get("mode", "llm")),
+                "narrative": model_settings.get("aggregation", {}).get("narrative", 
+                             self.DEFAULTS["aggregation"].get("narrative", "none")),
+                "cache": model_settings.get("aggregation", {}).get("cache", True),
+                "max_retries": model_settings.get("aggregation", {}).get("max_retries", 3),
+                "fallbacks": model_settings.get("aggregation", {}).get("fallbacks", []),
+                "hedge": model_settings.get("aggregation", {}).get("hedge"),
             }
         }
         
+        if self.model_settings["aggregation"]["mode"] not in ("llm", "rule"):
+            raise ValueError(f"Unsupported aggregation mode: {self.model_settings['aggregation']['mode']}. Supported modes are: ['llm', 'rule']")
+        if self.model_settings["aggregation"]["narrative"] not in ("none", "inline", "deferred"):
+            raise ValueError(f"Unsupported aggregation narrative: {self.model_settings['aggregation']['narrative']}. Supported values are: ['none', 'inline', 'deferred']")
+        
         # Use provided models or create them from settings
         self.verification_question_model = verification_question_model or self._create_model(
             "verification_question"
@@ -138,18 +187,100 @@ class ModelConfig:
         self.aggregation_model = aggregation_model or self._create_model(
             "aggregation"
         )
+        
+        # Ordered fallback candidates per stage, used when the primary model is overloaded or failing
+        self.fallback_models = {
+            model_type: self._create_fallbacks(model_type) for model_type in self.model_settings
+        }
+        
+        # Attach the persistent response cache to every stage that does not bypass it
+        self.llm_cache = llm_cache
+        if llm_cache is not None:
+            for model_type, settings, model in self._all_models():
+                if self.model_settings[model_type].get("cache", True):
+                    model.cache = llm_cache.for_stage(model_type)
+        
+        # Stages calling the same provider and model share one limiter (and its budget)
+        self.rate_limiter = rate_limiter
+        if rate_limiter is not None:
+            for model_type, settings, model in self._all_models():
+                self._attach_rate_limiter(model, settings)
+    
+    @staticmethod
+    def model_label(settings: Dict[str, Any]) -> str:
+        """"provider/model" name of a model's settings"""
+        return f"{settings.get('model_provider', 'openai')}/{settings['model_name']}"
+    
+    def _fallback_settings(self, model_type: str) -> List[Dict[str, Any]]:
+        """Settings of the fallback candidates; temperature defaults to the stage's"""
+        stage_settings = self.model_settings[model_type]
+        return [
+            {
+                "temperature": stage_settings.get("temperature", 0.0),
+                **candidate,
+            }
+            for candidate in stage_settings.get("fallbacks", [])
+        ]
     
-    def _create_model(self, model_type):
+    def _create_fallbacks(self, model_type: str) -> List[Tuple[str, BaseLanguageModel]]:
+        """Create the fallback models of a stage, skipping candidates whose provider has no API key"""
+        fallbacks = []
+        for settings in self._fallback_settings(model_type):
+            try:
+                fallbacks.append((self.model_label(settings), self._create_model(model_type, settings)))
+            except ValueError as e:
+                print(f"⚠️  Skipping {model_type} fallback {self.model_label(settings)}: {e}")
+        return fallbacks
+    
+    def candidate_models(self, model_type: str) -> List[Tuple[str, BaseLanguageModel]]:
+        """Primary model followed by the fallbacks of a stage, as (label, model) pairs"""
+        primary = (self.model_label(self.model_settings[model_type]), getattr(self, f"{model_type}_model"))
+        return [primary] + self.fallback_models[model_type]
+    
+    def _all_models(self):
+        """(model_type, settings, model) for every primary and fallback model"""
+        for model_type, settings in self.model_settings.items():
+            yield model_type, settings, getattr(self, f"{model_type}_model")
+            fallback_settings = {self.model_label(candidate): candidate for candidate in self._fallback_settings(model_type)}
+            for label, model in self.fallback_models[model_type]:
+                yield model_type, fallback_settings[label], model
+    
+    def _attach_rate_limiter(self, model: BaseLanguageModel, settings: Dict[str, Any]):
+        """Set the model's rate_limiter hook and reconcile its token budget with the reported usage"""
+        provider = settings.get("model_provider", "openai")
+        limiter = self.rate_limiter.for_model(
+            provider, settings["model_name"], self.MODEL_PROVIDERS.get(provider, {}).get("rate_limits")
+        )
+        model.rate_limiter = limiter
+        self._add_model_callback(model, RateLimitUsageCallback(limiter))
+    
+    @staticmethod
+    def _add_model_callback(model: BaseLanguageModel, handler: BaseCallbackHandler):
+        """Append a callback handler to a model without dropping existing ones"""
+        if model.callbacks is None:
+            model.callbacks = [handler]
+        elif isinstance(model.callbacks, list):
+            model.callbacks = model.callbacks + [handler]
+        else:
+            model.callbacks.add_handler(handler)
+    
+    def add_callback(self, handler: BaseCallbackHandler):
+        """Attach a callback handler to all stage models and their fallbacks (e.g. to observe latency and errors)"""
+        for model_type, settings, model in self._all_models():
+            self._add_model_callback(model, handler)
+    
+    def _create_model(self, model_type, settings: Optional[Dict[str, Any]] = None):
         """
         Create a model instance with the parameters defined in model_settings
         
         Args:
             model_type: Type of model (verification_question, react, etc.)
+            settings: Settings to use instead of the stage's (e.g. a fallback candidate)
             
         Returns:
             Instance of the model
         """
-        settings = self.model_settings[model_type]
+        settings = settings or self.model_settings[model_type]
         model_name = settings["model_name"]
         model_provider = settings.get("model_provider", "openai")
         
@@ -167,9 +298,12 @@ class ModelConfig:
             raise ValueError(f"No API key found for {model_provider}. Please set the {api_key_env} environment variable.")
         
         # 組合模型參數
+        # Every stage model is called through ModelGateway, which owns retries, backoff and failover;
+        # the SDK's own retries would multiply its attempts unseen by RetryStats and the circuit breakers
         model_params = {
             "model": model_name,
-            "api_key": api_key
+            "api_key": api_key,
+            "max_retries": 0
         }
         
         # 根據不同提供商處理參數
@@ -242,6 +376,31 @@ class ModelConfig:
             if step == "verification_question" and "max_questions" in settings:
                 print(f"  - Max Questions: {settings['max_questions']}")
             
+            # Show whether the stage bypasses the response cache
+            if self.llm_cache is not None:
+                print(f"  - Cache: {'on' if settings.get('cache', True) else 'bypassed'}")
+            
+            # Show the retry limit of the stage's model calls and the fallback order
+            print(f"  - Max Retries: {settings.get('max_retries', 3)}")
+            if self.fallback_models.get(step):
+                print(f"  - Fallbacks: {' -> '.join(label for label, _ in self.fallback_models[step])}")
+            if settings.get("hedge"):
+                hedge = settings["hedge"]
+                print(f"  - Hedging: after p{hedge.get('percentile', 95)} latency, at most {hedge.get('max_rate', 0.1):.0%} of calls")
+            
+            # Show the RPM/TPM budget of the stage's provider and model
+            if self.rate_limiter is not None:
+                limits = self.rate_limiter.resolve_limits(
+                    provider, model_name, self.MODEL_PROVIDERS.get(provider, {}).get("rate_limits")
+                )
+                print(f"  - Rate Limit: {limits.get('rpm', 'unlimited')} RPM, {limits.get('tpm', 'unlimited')} TPM")
+            
+            # Show aggregation mode
+            if step == "aggregation" and "mode" in settings:
+                print(f"  - Mode: {settings['mode']}")
+                if settings["mode"] == "rule":
+                    print(f"  - Narrative: {settings.get('narrative', 'none')}")
+            
             # Show reasoning_effort if in settings and provider is OpenAI
             if "reasoning_effort" in settings and settings["reasoning_effort"] and provider == "openai":
                 print(f"  - Reasoning Effort: {settings['reasoning_effort']}")
@@ -0,0 +1,361 @@
+"""
+Stage-pipelined scheduler for the CoVe verification process
+
+Each CoVe stage (question generation, ReAct data verification, final assessment
+and aggregation) gets its own queue and worker pool, so fast stages can run ahead
+for upcoming evidences and records while a slow stage is saturated. With an
+evidence memo, an evidence already verified (or being verified) for another
+record skips the stages and reuses that result. With an analysis memo, a
+near-duplicate evidence reuses the questions and ReAct answers and only runs
+the final assessment. Evidences found in the verdict store skip all stages.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from .osint_verification_chain import OSINTCOVEChain
+
+
+# Stage order of the CoVe pipeline, named after the ModelConfig model_settings keys
+STAGES = ["verification_question", "react", "final_assessment", "aggregation"]
+
+# Default number of workers per stage
+DEFAULT_STAGE_WORKERS = {
+    "verification_question": 4,
+    "react": 8,
+    "final_assessment": 4,
+    "aggregation": 2,
+}
+
+
+class StageStats:
+    """Queue depth and utilisation counters for one pipeline stage"""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.busy_workers = 0
+        self.busy_time = 0.0
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.started_at = time.monotonic()
+
+    def utilisation(self) -> float:
+        """Fraction of worker time spent processing since the stage started"""
+        elapsed = time.monotonic() - self.started_at
+        if elapsed <= 0 or self.workers == 0:
+            return 0.0
+        return min(1.0, self.busy_time / (elapsed * self.workers))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "busy_workers": self.busy_workers,
+            "completed": self.completed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "utilisation": round(self.utilisation(), 3),
+        }
+
+
+class _RecordJob:
+    """A record travelling through the pipeline"""
+
+    def __init__(self, inputs: Dict[str, Any], evidences: List[str], future: asyncio.Future):
+        self.inputs = inputs
+        self.evidences = evidences
+        self.future = future
+        self.evidence_results: List[Optional[Dict[str, Any]]] = [None] * len(evidences)
+        self.remaining = len(evidences)
+        self.decided_by: Optional[str] = None
+        self.in_flight = set()
+
+
+class _EvidenceJob:
+    """One evidence of a record and the intermediate results of its stages"""
+
+    def __init__(self, record: _RecordJob, index: int):
+        self.record = record
+        self.index = index
+        self.evidence_id = str(index + 1)
+        self.evidence = record.evidences[index]
+        self.verification_questions: List[str] = []
+        self.verification_answers: str = ""
+        self.owned: Dict[Any, str] = {}  # Memo -> key of the result this job computes for other jobs
+        self.waited_on = set()  # Memos this job already waited on (counted once in their stats)
+
+
+class CoVeStagePipeline:
+    """
+    Pipelined executor built around OSINTCOVEChain
+
+    Usage:
+        pipeline = CoVeStagePipeline(OSINTCOVEChain(model_config, data_path))
+        outputs = await pipeline.submit({"collected_evidence": evidence_list})
+        print(pipeline.format_stats())
+        await pipeline.close()
+
+    The outputs of submit() have the same keys as the OSINTCOVEChain runnable.
+    """
+
+    def __init__(self, cove_chain: OSINTCOVEChain, stage_workers: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            cove_chain: OSINTCOVEChain providing the stage implementations
+            stage_workers: Number of workers per stage, keyed by stage name (missing stages use DEFAULT_STAGE_WORKERS)
+        """
+        unknown_stages = set(stage_workers or {}) - set(STAGES)
+        if unknown_stages:
+            raise ValueError(f"Unknown pipeline stages: {sorted(unknown_stages)}. Supported stages are: {STAGES}")
+
+        self.cove_chain = cove_chain
+        self.cove_chain.load_prompts()
+        self.stage_workers = {
+            stage: max(1, (stage_workers or {}).get(stage, DEFAULT_STAGE_WORKERS[stage]))
+            for stage in STAGES
+        }
+        self.stats = {stage: StageStats(stage, workers) for stage, workers in self.stage_workers.items()}
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.worker_tasks: List[asyncio.Task] = []
+        self.handlers = {
+            "verification_question": self._generate_questions,
+            "react": self._verify_with_data,
+            "final_assessment": self._assess_evidence,
+            "aggregation": self._aggregate,
+        }
+
+    def start(self):
+        """Start the worker pools (called automatically by submit)"""
+        if self.worker_tasks:
+            return
+
+        for stage in STAGES:
+            self.queues[stage] = asyncio.Queue()
+            self.stats[stage].started_at = time.monotonic()
+            for _ in range(self.stage_workers[stage]):
+                self.worker_tasks.append(asyncio.create_task(self._worker(stage)))
+
+    async def close(self):
+        """Stop all workers"""
+        for task in self.worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self.worker_tasks, return_exceptions=True)
+        self.worker_tasks = []
+        self.queues = {}
+
+    async def submit(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run one record through the pipeline
+
+        Args:
+            inputs: Chain inputs with a collected_evidence list
+
+        Returns:
+            The same outputs as the OSINTCOVEChain runnable
+        """
+        self.start()
+
+        evidences = self.cove_chain.evidence_list(inputs)
+        record = _RecordJob(inputs, evidences, asyncio.get_running_loop().create_future())
+
+        if not evidences:
+            self._enqueue("aggregation", record)
+        for index in range(len(evidences)):
+            self._enqueue("verification_question", _EvidenceJob(record, index))
+
+        return await record.future
+
+    def _enqueue(self, stage: str, job):
+        self.queues[stage].put_nowait(job)
+        stats = self.stats[stage]
+        stats.queue_depth = self.queues[stage].qsize()
+        stats.max_queue_depth = max(stats.max_queue_depth, stats.queue_depth)
+
+    async def _worker(self, stage: str):
+        queue = self.queues[stage]
+        stats = self.stats[stage]
+        handler = self.handlers[stage]
+
+        while True:
+            job = await queue.get()
+            stats.queue_depth = queue.qsize()
+            is_record_job = isinstance(job, _RecordJob)
+            record = job if is_record_job else job.record
+
+            # Drop the remaining work of a record that has already failed or been decided early
+            if record.future.done() or (record.decided_by is not None and not is_record_job):
+                if not is_record_job:
+                    self._release_evidence(job)
+                stats.skipped += 1
+                queue.task_done()
+                continue
+
+            stats.busy_workers += 1
+            started = time.monotonic()
+            # Run the job as its own task so a decisive early exit can cancel it in flight
+            task = asyncio.ensure_future(handler(job))
+            record.in_flight.add(task)
+            try:
+                await asyncio.wait({task})
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+            finally:
+                record.in_flight.discard(task)
+                stats.busy_time += time.monotonic() - started
+                stats.busy_workers -= 1
+                queue.task_done()
+
+            if (task.cancelled() or task.exception() is not None) and not is_record_job:
+                self._release_evidence(job)
+            if task.cancelled():
+                stats.skipped += 1
+            elif task.exception() is not None:
+                stats.failed += 1
+                if not record.future.done():
+                    record.future.set_exception(task.exception())
+            else:
+                stats.completed += 1
+
+    def _claim(self, job: _EvidenceJob, memo, reuse) -> bool:
+        """Look the evidence up in a memo; False when another job's result is (or will be) reused"""
+        if memo is None or memo in job.owned:
+            return True
+
+        key, outcome, pending = memo.begin(job.evidence, count=memo not in job.waited_on)
+        if outcome is not None:
+            reuse(job, outcome)
+            return False
+        if pending is not None:
+            self._follow(job, memo, pending, reuse)
+            return False
+        job.owned[memo] = key
+        return True
+
+    def _follow(self, job: _EvidenceJob, memo, pending, reuse):
+        """Wait for another job's result without occupying a stage worker"""
+        async def follow():
+            outcome = await memo.await_pending(pending)
+            job.waited_on.add(memo)
+            if outcome is None:
+                # The owning job failed or was cancelled, so this job does the work after all
+                self._enqueue("verification_question", job)
+            else:
+                reuse(job, outcome)
+
+        task = asyncio.ensure_future(follow())
+        job.record.in_flight.add(task)
+        task.add_done_callback(job.record.in_flight.discard)
+
+    def _finish(self, job: _EvidenceJob, memo, outcome):
+        key = job.owned.pop(memo, None)
+        if key is not None:
+            memo.complete(key, outcome)
+
+    def _release_evidence(self, job: _EvidenceJob):
+        """Hand the memo ownerships of a dropped, failed or cancelled job to the jobs waiting for them"""
+        for memo, key in job.owned.items():
+            memo.abandon(key)
+        job.owned.clear()
+
+    def _reuse_evidence_result(self, job: _EvidenceJob, outcome):
+        self._complete_evidence(job, self.cove_chain.retag_evidence_result(job.evidence_id, *outcome))
+
+    def _reuse_analysis(self, job: _EvidenceJob, outcome):
+        # A near-duplicate's questions and ReAct answers; only the final assessment runs for this evidence
+        job.verification_questions, job.verification_answers = self.cove_chain.reuse_analysis(job.evidence_id, outcome)
+        self._enqueue("final_assessment", job)
+
+    async def _generate_questions(self, job: _EvidenceJob):
+        if not self._claim(job, self.cove_chain.evidence_memo, self._reuse_evidence_result):
+            return
+        stored = await self.cove_chain.alookup_verdict(job.evidence_id, job.evidence)
+        if stored is not None:
+            self._finish(job, self.cove_chain.evidence_memo, (job.evidence_id, stored))
+            self._complete_evidence(job, stored)
+            return
+        if not self._claim(job, self.cove_chain.analysis_memo, self._reuse_analysis):
+            return
+        job.verification_questions = await self.cove_chain.agenerate_questions(job.evidence)
+        self._enqueue("react", job)
+
+    async def _verify_with_data(self, job: _EvidenceJob):
+        job.verification_answers = await self.cove_chain.averify_with_data(
+            job.evidence_id, job.evidence, job.verification_questions
+        )
+        self._finish(job, self.cove_chain.analysis_memo,
+                     (job.evidence_id, job.verification_questions, job.verification_answers))
+        self._enqueue("final_assessment", job)
+
+    async def _assess_evidence(self, job: _EvidenceJob):
+        credibility_assessment = await self.cove_chain.aassess_evidence(job.evidence, job.verification_answers)
+
+        evidence_result = self.cove_chain.tag_evidence_result(
+            job.evidence_id, job.verification_questions, job.verification_answers, credibility_assessment
+        )
+        self._finish(job, self.cove_chain.evidence_memo, (job.evidence_id, evidence_result))
+        await self.cove_chain.astore_verdict(job.evidence_id, job.evidence, evidence_result)
+        self._complete_evidence(job, evidence_result)
+
+    def _complete_evidence(self, job: _EvidenceJob, evidence_result: Dict[str, Any]):
+        """Store an evidence's result in its record and aggregate the record once it is complete"""
+        record = job.record
+        if record.decided_by is not None or record.future.done():
+            return
+
+        record.evidence_results[job.index] = evidence_result
+
+        if self.cove_chain.early_exit and self.cove_chain.is_decisive(evidence_result["verdict"]):
+            # Decisive early exit: cancel the record's other in-flight jobs and aggregate right away
+            record.decided_by = job.evidence_id
+            current = asyncio.current_task()
+            for task in list(record.in_flight):
+                if task is not current:
+                    task.cancel()
+            record.evidence_results = self.cove_chain.fill_skipped(
+                [str(index + 1) for index in range(len(record.evidences))],
+                record.evidence_results,
+                record.decided_by
+            )
+            self._enqueue("aggregation", record)
+            return
+
+        record.remaining -= 1
+        if record.remaining == 0:
+            self._enqueue("aggregation", record)
+
+    async def _aggregate(self, record: _RecordJob):
+        outputs, aggregation_input = self.cove_chain.collect_results(
+            record.inputs, record.evidences, record.evidence_results
+        )
+        outputs = await self.cove_chain.aaggregate(outputs, aggregation_input)
+
+        if not record.future.done():
+            record.future.set_result(outputs)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage queue depth and utilisation"""
+        return {stage: self.stats[stage].to_dict() for stage in STAGES}
+
+    def bottleneck_stage(self) -> str:
+        """Stage with the highest utilisation, i.e. the one limiting throughput"""
+        return max(STAGES, key=lambda stage: self.stats[stage].utilisation())
+
+    def format_stats(self) -> str:
+        """Human readable one-line-per-stage summary"""
+        lines = ["Pipeline stage stats:"]
+        for stage in STAGES:
+            stats = self.stats[stage]
+            lines.append(
+                f"  - {stage}: queue={stats.queue_depth} (max {stats.max_queue_depth}), "
+                f"busy={stats.busy_workers}/{stats.workers}, done={stats.completed}, "
+                f"failed={stats.failed}, skipped={stats.skipped}, utilisation={stats.utilisation():.0%}"
+            )
+        lines.append(f"  Bottleneck stage: {self.bottleneck_stage()}")
+        return "\n".join(lines)
@@ -0,0 +1,15 @@
+"""
+Data Tools Package for OSINT Chain-of-Verification
+
+This package provides the execution environment used by the ReAct agent
+to analyse the verification dataset.
+"""
+
+from .analysis_tools import ANALYSIS_FUNCTIONS, call_analysis_function, filter_mask
+from .dataset_cache import DatasetCache, default_dataset_cache
+from .profile import format_profile, profile_dataframe
+from .session import AnalysisSession
+from .sql_engine import SQLEngine, get_sql_engine, sql_available
+from .text_index import DatasetTextIndex, TextIndex, tokenize
+from .time_index import DatasetTimeIndex, TimeIndex
+from .worker_pool import REPLWorkerPool, PooledAnalysisSession
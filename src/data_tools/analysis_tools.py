@@ -0,0 +1,262 @@
+"""
+Vectorised analysis functions behind the ReAct agent's structured tools
+
+The agent otherwise writes, and after errors rewrites, pandas code for the same
+recurring OSINT checks. Each function here takes a session variable (usually
+`df`) plus typed arguments, runs one vectorised computation and returns a compact
+text table. The tools call them through AnalysisSession.call, so they also run
+inside REPL pool workers.
+
+Row filters are dicts {"column": ..., "op": ..., "value": ...} with op one of
+==, !=, >, >=, <, <=, contains, not_contains, in, between, isnull, notnull.
+"""
+
+import re
+import unicodedata
+import warnings
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+from .text_index import search_text
+from .time_index import time_window_stats
+
+
+MAX_ROWS = 50
+MAX_WINDOWS = 5_000_000  # Windows between the first and last row a time_histogram/detect_bursts request may span
+MIN_BURST_WINDOWS = 5  # Non-empty windows needed for a burst baseline
+# Python's re: \w matches any Unicode letter or digit, whereas pandas' .str.replace on Arrow-backed
+# strings runs RE2, whose \w is ASCII-only and would strip every CJK character
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+FILTER_OPS = ("==", "!=", ">", ">=", "<", "<=", "contains", "not_contains", "in", "between", "isnull", "notnull")
+
+
+def _column(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df.columns:
+        raise ValueError(f"Unknown column {column!r}; available columns: {', '.join(map(str, df.columns))}")
+    return df[column]
+
+
+def _comparable(series: pd.Series, value: Any) -> Any:
+    """Compare datetime columns with timestamps when the value is given as a string"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if isinstance(value, (list, tuple)):
+            return [pd.Timestamp(item) for item in value]
+        return pd.Timestamp(value)
+    return value
+
+
+def filter_mask(df: pd.DataFrame, where: Optional[List[Dict[str, Any]]] = None) -> pd.Series:
+    """Boolean mask of the rows matching all filters"""
+    mask = pd.Series(True, index=df.index)
+    for condition in where or []:
+        series = _column(df, condition["column"])
+        op = condition.get("op", "==")
+        value = _comparable(series, condition.get("value"))
+        if op == "==":
+            mask &= series == value
+        elif op == "!=":
+            mask &= series != value
+        elif op == ">":
+            mask &= series > value
+        elif op == ">=":
+            mask &= series >= value
+        elif op == "<":
+            mask &= series < value
+        elif op == "<=":
+            mask &= series <= value
+        elif op in ("contains", "not_contains"):
+            matched = series.astype(str).str.contains(str(value), case=False, regex=False, na=False)
+            mask &= matched if op == "contains" else ~matched
+        elif op == "in":
+            mask &= series.isin(value if isinstance(value, (list, tuple)) else [value])
+        elif op == "between":
+            low, high = value
+            mask &= series.between(low, high)
+        elif op == "isnull":
+            mask &= series.isna()
+        elif op == "notnull":
+            mask &= series.notna()
+        else:
+            raise ValueError(f"Unknown filter op {op!r}; use one of {', '.join(FILTER_OPS)}")
+    return mask
+
+
+def _timestamps(df: pd.DataFrame, time_column: str) -> pd.Series:
+    series = _column(df, time_column)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return pd.to_datetime(series, errors="coerce")
+
+
+def _window_counts(df: pd.DataFrame, time_column: str, freq: str, where) -> Tuple[pd.Series, int]:
+    """Rows per non-empty time window, and the number of windows between the first and last row"""
+    timestamps = _timestamps(df, time_column)[filter_mask(df, where)].dropna()
+    if timestamps.empty:
+        return pd.Series(dtype="int64"), 0
+
+    # Only non-empty windows are materialised, so sparse data over a long span stays O(rows)
+    timestamps = pd.DatetimeIndex(timestamps)
+    offset = to_offset(freq)
+    span = timestamps.max() - timestamps.min()
+    fixed = isinstance(offset, pd.offsets.Tick)
+    # Calendar offsets (weeks, months, ...) have no fixed length: count per day, then bin the non-empty days
+    windows = int(span // pd.Timedelta(offset if fixed else "1D")) + 1
+    if windows > MAX_WINDOWS:
+        raise ValueError(f"freq {freq} splits the {span} between the first and last row into {windows:,} windows "
+                         f"(limit {MAX_WINDOWS:,}); use a coarser freq, narrow the rows with where, "
+                         f"or time_window_stats for second-level clustering")
+
+    counts = timestamps.floor(offset if fixed else "D").value_counts().sort_index()
+    if not fixed:
+        counts = counts.resample(offset).sum()
+        windows = len(counts)
+        counts = counts[counts > 0]
+    return counts.rename_axis(time_column).rename("count"), windows
+
+
+def _table(frame: pd.DataFrame, limit: int = MAX_ROWS) -> str:
+    text = frame.head(limit).to_string()
+    if len(frame) > limit:
+        text += f"\n... {len(frame) - limit} more rows"
+    return text
+
+
+def time_histogram(df: pd.DataFrame, time_column: str, freq: str = "1D",
+                   where: Optional[List[Dict[str, Any]]] = None, limit: int = MAX_ROWS) -> str:
+    """Row counts per non-empty time window (freq is a pandas offset alias such as 1h, 1D, 1W)"""
+    counts, windows = _window_counts(df, time_column, freq, where)
+    if counts.empty:
+        return f"No rows with a valid {time_column}"
+    header = (f"{int(counts.sum())} rows in {len(counts)} non-empty of {windows} windows of {freq} "
+              f"({counts.index[0]} .. {counts.index[-1]}), max {int(counts.max())} per window")
+    return f"{header}\n{_table(counts.to_frame(), limit)}"
+
+
+def detect_bursts(df: pd.DataFrame, time_column: str, freq: str = "1h", z_threshold: float = 3.0,
+                  where: Optional[List[Dict[str, Any]]] = None, limit: int = MAX_ROWS) -> str:
+    """Time windows whose row count is far above the typical non-empty window (robust z-score on median and MAD)"""
+    counts, windows = _window_counts(df, time_column, freq, where)
+    if counts.empty:
+        return f"No rows with a valid {time_column}"
+    summary = f"{len(counts)} non-empty of {windows} windows of {freq}"
+    if len(counts) < MIN_BURST_WINDOWS:
+        return f"{summary}; too few non-empty windows for a baseline, use time_histogram or a finer freq"
+
+    # The baseline is the typical non-empty window; counting empty windows would make every active one a burst
+    median = counts.median()
+    deviations = (counts - median).abs()
+    mad = deviations.median()
+    # 1.4826 * MAD estimates the standard deviation; when most windows are equal, use the mean absolute deviation
+    scale = 1.4826 * mad if mad > 0 else 1.2533 * deviations.mean()
+    if scale == 0:
+        return f"{summary}, every one with {median:g} rows; no bursts"
+    scores = (counts - median) / scale
+    bursts = pd.DataFrame({"count": counts, "robust_z": scores.round(2)})[scores >= z_threshold]
+    header = (f"{summary}, median {median:g} rows per non-empty window; "
+              f"{len(bursts)} bursts with robust z >= {z_threshold:g}")
+    if bursts.empty:
+        return header
+    return f"{header}\n{_table(bursts.sort_values('count', ascending=False), limit)}"
+
+
+def _normalize_key(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub("", text)).strip()
+
+
+def _normalize_text(series: pd.Series) -> pd.Series:
+    # Normalise each distinct text once; repeated texts are what find_duplicates is looking for
+    codes, uniques = pd.factorize(series.astype(str))
+    keys = pd.Index([_normalize_key(text) for text in uniques], dtype=object)
+    return pd.Series(keys.take(codes), index=series.index)
+
+
+def find_duplicates(df: pd.DataFrame, text_column: str, by: Optional[str] = None, near_threshold: Optional[float] = None,
+                    min_count: int = 2, where: Optional[List[Dict[str, Any]]] = None, limit: int = 20) -> str:
+    """
+    Groups of repeated texts (exact after normalisation, or near-duplicates by MinHash Jaccard >= near_threshold)
+
+    by names a column such as the author whose distinct values are counted per group.
+    """
+    rows = df[filter_mask(df, where)]
+    texts = _column(rows, text_column).dropna()
+    if texts.empty:
+        return f"No rows with a {text_column}"
+
+    if near_threshold:
+        from ..evidence_clusters import EvidenceClusterIndex
+        index = EvidenceClusterIndex(threshold=near_threshold)
+        keys = pd.Series([index.cluster_key(text) for text in texts], index=texts.index)
+    else:
+        keys = _normalize_text(texts)
+
+    grouped = pd.DataFrame({"key": keys, "text": texts})
+    if by is not None:
+        grouped["by"] = _column(rows, by).loc[texts.index]
+    aggregations = {"count": ("text", "size"), "example": ("text", "first")}
+    if by is not None:
+        aggregations[f"distinct_{by}"] = ("by", "nunique")
+    groups = grouped.groupby("key", sort=False).agg(**aggregations)
+    groups = groups[groups["count"] >= min_count].sort_values("count", ascending=False).reset_index(drop=True)
+    groups["example"] = groups["example"].astype(str).str.slice(0, 80)
+
+    kind = f"near-duplicate (Jaccard >= {near_threshold:g})" if near_threshold else "duplicate"
+    header = (f"{len(texts)} texts, {len(groups)} {kind} groups with >= {min_count} rows "
+              f"covering {int(groups['count'].sum()) if len(groups) else 0} rows")
+    if groups.empty:
+        return header
+    return f"{header}\n{_table(groups, limit)}"
+
+
+def group_counts(df: pd.DataFrame, group_by: List[str], where: Optional[List[Dict[str, Any]]] = None,
+                 min_count: int = 1, limit: int = 20) -> str:
+    """Rows per value combination of the group_by columns, largest first, with their share"""
+    rows = df[filter_mask(df, where)]
+    for column in group_by:
+        _column(rows, column)
+    counts = rows.groupby(list(group_by), dropna=False).size().rename("count").sort_values(ascending=False)
+    counts = counts[counts >= min_count]
+    table = counts.to_frame()
+    table["share"] = (table["count"] / max(len(rows), 1)).round(4)
+    header = f"{len(rows)} rows in {len(counts)} groups by {', '.join(group_by)}"
+    if table.empty:
+        return header
+    return f"{header}\n{_table(table, limit)}"
+
+
+def count_rows(df: pd.DataFrame, where: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Number of rows matching all filters"""
+    matched = int(filter_mask(df, where).sum())
+    share = matched / len(df) if len(df) else 0.0
+    return f"{matched} of {len(df)} rows match ({share:.2%})"
+
+
+# name -> (function, session variables passed as its first arguments; the first one is required)
+ANALYSIS_FUNCTIONS = {
+    function.__name__: (function, variables)
+    for function, variables in (
+        (time_histogram, ("df",)),
+        (detect_bursts, ("df",)),
+        (find_duplicates, ("df",)),
+        (group_counts, ("df",)),
+        (count_rows, ("df",)),
+        (time_window_stats, ("time_index",)),
+        (search_text, ("text_index", "df")),
+    )
+}
+
+
+def call_analysis_function(namespace: Dict[str, Any], name: str, arguments: Dict[str, Any]) -> str:
+    """Run one analysis function on its session variables, reporting errors as text like the REPL does"""
+    function, variables = ANALYSIS_FUNCTIONS[name]
+    if namespace.get(variables[0]) is None:
+        return "Error: the dataset is not loaded" if variables[0] == "df" else f"Error: `{variables[0]}` is not available"
+    try:
+        return function(*[namespace.get(variable) for variable in variables], **arguments)
+    except Exception as e:
+        return f"Error: {type(e).__name__}: {e}"
@@ -0,0 +1,226 @@
+"""
+Columnar cache of the analysis dataset
+
+Parsing the .xlsx dataset with openpyxl takes seconds. The first load converts the
+workbook sheet into an uncompressed Arrow IPC file keyed by the workbook's content
+hash and the sheet; later loads memory-map that file, so they take milliseconds and
+concurrent workers share the same pages through the OS page cache. Sessions get
+Arrow-backed DataFrames whose columns point into the mapped file (no per-session
+copy); copy-on-write keeps one session's edits out of the others. The dataset
+profile shown to the ReAct agent, the time index and the text index are cached
+the same way.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from .profile import format_profile, profile_dataframe
+from .text_index import DatasetTextIndex
+from .time_index import DatasetTimeIndex
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow is optional, fall back to parsing the source
+    pa = None
+
+
+CACHE_DIR_NAME = ".cove_cache"
+
+
+def enable_copy_on_write():
+    """Sessions receive shallow copies of a shared DataFrame; copy-on-write (default from pandas 3) keeps their edits private"""
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+def read_source_dataframe(data_path: str, sheet_name: Any = 0) -> pd.DataFrame:
+    """Load the dataset with the reader matching its file extension"""
+    extension = os.path.splitext(data_path)[1].lower()
+    if extension == ".csv":
+        return pd.read_csv(data_path)
+    if extension == ".parquet":
+        return pd.read_parquet(data_path)
+    return pd.read_excel(data_path, sheet_name=sheet_name)
+
+
+class DatasetCache:
+    """
+    Converts datasets to memory-mapped Arrow IPC files and serves them as DataFrames
+
+    Usage:
+        cache = DatasetCache()
+        df = cache.load_dataframe("data/yt_tsai_secret.xlsx")
+        fingerprint = cache.fingerprint("data/yt_tsai_secret.xlsx")
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Args:
+            cache_dir: Directory for the converted files (default: .cove_cache next to each dataset)
+        """
+        self.cache_dir = cache_dir
+        self._file_hashes: Dict[Tuple[str, int, int], str] = {}
+        self._tables: Dict[str, Any] = {}
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._profiles: Dict[str, Dict[str, Any]] = {}
+        self._time_indexes: Dict[str, DatasetTimeIndex] = {}
+        self._text_indexes: Dict[str, DatasetTextIndex] = {}
+        self._lock = threading.Lock()
+        self._hash_lock = threading.Lock()
+
+    def _content_hash(self, data_path: str) -> str:
+        """SHA-256 of the dataset file, memoised on (path, size, mtime)"""
+        stat = os.stat(data_path)
+        memo_key = (os.path.abspath(data_path), stat.st_size, stat.st_mtime_ns)
+        if memo_key in self._file_hashes:
+            return self._file_hashes[memo_key]
+        # Threads asking for the same file at once wait for one hash instead of each reading the file
+        with self._hash_lock:
+            if memo_key not in self._file_hashes:
+                digest = hashlib.sha256()
+                with open(data_path, "rb") as file:
+                    for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                        digest.update(chunk)
+                self._file_hashes[memo_key] = digest.hexdigest()
+        return self._file_hashes[memo_key]
+
+    def fingerprint(self, data_path: str, sheet_name: Any = 0) -> str:
+        """Content fingerprint of one dataset sheet"""
+        return hashlib.sha256(f"{self._content_hash(data_path)}:{sheet_name}".encode("utf-8")).hexdigest()
+
+    def cache_path(self, data_path: str, sheet_name: Any = 0, suffix: str = ".arrow") -> str:
+        """Location of a derived file for the current content of data_path"""
+        cache_dir = self.cache_dir or os.path.join(os.path.dirname(os.path.abspath(data_path)), CACHE_DIR_NAME)
+        stem = os.path.splitext(os.path.basename(data_path))[0]
+        sheet = re.sub(r"[^\w-]+", "_", str(sheet_name))
+        return os.path.join(cache_dir, f"{stem}.{sheet}.{self.fingerprint(data_path, sheet_name)[:16]}{suffix}")
+
+    def _convert(self, data_path: str, sheet_name: Any, arrow_path: str):
+        """Parse the source once and write it as an uncompressed Arrow IPC file"""
+        os.makedirs(os.path.dirname(arrow_path), exist_ok=True)
+        table = pa.Table.from_pandas(read_source_dataframe(data_path, sheet_name), preserve_index=False)
+
+        # Write to a temporary file first so concurrent readers never see a partial file
+        temp_path = f"{arrow_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with pa.OSFile(temp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp_path, arrow_path)
+        self._remove_stale(arrow_path, ".arrow")
+
+    @staticmethod
+    def _remove_stale(path: str, suffix: str):
+        """Remove files derived from earlier versions of the same dataset sheet"""
+        prefix = os.path.basename(path)[:-len(suffix)].rsplit(".", 1)[0] + "."
+        for name in os.listdir(os.path.dirname(path)):
+            if name.startswith(prefix) and name.endswith(suffix) and name != os.path.basename(path):
+                try:
+                    os.remove(os.path.join(os.path.dirname(path), name))
+                except OSError:
+                    pass
+
+    def load_table(self, data_path: str, sheet_name: Any = 0):
+        """Return the dataset as a memory-mapped pyarrow Table, converting it on first use"""
+        if pa is None:
+            raise ImportError("pyarrow is required for the dataset cache. Install it with: pip install pyarrow")
+
+        arrow_path = self.cache_path(data_path, sheet_name)
+        with self._lock:
+            if arrow_path not in self._tables:
+                if not os.path.exists(arrow_path):
+                    self._convert(data_path, sheet_name, arrow_path)
+                # Zero-copy read: column buffers point into the mapped file
+                self._tables[arrow_path] = pa.ipc.open_file(pa.memory_map(arrow_path, "r")).read_all()
+            return self._tables[arrow_path]
+
+    def _shared_frame(self, data_path: str, sheet_name: Any = 0) -> pd.DataFrame:
+        """DataFrame of the dataset shared by all sessions of the process, built once per content fingerprint"""
+        fingerprint = self.fingerprint(data_path, sheet_name)
+        if fingerprint in self._frames:
+            return self._frames[fingerprint]
+
+        frame = None
+        if pa is not None:
+            try:
+                # ArrowDtype columns wrap the mapped buffers instead of converting them to NumPy/Python objects
+                frame = self.load_table(data_path, sheet_name).to_pandas(types_mapper=pd.ArrowDtype)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+                # e.g. object columns mixing numbers and strings cannot be stored as Arrow
+                print(f"Dataset cache disabled for {data_path}: {e}")
+        if frame is None:
+            # Without a columnar copy, parse the source once per process
+            frame = read_source_dataframe(data_path, sheet_name)
+
+        with self._lock:
+            return self._frames.setdefault(fingerprint, frame)
+
+    def load_dataframe(self, data_path: str, sheet_name: Any = 0) -> pd.DataFrame:
+        """Return a session's DataFrame: a shallow copy of the shared frame, isolated by copy-on-write"""
+        enable_copy_on_write()
+        return self._shared_frame(data_path, sheet_name).copy(deep=False)
+
+    def profile(self, data_path: str, sheet_name: Any = 0) -> Dict[str, Any]:
+        """Profile of the dataset (see profile_dataframe), computed once per content fingerprint"""
+        fingerprint = self.fingerprint(data_path, sheet_name)
+        if fingerprint in self._profiles:
+            return self._profiles[fingerprint]
+
+        profile_path = self.cache_path(data_path, sheet_name, suffix=".profile.json")
+        try:
+            with open(profile_path, "r", encoding="utf-8") as file:
+                profile = json.load(file)
+        except (OSError, ValueError):
+            profile = profile_dataframe(self.load_dataframe(data_path, sheet_name))
+            os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+            temp_path = f"{profile_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(profile, file, ensure_ascii=False)
+            os.replace(temp_path, profile_path)
+            self._remove_stale(profile_path, ".profile.json")
+
+        with self._lock:
+            self._profiles[fingerprint] = profile
+        return profile
+
+    def profile_text(self, data_path: str, sheet_name: Any = 0) -> str:
+        return format_profile(self.profile(data_path, sheet_name))
+
+    def _saved_index(self, data_path: str, sheet_name: Any, index_class, memo: Dict[str, Any], suffix: str):
+        """Index of the dataset loaded from its .npz file next to the Arrow cache, or built and saved there"""
+        fingerprint = self.fingerprint(data_path, sheet_name)
+        if fingerprint in memo:
+            return memo[fingerprint]
+
+        index_path = self.cache_path(data_path, sheet_name, suffix=suffix)
+        try:
+            index = index_class.load(index_path)
+        except (OSError, ValueError, KeyError):
+            index = index_class.from_dataframe(self.load_dataframe(data_path, sheet_name))
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            # np.savez appends .npz to names without it, so the temporary name keeps the suffix
+            temp_path = f"{index_path[:-len('.npz')]}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+            index.save(temp_path)
+            os.replace(temp_path, index_path)
+            self._remove_stale(index_path, suffix)
+
+        with self._lock:
+            memo[fingerprint] = index
+        return index
+
+    def time_index(self, data_path: str, sheet_name: Any = 0) -> DatasetTimeIndex:
+        """Sorted time index of the dataset's timestamp columns, built once per content fingerprint"""
+        return self._saved_index(data_path, sheet_name, DatasetTimeIndex, self._time_indexes, ".time_index.npz")
+
+    def text_index(self, data_path: str, sheet_name: Any = 0) -> DatasetTextIndex:
+        """Inverted index of the dataset's text columns, built once per content fingerprint"""
+        return self._saved_index(data_path, sheet_name, DatasetTextIndex, self._text_indexes, ".text_index.npz")
+
+
+# Process-wide cache shared by all analysis sessions
+default_dataset_cache = DatasetCache()
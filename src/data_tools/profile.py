@@ -0,0 +1,84 @@
+"""
+Dataset profile shown to the ReAct agent
+
+Without it every ReAct run starts by rediscovering the same schema: columns,
+dtypes, missing values and value ranges. The profile is computed once per dataset
+fingerprint, persisted next to the Arrow cache and injected into the verification
+prompt, so the agent can go straight to analysing the claim.
+"""
+
+import warnings
+from typing import Any, Dict, List
+
+import pandas as pd
+
+
+TOP_VALUES = 5
+MAX_VALUE_LENGTH = 60
+DATETIME_SAMPLE = 200
+
+
+def _short(value: Any) -> str:
+    text = str(value).replace("\n", " ")
+    return text if len(text) <= MAX_VALUE_LENGTH else text[:MAX_VALUE_LENGTH - 3] + "..."
+
+
+def as_datetimes(series: pd.Series):
+    """The column parsed as timestamps when (nearly) all sampled text values are dates, else None"""
+    values = series.dropna()
+    if values.empty or not all(isinstance(value, str) for value in values.head(DATETIME_SAMPLE)):
+        return None
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        sample = pd.to_datetime(values.head(DATETIME_SAMPLE), errors="coerce")
+        if sample.notna().mean() < 0.9:
+            return None
+        return pd.to_datetime(values, errors="coerce")
+
+
+def profile_dataframe(df: pd.DataFrame) -> Dict[str, Any]:
+    """Schema, null counts, top values, numeric summaries and timestamp ranges of a DataFrame (JSON-serialisable)"""
+    columns: List[Dict[str, Any]] = []
+    for name in df.columns:
+        series = df[name]
+        column = {
+            "name": str(name),
+            "dtype": str(series.dtype),
+            "nulls": int(series.isna().sum()),
+            "unique": int(series.nunique(dropna=True)),
+        }
+
+        if pd.api.types.is_datetime64_any_dtype(series):
+            timestamps = series.dropna()
+        else:
+            timestamps = None if pd.api.types.is_numeric_dtype(series) else as_datetimes(series)
+
+        if timestamps is not None and not timestamps.dropna().empty:
+            column["range"] = [str(timestamps.min()), str(timestamps.max())]
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            summary = series.describe()
+            column["describe"] = {key: round(float(summary[key]), 4) for key in
+                                  ("min", "25%", "50%", "75%", "max", "mean", "std") if pd.notna(summary.get(key))}
+        else:
+            counts = series.value_counts(dropna=True).head(TOP_VALUES)
+            # Free-text columns where every value is distinct have no informative top values
+            if not counts.empty and counts.iloc[0] > 1:
+                column["top"] = [[_short(value), int(count)] for value, count in counts.items()]
+        columns.append(column)
+
+    return {"rows": int(len(df)), "columns": columns}
+
+
+def format_profile(profile: Dict[str, Any]) -> str:
+    """Compact text of a profile for the ReAct prompt"""
+    lines = [f"{profile['rows']} rows, {len(profile['columns'])} columns:"]
+    for column in profile["columns"]:
+        line = f"- {column['name']} ({column['dtype']}): {column['nulls']} nulls, {column['unique']} unique"
+        if "range" in column:
+            line += f"; range {column['range'][0]} .. {column['range'][1]}"
+        if "describe" in column:
+            line += "; " + ", ".join(f"{key}={value:g}" for key, value in column["describe"].items())
+        if "top" in column:
+            line += "; top: " + ", ".join(f'"{value}" ({count})' for value, count in column["top"])
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,166 @@
+"""
+Session-scoped Python execution environment for the ReAct agent
+
+One AnalysisSession lives for a single ReAct run: the matplotlib setup runs once,
+the dataset is loaded once and exposed as a ready-made `df` (with the cached
+`time_index` of its timestamp columns and `text_index` of its text columns), and
+every analyze_data call of the run shares the same interpreter namespace.
+"""
+
+import sys
+import threading
+from contextlib import contextmanager
+from io import StringIO
+from typing import Any, Dict, Optional
+
+import pandas as pd
+from langchain_experimental.utilities import PythonREPL
+
+from .analysis_tools import call_analysis_function
+from .dataset_cache import DatasetCache, default_dataset_cache
+from .sql_engine import get_sql_engine
+
+
+# Use a non-interactive matplotlib backend inside the agent's interpreter
+MATPLOTLIB_SETUP = """
+import matplotlib
+matplotlib.use('Agg')
+"""
+
+
+class _ThreadStdout:
+    """
+    Stand-in for sys.stdout that sends each capturing thread's prints to its own buffer
+
+    PythonREPL swaps the process-wide sys.stdout for every run, so concurrent sessions
+    (evidence fan-out, executor threads) would read each other's output and could leave
+    a StringIO installed for good. While any capture is active this object is sys.stdout;
+    threads that are not capturing keep writing to the original stream, which is put back
+    once the last capture ends.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._active = 0
+        self._stream = None
+
+    def _target(self):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is not None:
+            return buffer
+        return self._stream or sys.__stdout__
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._target(), name)
+
+    @contextmanager
+    def capture(self):
+        """Collect everything the current thread prints into a fresh buffer"""
+        with self._lock:
+            if self._active == 0:
+                self._stream = sys.stdout
+                sys.stdout = self
+            self._active += 1
+        self._local.buffer = buffer = StringIO()
+        try:
+            yield buffer
+        finally:
+            self._local.buffer = None
+            with self._lock:
+                self._active -= 1
+                if self._active == 0:
+                    if sys.stdout is self:
+                        sys.stdout = self._stream
+                    self._stream = None
+
+
+_thread_stdout = _ThreadStdout()
+
+
+def _run_captured(repl: PythonREPL, python_code: str) -> str:
+    """Execute code in a PythonREPL's namespace and return what this thread printed (or the error)"""
+    with _thread_stdout.capture() as buffer:
+        try:
+            exec(repl.sanitize_input(python_code), repl.globals, repl.locals)
+        except Exception as e:
+            return repr(e)
+        return buffer.getvalue()
+
+
+class AnalysisSession:
+    """Interpreter state shared by the tool calls of one ReAct run"""
+
+    def __init__(self, data_path: str, sheet_name: Any = 0, dataset_cache: Optional[DatasetCache] = None):
+        """
+        Args:
+            data_path: Path to the dataset exposed as `df`
+            sheet_name: Sheet to load when the dataset is an Excel workbook (default: first sheet)
+            dataset_cache: Columnar cache serving the dataset (default: the process-wide cache)
+        """
+        self.data_path = data_path
+        self.sheet_name = sheet_name
+        self.dataset_cache = dataset_cache or default_dataset_cache
+        # _locals=None makes exec() use a single namespace, so functions defined by the agent see `df`
+        self.repl = PythonREPL(_globals={}, _locals=None)
+        self.started = False
+        self.load_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def namespace(self) -> Dict[str, Any]:
+        return self.repl.globals
+
+    def start(self):
+        """Run the setup code and load the dataset (only once per session)"""
+        if self.started:
+            return
+
+        _run_captured(self.repl, MATPLOTLIB_SETUP)
+        self.namespace.update({"pd": pd, "data_path": self.data_path})
+        try:
+            self.namespace["df"] = self.dataset_cache.load_dataframe(self.data_path, self.sheet_name)
+        except Exception as e:
+            # Leave df undefined; the agent can still inspect data_path and report the problem
+            self.load_error = f"Could not preload dataset {self.data_path}: {e}"
+        else:
+            # The indexes are optional helpers; their tools report when one is missing
+            for name in ("time_index", "text_index"):
+                try:
+                    self.namespace[name] = getattr(self.dataset_cache, name)(self.data_path, self.sheet_name)
+                except Exception:
+                    self.namespace[name] = None
+        self.started = True
+
+    def run(self, python_code: str) -> str:
+        """Execute agent code in the session namespace and return its printed output"""
+        with self._lock:
+            self.start()
+            output = _run_captured(self.repl, python_code)
+        if self.load_error and "df" not in self.namespace:
+            output = f"{self.load_error}\n{output}"
+        return output
+
+    def call(self, name: str, arguments: Dict[str, Any]) -> str:
+        """Run a structured analysis function (see analysis_tools) on the session's `df`"""
+        with self._lock:
+            self.start()
+            if self.load_error and "df" not in self.namespace:
+                return self.load_error
+            return call_analysis_function(self.namespace, name, arguments)
+
+    def query(self, sql: str, limit: int = 50) -> str:
+        """Run a read-only SQL query over the original dataset (table `df`, not the session's variables)"""
+        return get_sql_engine(self.data_path, self.sheet_name, self.dataset_cache).query(sql, limit)
+
+    def close(self):
+        """Release the interpreter state (and the loaded dataset)"""
+        with self._lock:
+            self.namespace.clear()
+            self.started = False
@@ -0,0 +1,130 @@
+"""
+In-process SQL over the analysis dataset for the ReAct agent's query_data tool
+
+Chained pandas filters and sorts in agent code copy the whole DataFrame at every
+step. DuckDB instead scans the memory-mapped Arrow table of the dataset cache
+zero-copy and runs aggregations vectorised on all cores. Only the first rows of a
+result are fetched and rendered. duckdb is optional; without it the tool is not
+offered.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from .dataset_cache import DatasetCache, default_dataset_cache
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - duckdb is optional, query_data is then not offered
+    duckdb = None
+
+
+SQL_TABLE_NAME = "df"
+
+
+def sql_available() -> bool:
+    return duckdb is not None
+
+
+class SQLEngine:
+    """
+    Read-only DuckDB connection with one dataset registered as table `df`
+
+    Usage:
+        engine = get_sql_engine("data/yt_tsai_secret.xlsx")
+        print(engine.query("SELECT author, COUNT(*) AS n FROM df GROUP BY 1 ORDER BY n DESC", limit=10))
+    """
+
+    def __init__(self, data_path: str, sheet_name: Any = 0, dataset_cache: Optional[DatasetCache] = None,
+                 timeout: float = 30.0):
+        """
+        Args:
+            data_path: Path to the dataset registered as `df`
+            sheet_name: Sheet to load when the dataset is an Excel workbook (default: first sheet)
+            dataset_cache: Columnar cache serving the dataset (default: the process-wide cache)
+            timeout: Seconds one query may run before it is interrupted
+        """
+        if duckdb is None:
+            raise ImportError("duckdb is required for the query_data tool. Install it with: pip install duckdb")
+        self.data_path = data_path
+        self.timeout = timeout
+        dataset_cache = dataset_cache or default_dataset_cache
+        try:
+            # Zero-copy: DuckDB scans the Arrow buffers of the memory-mapped cache file
+            self.table = dataset_cache.load_table(data_path, sheet_name)
+        except Exception:
+            # No Arrow copy (pyarrow missing or unsupported column types); DuckDB scans the DataFrame instead
+            self.table = dataset_cache.load_dataframe(data_path, sheet_name)
+        # No file system access: queries only see the registered dataset
+        self._conn = duckdb.connect(config={"enable_external_access": False})
+        self.queries = 0
+        self.total_time = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _read_only_statement(sql: str):
+        """The single SELECT statement of sql; DuckDB would run every statement it is given, so anything else is refused"""
+        try:
+            statements = duckdb.extract_statements(sql)
+        except Exception as e:
+            return None, f"Error: {type(e).__name__}: {e}"
+        if len(statements) != 1:
+            return None, f"Error: send exactly one SQL statement per query (got {len(statements)})"
+        if statements[0].type != duckdb.StatementType.SELECT:
+            return None, (f"Error: only read-only SELECT queries (including WITH, FROM, DESCRIBE, SUMMARIZE and VALUES) "
+                          f"are allowed, got {statements[0].type.name}")
+        return statements[0], None
+
+    def query(self, sql: str, limit: int = 50) -> str:
+        """Run one read-only query and render at most limit rows with the query time"""
+        statement, error = self._read_only_statement(sql)
+        if error:
+            return error
+
+        # Registrations are per connection, so every query gets its own cursor and registers the table on it
+        cursor = self._conn.cursor()
+        cursor.register(SQL_TABLE_NAME, self.table)
+        timer = threading.Timer(self.timeout, cursor.interrupt)
+        started = time.perf_counter()
+        timer.start()
+        try:
+            cursor.execute(statement)
+            columns = [column[0] for column in cursor.description or []]
+            rows = cursor.fetchmany(limit + 1)
+        except Exception as e:
+            if isinstance(e, duckdb.InterruptException):
+                return f"Error: query exceeded {self.timeout:.0f}s and was interrupted"
+            return f"Error: {type(e).__name__}: {e}"
+        finally:
+            timer.cancel()
+            elapsed = time.perf_counter() - started
+            cursor.close()
+            with self._lock:
+                self.queries += 1
+                self.total_time += elapsed
+
+        truncated = len(rows) > limit
+        rows = rows[:limit]
+        text = pd.DataFrame(rows, columns=columns).to_string(index=False) if columns else "(no result)"
+        count = f"first {limit} rows shown, more available" if truncated else f"{len(rows)} rows"
+        return f"{text}\n({count}; {elapsed * 1000:.1f} ms)"
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"queries": self.queries, "total_time": round(self.total_time, 3)}
+
+
+_engines: Dict[str, SQLEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_sql_engine(data_path: str, sheet_name: Any = 0, dataset_cache: Optional[DatasetCache] = None) -> SQLEngine:
+    """Engine of a dataset, shared per content fingerprint within the process"""
+    dataset_cache = dataset_cache or default_dataset_cache
+    fingerprint = dataset_cache.fingerprint(data_path, sheet_name)
+    with _engines_lock:
+        if fingerprint not in _engines:
+            _engines[fingerprint] = SQLEngine(data_path, sheet_name, dataset_cache)
+        return _engines[fingerprint]
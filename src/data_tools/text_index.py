@@ -0,0 +1,317 @@
+"""
+Inverted index over the dataset's text columns
+
+Text claims ("many comments repeat the phrase X", "accounts mention Y") otherwise
+make the agent run df[column].str.contains(...) over every row, once per question
+and evidence. The index maps tokens to sorted posting lists of row positions.
+Tokenisation is CJK-aware: runs of Chinese/Japanese/Korean characters are split
+into character unigrams and bigrams (the data has no word boundaries), and other
+text into case-folded words. A query intersects posting lists and then confirms
+multi-token terms and phrases by substring match on the candidate rows only.
+The index is built once per dataset fingerprint, saved beside the dataset (see
+DatasetCache.text_index) and available in analyze_data as `text_index`.
+
+Query syntax: terms are ANDed, "quoted phrases" match exactly, OR joins the
+terms on either side, and -term or NOT term excludes rows. When several columns
+are searched, a term matches a row if any of its columns contains it; AND, OR and
+NOT then combine those row sets, so an exclusion applies to every column.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .profile import as_datetimes
+
+
+CJK_RANGES = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af"  # CJK ideographs, kana, hangul
+TOKEN_PATTERN = re.compile(rf"[{CJK_RANGES}]+|[^\W_{CJK_RANGES}]+")
+QUERY_PATTERN = re.compile(r'-?"[^"]*"|\S+')
+MAX_TOKEN_LENGTH = 32
+
+
+def normalize_text(text: Any) -> str:
+    """NFKC, case folded, whitespace collapsed"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", str(text))).strip().casefold()
+
+
+def _is_cjk(run: str) -> bool:
+    return bool(re.match(rf"[{CJK_RANGES}]", run))
+
+
+def tokenize(text: Any) -> List[str]:
+    """Words, plus character unigrams and bigrams of CJK runs"""
+    tokens = []
+    for run in TOKEN_PATTERN.findall(normalize_text(text)):
+        if _is_cjk(run):
+            tokens.extend(run)
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run[:MAX_TOKEN_LENGTH])
+    return tokens
+
+
+def _query_tokens(term: str) -> List[str]:
+    """Tokens that every row containing term must have (bigrams suffice for CJK runs of two or more characters)"""
+    tokens = []
+    for run in TOKEN_PATTERN.findall(normalize_text(term)):
+        if _is_cjk(run) and len(run) > 1:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        elif _is_cjk(run):
+            tokens.append(run)
+        else:
+            tokens.append(run[:MAX_TOKEN_LENGTH])
+    return tokens
+
+
+def parse_query(query: str) -> Tuple[List[List[str]], List[str]]:
+    """AND-ed groups of OR-ed terms, and the excluded terms"""
+    groups: List[List[str]] = []
+    excluded: List[str] = []
+    join_next = negate_next = False
+    for item in QUERY_PATTERN.findall(query):
+        if item == "OR":
+            join_next = True
+            continue
+        if item in ("AND", "NOT"):
+            negate_next = item == "NOT"
+            continue
+        negate = negate_next or (item.startswith("-") and len(item) > 1)
+        term = item[1:] if item.startswith("-") and len(item) > 1 else item
+        term = term.strip('"')
+        if negate:
+            excluded.append(term)
+        elif join_next and groups:
+            groups[-1].append(term)
+        else:
+            groups.append([term])
+        join_next = negate_next = False
+    return groups, excluded
+
+
+def evaluate_query(query: str, term_rows: Callable[[str], np.ndarray], rows: int) -> np.ndarray:
+    """Sorted rows matching a query, given the rows of each term"""
+    groups, excluded = parse_query(query)
+    matched = np.arange(rows, dtype=np.int32)
+    for group in groups:
+        alternatives = np.unique(np.concatenate([term_rows(term) for term in group]))
+        matched = np.intersect1d(matched, alternatives, assume_unique=True)
+    for term in excluded:
+        matched = np.setdiff1d(matched, term_rows(term), assume_unique=True)
+    return matched
+
+
+class StringStore:
+    """Strings kept as one UTF-8 buffer with offsets, so they can be saved without pickling"""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> "StringStore":
+        encoded = [string.encode("utf-8") for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8).copy(), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, position: int) -> str:
+        return self.data[self.offsets[position]:self.offsets[position + 1]].tobytes().decode("utf-8")
+
+
+class TextIndex:
+    """
+    Inverted index of one text column; rows are positions in the original dataset
+
+    Usage:
+        index = text_index["comment"]
+        rows = index.search('論文 -"fake thesis"')
+        index.count("蔡英文 OR tsai")
+    """
+
+    def __init__(self, vocabulary: StringStore, offsets: np.ndarray, postings: np.ndarray, texts: StringStore):
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.postings_data = postings
+        self.texts = texts
+        self.rows = len(texts)
+        self._token_ids = {vocabulary[i]: i for i in range(len(vocabulary))}
+
+    @classmethod
+    def build(cls, texts: Sequence[Any]) -> "TextIndex":
+        postings = defaultdict(list)
+        strings = []
+        for row, text in enumerate(texts):
+            text = "" if text is None or (isinstance(text, float) and np.isnan(text)) else str(text)
+            strings.append(text)
+            for token in set(tokenize(text)):
+                postings[token].append(row)
+
+        tokens = sorted(postings)
+        offsets = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum([len(postings[token]) for token in tokens], out=offsets[1:])
+        data = np.fromiter((row for token in tokens for row in postings[token]), dtype=np.int32, count=int(offsets[-1]))
+        return cls(StringStore.from_strings(tokens), offsets, data, StringStore.from_strings(strings))
+
+    def postings(self, token: str) -> np.ndarray:
+        """Sorted rows containing a token"""
+        token_id = self._token_ids.get(token)
+        if token_id is None:
+            return np.array([], dtype=np.int32)
+        return self.postings_data[self.offsets[token_id]:self.offsets[token_id + 1]]
+
+    def term_rows(self, term: str) -> np.ndarray:
+        """Rows containing a word or phrase"""
+        tokens = _query_tokens(term)
+        if not tokens:
+            return np.array([], dtype=np.int32)
+        # Intersect the shortest posting lists first
+        lists = sorted((self.postings(token) for token in set(tokens)), key=len)
+        rows = lists[0]
+        for posting in lists[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, posting, assume_unique=True)
+        if len(tokens) == 1 and not _is_cjk(tokens[0]):
+            return rows
+        # Several tokens (or a CJK substring): confirm the exact phrase on the candidates only
+        phrase = normalize_text(term)
+        return rows[[phrase in normalize_text(self.texts[row]) for row in rows]] if len(rows) else rows
+
+    def search(self, query: str) -> np.ndarray:
+        """Sorted rows matching a query (see the module docstring for the syntax)"""
+        return evaluate_query(query, self.term_rows, self.rows)
+
+    def count(self, query: str) -> int:
+        return len(self.search(query))
+
+    def texts_of(self, rows: Iterable[int]) -> List[str]:
+        return [self.texts[row] for row in rows]
+
+
+class DatasetTextIndex:
+    """TextIndex per text column of a dataset, accessed as text_index["column"]"""
+
+    def __init__(self, indexes: Dict[str, TextIndex]):
+        self.indexes = indexes
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "DatasetTextIndex":
+        """Index the string columns that are not timestamps"""
+        indexes = {}
+        for name in df.columns:
+            series = df[name]
+            if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+                continue
+            values = series.dropna()
+            if values.empty or not all(isinstance(value, str) for value in values.head(200)):
+                continue
+            if as_datetimes(series) is not None:
+                continue
+            indexes[str(name)] = TextIndex.build(series.tolist())
+        return cls(indexes)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.indexes)
+
+    def __getitem__(self, column: str) -> TextIndex:
+        if column not in self.indexes:
+            raise KeyError(f"No text index for {column!r}; indexed text columns: {', '.join(self.indexes) or 'none'}")
+        return self.indexes[column]
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.indexes
+
+    @property
+    def rows_count(self) -> int:
+        return next(iter(self.indexes.values())).rows if self.indexes else 0
+
+    def term_rows(self, term: str, columns: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Rows where any of the columns (default: all indexed text columns) contains the term"""
+        indexes = [self[column] for column in columns] if columns else list(self.indexes.values())
+        if not indexes:
+            return np.array([], dtype=np.int32)
+        return np.unique(np.concatenate([index.term_rows(term) for index in indexes]))
+
+    def search(self, query: str, column: Optional[str] = None) -> np.ndarray:
+        """Rows matching the query in one column, or across all indexed text columns"""
+        if column is not None:
+            return self[column].search(query)
+        return evaluate_query(query, self.term_rows, self.rows_count)
+
+    def count(self, query: str, column: Optional[str] = None) -> int:
+        return len(self.search(query, column))
+
+    def rows(self, df: pd.DataFrame, query: str, column: Optional[str] = None) -> pd.DataFrame:
+        """Matching rows of df (which must still have the original row order)"""
+        return df.iloc[self.search(query, column)]
+
+    def save(self, path: str):
+        arrays = {"names": np.array(list(self.indexes), dtype=str)}
+        for i, index in enumerate(self.indexes.values()):
+            arrays.update({
+                f"vocabulary_data_{i}": index.vocabulary.data, f"vocabulary_offsets_{i}": index.vocabulary.offsets,
+                f"offsets_{i}": index.offsets, f"postings_{i}": index.postings_data,
+                f"texts_data_{i}": index.texts.data, f"texts_offsets_{i}": index.texts.offsets,
+            })
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "DatasetTextIndex":
+        with np.load(path, allow_pickle=False) as arrays:
+            names = [str(name) for name in arrays["names"]]
+            return cls({
+                name: TextIndex(
+                    StringStore(arrays[f"vocabulary_data_{i}"], arrays[f"vocabulary_offsets_{i}"]),
+                    arrays[f"offsets_{i}"], arrays[f"postings_{i}"],
+                    StringStore(arrays[f"texts_data_{i}"], arrays[f"texts_offsets_{i}"]),
+                )
+                for i, name in enumerate(names)
+            })
+
+    def __repr__(self) -> str:
+        return f"DatasetTextIndex({', '.join(f'{name}: {len(index._token_ids)} tokens' for name, index in self.indexes.items())})"
+
+
+def search_text(text_index: Optional[DatasetTextIndex], df: Optional[pd.DataFrame], query: str,
+                column: Optional[str] = None, by: Optional[str] = None, limit: int = 10) -> str:
+    """Matching row count, most common matching texts and (with by) the distinct values of another column among them"""
+    if text_index is None:
+        return "Error: the text index is not available"
+    rows = text_index.search(query, column)
+    columns = [column] if column else text_index.columns
+    total = text_index.rows_count
+    lines = [f"{len(rows)} of {total} rows match {query!r} in {', '.join(columns)}"]
+    if not len(rows):
+        return lines[0]
+
+    # Texts of the matching rows from the columns that contain a searched term, not every text column
+    terms = [term for group in parse_query(query)[0] for term in group]
+    texts = []
+    for name in columns:
+        index = text_index[name]
+        shown = np.intersect1d(rows, np.unique(np.concatenate([index.term_rows(term) for term in terms]))) if terms else rows
+        texts.extend(index.texts_of(shown))
+    texts = pd.Series(texts)
+    top = texts.value_counts().head(limit)
+    lines.append("Most common matching texts:\n" + "\n".join(
+        f"  {count} x {text[:100]}" for text, count in top.items()))
+
+    if by is not None:
+        if df is None or by not in df.columns:
+            lines.append(f"Column {by!r} is not available in df")
+        elif len(df) != total:
+            lines.append(f"df no longer has the original {total} rows; reload it to count {by}")
+        else:
+            values = df[by].iloc[rows]
+            lines.append(f"{values.nunique()} distinct {by}; top: " + ", ".join(
+                f"{value} ({count})" for value, count in values.value_counts().head(limit).items()))
+    return "\n".join(lines)
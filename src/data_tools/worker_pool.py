@@ -0,0 +1,299 @@
+"""
+Process-isolated execution of the ReAct agent's analysis code
+
+A REPLWorkerPool keeps a fixed set of worker processes that already hold the
+dataset. The parent converts the dataset and builds its indexes once; the workers
+memory-map the same cache files, so they share the pages through the OS page
+cache. Workers are started from a forkserver (spawn where unavailable), never
+forked from the multithreaded parent. Each ReAct run gets a PooledAnalysisSession
+that is pinned to one worker and owns a private namespace in it. CPU-heavy pandas
+code from concurrent records therefore runs on separate cores, and one record's
+variables never leak into another's.
+"""
+
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from langchain_experimental.utilities import PythonREPL
+
+from .analysis_tools import call_analysis_function
+from .dataset_cache import DatasetCache, enable_copy_on_write
+from .session import MATPLOTLIB_SETUP
+from .sql_engine import get_sql_engine
+
+
+# Read-only dataset indexes exposed in every session namespace (DatasetCache methods of the same name)
+INDEX_NAMES = ("time_index", "text_index")
+
+
+def _worker_main(conn, data_path: str, sheet_name: Any, cache_dir: Optional[str]):
+    """Serve run/call/close requests for the sessions pinned to this worker"""
+    PythonREPL(_globals={}, _locals=None).run(MATPLOTLIB_SETUP)
+    enable_copy_on_write()
+
+    # The parent already wrote the cache files; loading them only maps the pages
+    load_error = None
+    base_df = None
+    dataset_cache = DatasetCache(cache_dir)
+    try:
+        base_df = dataset_cache.load_dataframe(data_path, sheet_name)
+    except Exception as e:
+        load_error = f"Could not preload dataset {data_path}: {e}"
+    indexes = {}
+    for name in INDEX_NAMES:
+        try:
+            indexes[name] = getattr(dataset_cache, name)(data_path, sheet_name)
+        except Exception:
+            indexes[name] = None
+
+    sessions: Dict[int, PythonREPL] = {}
+    while True:
+        try:
+            command, session_id, payload = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        if command == "stop":
+            break
+        if command == "close":
+            sessions.pop(session_id, None)
+            continue
+
+        repl = sessions.get(session_id)
+        if repl is None:
+            namespace = {"pd": pd, "data_path": data_path}
+            if base_df is not None:
+                namespace["df"] = base_df.copy(deep=False)
+                namespace.update(indexes)
+            repl = sessions[session_id] = PythonREPL(_globals=namespace, _locals=None)
+
+        if command == "call":
+            name, arguments = payload
+            output = load_error or call_analysis_function(repl.globals, name, arguments)
+        else:
+            output = repl.run(payload)
+            if load_error and "df" not in repl.globals:
+                output = f"{load_error}\n{output}"
+        conn.send(output)
+
+    conn.close()
+
+
+class _WorkerHandle:
+    """Parent-side state of one worker process"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.lock = threading.Lock()
+        self.sessions = set()
+        # Sessions whose namespace was lost when the worker was restarted for another session
+        self.lost_sessions = set()
+        self.executions = 0
+        self.busy_time = 0.0
+        self.restarts = 0
+
+
+class REPLWorkerPool:
+    """
+    Pool of pre-loaded worker processes executing analyze_data code
+
+    Usage:
+        pool = REPLWorkerPool("data/yt_tsai_secret.xlsx", workers=4)
+        pool.start()
+        session = pool.open_session()
+        print(session.run("print(df.shape)"))
+        session.close()
+        pool.close()
+    """
+
+    def __init__(self, data_path: str, sheet_name: Any = 0, workers: Optional[int] = None,
+                 dataset_cache: Optional[DatasetCache] = None, timeout: float = 120.0):
+        """
+        Args:
+            data_path: Path to the dataset exposed as `df`
+            sheet_name: Sheet to load when the dataset is an Excel workbook (default: first sheet)
+            workers: Number of worker processes (default: number of CPU cores)
+            dataset_cache: Columnar cache serving the dataset (default: a cache next to the dataset)
+            timeout: Seconds one code execution may take before its worker is restarted
+        """
+        self.data_path = data_path
+        self.sheet_name = sheet_name
+        self.workers = workers or os.cpu_count() or 1
+        self.dataset_cache = dataset_cache or DatasetCache()
+        self.timeout = timeout
+        # Workers are (re)started while the event loop and executor threads run; forking this process
+        # could leave a child blocked on a lock held by another thread, so they come from a clean forkserver
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            # Import pandas, LangChain and this module once in the server rather than in every worker
+            self.context.set_forkserver_preload([__name__])
+        self.handles: List[_WorkerHandle] = []
+        self.load_error: Optional[str] = None
+        self._session_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Convert the dataset, build its indexes and start the workers"""
+        if self.handles:
+            return
+
+        # Write the Arrow file and the saved indexes once, before several workers try to build them at once.
+        # An unreadable dataset must not abort the run: the workers report it to the agent like AnalysisSession does
+        try:
+            self.dataset_cache.load_dataframe(self.data_path, self.sheet_name)
+        except Exception as e:
+            self.load_error = f"Could not preload dataset {self.data_path}: {e}"
+            print(f"⚠️  {self.load_error}")
+        else:
+            for name in INDEX_NAMES:
+                try:
+                    getattr(self.dataset_cache, name)(self.data_path, self.sheet_name)
+                except Exception:
+                    pass
+
+        self.handles = [_WorkerHandle(index) for index in range(self.workers)]
+        for handle in self.handles:
+            self._spawn(handle)
+
+    def _spawn(self, handle: _WorkerHandle):
+        parent_conn, child_conn = self.context.Pipe()
+        handle.process = self.context.Process(
+            target=_worker_main,
+            args=(child_conn, self.data_path, self.sheet_name, self.dataset_cache.cache_dir),
+            name=f"cove-repl-worker-{handle.index}",
+            daemon=True,
+        )
+        handle.process.start()
+        child_conn.close()
+        handle.conn = parent_conn
+
+    def _restart(self, handle: _WorkerHandle, session_id: int):
+        """Replace a hung or crashed worker; the sessions pinned to it lose their state"""
+        handle.process.terminate()
+        handle.process.join(timeout=5)
+        handle.conn.close()
+        handle.restarts += 1
+        # session_id is told by the error it gets now, the other sessions on their next run
+        with self._lock:
+            handle.lost_sessions.update(handle.sessions - {session_id})
+        self._spawn(handle)
+
+    def open_session(self) -> "PooledAnalysisSession":
+        """Create a session pinned to the worker with the fewest open sessions"""
+        self.start()
+        with self._lock:
+            handle = min(self.handles, key=lambda h: len(h.sessions))
+            session_id = next(self._session_ids)
+            handle.sessions.add(session_id)
+        return PooledAnalysisSession(self, handle, session_id)
+
+    def execute(self, handle: _WorkerHandle, session_id: int, payload: Any, command: str = "run") -> str:
+        """Run code, or with command "call" a (name, arguments) analysis function, in a session's namespace inside its worker"""
+        with handle.lock:
+            if command == "run" and session_id in handle.lost_sessions:
+                # Do not run code that may rely on variables of the lost namespace
+                handle.lost_sessions.discard(session_id)
+                return ("Error: the analysis worker was restarted after another run's code timed out or crashed. "
+                        "Variables defined earlier in this session were lost and `df` is reloaded; "
+                        "define them again and re-run this code.")
+            started = time.monotonic()
+            try:
+                handle.conn.send((command, session_id, payload))
+                if not handle.conn.poll(self.timeout):
+                    self._restart(handle, session_id)
+                    return (f"Error: code execution exceeded {self.timeout:.0f}s. "
+                            f"The worker was restarted and previously defined variables were lost; `df` is reloaded.")
+                return handle.conn.recv()
+            except (EOFError, OSError) as e:
+                self._restart(handle, session_id)
+                return f"Error: analysis worker crashed ({e}). Previously defined variables were lost; `df` is reloaded."
+            finally:
+                handle.executions += 1
+                handle.busy_time += time.monotonic() - started
+
+    def release(self, handle: _WorkerHandle, session_id: int):
+        """Drop a session's namespace in its worker"""
+        with self._lock:
+            handle.sessions.discard(session_id)
+            handle.lost_sessions.discard(session_id)
+        with handle.lock:
+            try:
+                handle.conn.send(("close", session_id, None))
+            except (EOFError, OSError):
+                pass
+
+    def close(self):
+        """Stop all workers"""
+        for handle in self.handles:
+            with handle.lock:
+                try:
+                    handle.conn.send(("stop", None, None))
+                except (EOFError, OSError):
+                    pass
+            handle.process.join(timeout=5)
+            if handle.process.is_alive():
+                handle.process.terminate()
+            handle.conn.close()
+        self.handles = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Executions, busy time and restarts per worker"""
+        return {
+            "start_method": self.context.get_start_method(),
+            "workers": [
+                {
+                    "pid": handle.process.pid,
+                    "open_sessions": len(handle.sessions),
+                    "executions": handle.executions,
+                    "busy_time": round(handle.busy_time, 3),
+                    "restarts": handle.restarts,
+                }
+                for handle in self.handles
+            ],
+        }
+
+    def format_stats(self) -> str:
+        lines = [f"REPL worker pool ({len(self.handles)} workers, {self.context.get_start_method()}):"]
+        for handle in self.handles:
+            lines.append(
+                f"  - worker {handle.index} (pid {handle.process.pid}): executions={handle.executions}, "
+                f"busy={handle.busy_time:.1f}s, open sessions={len(handle.sessions)}, restarts={handle.restarts}"
+            )
+        return "\n".join(lines)
+
+
+class PooledAnalysisSession:
+    """AnalysisSession counterpart whose namespace lives in a pool worker"""
+
+    def __init__(self, pool: REPLWorkerPool, handle: _WorkerHandle, session_id: int):
+        self.pool = pool
+        self.handle = handle
+        self.session_id = session_id
+        self.data_path = pool.data_path
+        self.closed = False
+
+    def run(self, python_code: str) -> str:
+        """Execute agent code in the session namespace and return its printed output"""
+        return self.pool.execute(self.handle, self.session_id, python_code)
+
+    def call(self, name: str, arguments: Dict[str, Any]) -> str:
+        """Run a structured analysis function (see analysis_tools) on the session's `df` in its worker"""
+        return self.pool.execute(self.handle, self.session_id, (name, arguments), command="call")
+
+    def query(self, sql: str, limit: int = 50) -> str:
+        """Run a read-only SQL query over the original dataset; DuckDB runs in this process on all cores"""
+        return get_sql_engine(self.pool.data_path, self.pool.sheet_name, self.pool.dataset_cache).query(sql, limit)
+
+    def close(self):
+        """Release the session's namespace in its worker"""
+        if not self.closed:
+            self.closed = True
+            self.pool.release(self.handle, self.session_id)
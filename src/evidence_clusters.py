@@ -0,0 +1,180 @@
+"""
+Near-duplicate evidence clustering with MinHash and LSH
+
+Evidence lists contain many claims that differ only in whitespace, punctuation
+or a single number. Each evidence gets a MinHash signature of its character
+shingles. A banded LSH index over cluster representatives finds candidate
+clusters in constant time per evidence, so the index grows incrementally without
+comparing all pairs. An evidence joins a cluster when its estimated Jaccard
+similarity to the representative reaches the threshold. All members of a cluster
+then share the verification questions and the ReAct data analysis.
+"""
+
+import re
+import threading
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .evidence_memo import evidence_key, normalize_evidence
+
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def evidence_shingles(evidence: Any, size: int = 5) -> List[str]:
+    """Character shingles of the normalised evidence without punctuation (works for CJK text too)"""
+    text = re.sub(r"[^\w\s]", "", normalize_evidence(evidence))
+    text = re.sub(r"\s+", " ", text).strip()
+    if len(text) <= size:
+        return [text]
+    return [text[i:i + size] for i in range(len(text) - size + 1)]
+
+
+def _lsh_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """(bands, rows) minimising the false positive and false negative probability mass around the threshold"""
+    def probability(similarity, bands, rows):
+        return 1 - (1 - similarity ** rows) ** bands
+
+    step = 0.005
+    below = np.arange(0, threshold, step)
+    above = np.arange(threshold, 1 + step / 2, step)
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        false_positive = np.sum(probability(below, bands, rows)) * step
+        false_negative = np.sum(1 - probability(above, bands, rows)) * step
+        if false_positive + false_negative < best_error:
+            best, best_error = (bands, rows), false_positive + false_negative
+    return best
+
+
+class MinHasher:
+    """MinHash signatures from universal hashes (a * x + b) mod p of the shingles' CRC32"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        generator = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = generator.randint(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+        self.b = generator.randint(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+
+    def signature(self, evidence: Any) -> np.ndarray:
+        shingles = evidence_shingles(evidence, self.shingle_size)
+        hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        # uint64 arithmetic wraps around like the reference MinHash implementations
+        permuted = (hashes[:, None] * self.a[None, :] + self.b[None, :]) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0)
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(first == second))
+
+
+class EvidenceClusterIndex:
+    """
+    Incremental MinHash/LSH index assigning every evidence to a near-duplicate cluster
+
+    Usage:
+        index = EvidenceClusterIndex(threshold=0.9)
+        index.add_all(evidences)
+        memo = EvidenceMemo(key_function=index.cluster_key)
+        print(index.format_stats())
+
+    The first evidence of a cluster is its representative; only representatives
+    are stored in the LSH buckets.
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128, shingle_size: int = 5):
+        """
+        Args:
+            threshold: Minimum estimated Jaccard similarity to a cluster's representative
+            num_perm: MinHash permutations per signature
+            shingle_size: Characters per shingle
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError(f"Near-duplicate threshold must be in (0, 1], got {threshold}")
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self.bands, self.rows = _lsh_bands(threshold, num_perm)
+        self.buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self.representatives: List[np.ndarray] = []
+        self.cluster_sizes: List[int] = []
+        self.clusters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def add(self, evidence: Any) -> int:
+        """Cluster id of an evidence, creating a new cluster when no representative is similar enough"""
+        key = evidence_key(evidence)
+        with self._lock:
+            if key in self.clusters:
+                self.cluster_sizes[self.clusters[key]] += 1
+                return self.clusters[key]
+
+        signature = self.hasher.signature(evidence)
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            if key in self.clusters:
+                self.cluster_sizes[self.clusters[key]] += 1
+                return self.clusters[key]
+
+            candidates = {cluster for band, band_key in enumerate(band_keys)
+                          for cluster in self.buckets[band].get(band_key, ())}
+            best_cluster, best_similarity = None, self.threshold
+            for cluster in candidates:
+                similarity = self.hasher.similarity(signature, self.representatives[cluster])
+                if similarity >= best_similarity:
+                    best_cluster, best_similarity = cluster, similarity
+
+            if best_cluster is None:
+                best_cluster = len(self.representatives)
+                self.representatives.append(signature)
+                self.cluster_sizes.append(0)
+                for band, band_key in enumerate(band_keys):
+                    self.buckets[band].setdefault(band_key, []).append(best_cluster)
+
+            self.clusters[key] = best_cluster
+            self.cluster_sizes[best_cluster] += 1
+            return best_cluster
+
+    def add_all(self, evidences: Iterable[Any]) -> int:
+        """Index a collection before evaluation; returns the number of clusters"""
+        for evidence in evidences:
+            self.add(evidence)
+        return len(self.representatives)
+
+    def cluster_key(self, evidence: Any) -> str:
+        """Memo key shared by all members of an evidence's cluster (indexes unseen evidence on the fly)"""
+        with self._lock:
+            cluster = self.clusters.get(evidence_key(evidence))
+        if cluster is None:
+            cluster = self.add(evidence)
+        return f"cluster-{cluster}"
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "threshold": self.threshold,
+            "bands": self.bands,
+            "rows": self.rows,
+            "evidences": sum(self.cluster_sizes),
+            "unique_evidences": len(self.clusters),
+            "clusters": len(self.representatives),
+            # Clusters holding more than one distinct evidence (exact repeats are handled by the evidence memo)
+            "multi_member_clusters": sum(1 for members in Counter(self.clusters.values()).values() if members > 1),
+        }
+
+    def format_stats(self) -> str:
+        stats = self.get_stats()
+        return (
+            f"Near-duplicate clusters (Jaccard >= {self.threshold:g}, LSH {self.bands}x{self.rows}): "
+            f"{stats['unique_evidences']} unique evidences in {stats['clusters']} clusters, "
+            f"{stats['multi_member_clusters']} with near-duplicates"
+        )
@@ -0,0 +1,173 @@
+"""
+Run-wide deduplication of evidence verification
+
+Knowledge-base records often repeat the same found_evidence strings. Evidence is
+normalised (Unicode NFKC, collapsed whitespace, case folded) and hashed. The
+first record that needs an evidence verifies it. Records that contain the same
+evidence later, or concurrently, reuse its questions, answers and assessment
+instead of running the CoVe stages again.
+"""
+
+import asyncio
+import hashlib
+import re
+import threading
+import unicodedata
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+def normalize_evidence(evidence: Any) -> str:
+    """Canonical form of an evidence string used for deduplication"""
+    text = unicodedata.normalize("NFKC", str(evidence))
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def evidence_key(evidence: Any) -> str:
+    return hashlib.sha256(normalize_evidence(evidence).encode("utf-8")).hexdigest()
+
+
+class EvidenceMemo:
+    """
+    Single-flight memo of verified evidences, shared by all records of a run
+
+    Usage:
+        memo = EvidenceMemo()
+        outcome = await memo.aget_or_compute(evidence, lambda: verify(evidence))
+        print(memo.format_stats())
+
+    Works for threads (get_or_compute) and asyncio tasks (aget_or_compute). A
+    computation that fails or is cancelled is not memoised; one of the callers
+    waiting for it takes over.
+    """
+
+    def __init__(self, key_function: Callable[[Any], str] = None, name: str = "Evidence dedup"):
+        """
+        Args:
+            key_function: Maps an evidence to its memo key (default: evidence_key, i.e. exact duplicates after normalisation)
+            name: Label of the stats line
+        """
+        self.key_function = key_function or evidence_key
+        self.name = name
+        self.outcomes: Dict[str, Any] = {}
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+
+    def begin(self, evidence: Any, count: bool = True) -> Tuple[str, Any, Optional[Future]]:
+        """
+        Look up an evidence before verifying it
+
+        Returns:
+            (key, outcome, pending): outcome is set when the evidence was already
+            verified, pending when another caller is verifying it. When both are
+            None the caller owns the verification and must call complete() or
+            abandon() with the key.
+        """
+        key = self.key_function(evidence)
+        with self._lock:
+            if count:
+                self.lookups += 1
+            if key in self.outcomes:
+                self.hits += 1
+                return key, self.outcomes[key], None
+            if key in self._pending:
+                return key, None, self._pending[key]
+            self._pending[key] = Future()
+            return key, None, None
+
+    def complete(self, key: str, outcome: Any):
+        with self._lock:
+            self.outcomes[key] = outcome
+            pending = self._pending.pop(key, None)
+        if pending is not None:
+            pending.set_result(outcome)
+
+    def abandon(self, key: str):
+        """Give up ownership of a verification that failed or was cancelled"""
+        with self._lock:
+            pending = self._pending.pop(key, None)
+        if pending is not None:
+            # Waiters receive None and retry, so one of them becomes the new owner
+            pending.set_result(None)
+
+    def _record_hit(self, outcome: Any) -> Any:
+        if outcome is not None:
+            with self._lock:
+                self.hits += 1
+        return outcome
+
+    def wait(self, pending: Future) -> Any:
+        """Block until another caller's verification finishes (None when it was abandoned)"""
+        return self._record_hit(pending.result())
+
+    async def await_pending(self, pending: Future) -> Any:
+        """Async counterpart of wait; cancelling the waiter does not affect the owner"""
+        return self._record_hit(await asyncio.shield(asyncio.wrap_future(pending)))
+
+    def get_or_compute(self, evidence: Any, compute: Callable[[], Any]) -> Any:
+        count = True
+        while True:
+            key, outcome, pending = self.begin(evidence, count)
+            count = False
+            if outcome is not None:
+                return outcome
+            if pending is not None:
+                outcome = self.wait(pending)
+                if outcome is not None:
+                    return outcome
+                continue
+            try:
+                outcome = compute()
+            except BaseException:
+                self.abandon(key)
+                raise
+            self.complete(key, outcome)
+            return outcome
+
+    async def aget_or_compute(self, evidence: Any, compute: Callable[[], Any]) -> Any:
+        """compute returns the coroutine verifying the evidence"""
+        count = True
+        while True:
+            key, outcome, pending = self.begin(evidence, count)
+            count = False
+            if outcome is not None:
+                return outcome
+            if pending is not None:
+                outcome = await self.await_pending(pending)
+                if outcome is not None:
+                    return outcome
+                continue
+            try:
+                outcome = await compute()
+            except BaseException:
+                self.abandon(key)
+                raise
+            self.complete(key, outcome)
+            return outcome
+
+    @staticmethod
+    def count_unique(evidences: Iterable[Any]) -> Tuple[int, int]:
+        """(total, unique) evidence items of a collection, e.g. to estimate the saving before a run"""
+        keys = [evidence_key(evidence) for evidence in evidences]
+        return len(keys), len(set(keys))
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Fraction of evidence lookups served without verifying again"""
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "lookups": self.lookups,
+            "unique_verified": len(self.outcomes),
+            "reused": self.hits,
+            "dedup_ratio": round(self.dedup_ratio, 4),
+        }
+
+    def format_stats(self) -> str:
+        return (
+            f"{self.name}: {self.lookups} evidence items, {len(self.outcomes)} unique verified, "
+            f"{self.hits} reused (dedup ratio {self.dedup_ratio:.1%})"
+        )
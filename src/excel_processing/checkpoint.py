@@ -0,0 +1,132 @@
+"""
+Append-only checkpoint store for CoVe evaluation results
+
+Every completed record is appended as one JSON line, so saving progress costs a
+single small write instead of rewriting the whole results workbook. The Excel (or
+Parquet) report is exported from the checkpoint once at the end of a run or on
+demand, and --continue-from resumes directly from the checkpoint.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+
+CHECKPOINT_SUFFIX = ".jsonl"
+
+
+def _to_json_value(value: Any) -> Any:
+    """JSON fallback for values that are not plain data (e.g. AIMessage results)"""
+    if hasattr(value, "content"):
+        return value.content
+    if hasattr(value, "item"):
+        # numpy scalars such as the iteration number read from Excel
+        return value.item()
+    return str(value)
+
+
+def checkpoint_path_for(results_file: str) -> str:
+    """Checkpoint file that belongs to a cove_results_*.xlsx report"""
+    return os.path.splitext(results_file)[0] + CHECKPOINT_SUFFIX
+
+
+class CheckpointStore:
+    """
+    JSONL file with one evaluation result per line
+
+    Usage:
+        checkpoint = CheckpointStore("results/cove_results_20250101_120000.jsonl")
+        checkpoint.append(result)
+        results = checkpoint.load()
+        checkpoint.export("results/cove_results_20250101_120000.xlsx")
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Checkpoint file (created on the first append)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._tail_checked = False
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def append(self, result: Dict[str, Any]):
+        """Write one completed record"""
+        line = json.dumps(result, ensure_ascii=False, default=_to_json_value)
+        with self._lock:
+            if not self._tail_checked:
+                # A run killed mid-write leaves a torn last line; start on a new one instead of extending it
+                if not self._ends_with_newline():
+                    line = "\n" + line
+                self._tail_checked = True
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+
+    def _ends_with_newline(self) -> bool:
+        """True for a missing or empty file and for one whose last line is complete"""
+        if not self.exists() or os.path.getsize(self.path) == 0:
+            return True
+        with open(self.path, "rb") as file:
+            file.seek(-1, os.SEEK_END)
+            return file.read(1) == b"\n"
+
+    def extend(self, results: List[Dict[str, Any]]):
+        """Write several records (used to seed a checkpoint from an older Excel report)"""
+        for result in results:
+            self.append(result)
+
+    def load(self) -> List[Dict[str, Any]]:
+        """
+        Read all records, keeping the last entry per iteration
+
+        A truncated last line (the process was killed mid-write) is ignored.
+        """
+        if not self.exists():
+            return []
+
+        records: Dict[Any, Dict[str, Any]] = {}
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line_number, line in enumerate(file, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Ignoring unreadable checkpoint line {line_number} in {self.path}")
+                    continue
+                records[record.get("iteration", f"line_{line_number}")] = record
+        return list(records.values())
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.load())
+
+    def export(self, output_file: Optional[str] = None) -> str:
+        """
+        Write the checkpoint as a report
+
+        Args:
+            output_file: .xlsx or .parquet path (default: the checkpoint path with .xlsx)
+
+        Returns:
+            Path of the written report
+        """
+        output_file = output_file or os.path.splitext(self.path)[0] + ".xlsx"
+        results_df = self.to_dataframe()
+        if output_file.endswith(".parquet"):
+            results_df.to_parquet(output_file, index=False)
+        else:
+            results_df.to_excel(output_file, index=False)
+        return output_file
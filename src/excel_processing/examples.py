@@ -31,7 +31,17 @@ async def process_knowledge_base(
     limit=3,
     model_config=None,
     continue_from=None,
-    concurrent_tasks=5
+    concurrent_tasks=5,
+    max_concurrent_evidences=1,
+    stage_workers=None,
+    early_exit=False,
+    repl_workers=None,
+    min_concurrent_tasks=1,
+    max_concurrent_tasks=None,
+    dedup_evidence=True,
+    near_duplicate_threshold=None,
+    verdict_store=None,
+    invalidate_verdicts=False
 ):
     """
     Process knowledge base file and run CoVe evaluation
@@ -43,7 +53,17 @@ async def process_knowledge_base(
         limit: Maximum number of records to evaluate (None for all records)
         model_config: ModelConfig instance to use for evaluation
         continue_from: Path to existing results file to continue from
-        concurrent_tasks: Maximum number of concurrent tasks to run (default: 5)
+        concurrent_tasks: Initial number of concurrent records, adapted at runtime (default: 5)
+        max_concurrent_evidences: Maximum number of evidences per record verified in parallel (default: 1)
+        stage_workers: Workers per CoVe stage for stage-pipelined execution (default: None, disabled)
+        early_exit: Skip remaining evidences once one is VERIFIED with HIGH confidence (default: False)
+        repl_workers: Number of worker processes executing the ReAct analysis code (default: None, in-process; 0 uses all CPU cores)
+        min_concurrent_tasks: Lower bound of the adaptive record concurrency (default: 1)
+        max_concurrent_tasks: Upper bound of the adaptive record concurrency (default: 4 x concurrent_tasks)
+        dedup_evidence: Verify repeated found_evidence strings once per run and reuse the result (default: True)
+        near_duplicate_threshold: Share questions and ReAct analysis between near-identical evidences at this MinHash similarity (default: None, disabled)
+        verdict_store: VerdictStore with per-evidence results of earlier runs (default: None)
+        invalidate_verdicts: Drop the stored verdicts of the current dataset and configuration first (default: False)
         
     Returns:
         Path to results file
@@ -144,7 +164,17 @@ async def process_knowledge_base(
         model_config=model_config,
         print_config=False,  # Avoid duplicate printing of model configuration
         output_dir=output_dir,
-        concurrent_tasks=concurrent_tasks
+        concurrent_tasks=concurrent_tasks,
+        max_concurrent_evidences=max_concurrent_evidences,
+        stage_workers=stage_workers,
+        early_exit=early_exit,
+        repl_workers=repl_workers,
+        min_concurrent_tasks=min_concurrent_tasks,
+        max_concurrent_tasks=max_concurrent_tasks,
+        dedup_evidence=dedup_evidence,
+        near_duplicate_threshold=near_duplicate_threshold,
+        verdict_store=verdict_store,
+        invalidate_verdicts=invalidate_verdicts
     )
     
     # Evaluate data with limit
@@ -8,6 +8,7 @@ import os
 import argparse
 import pandas as pd
 import asyncio
+import time
 from datetime import datetime
 from typing import List, Dict, Any, Set, Optional
 from pathlib import Path
@@ -22,6 +23,13 @@ load_dotenv(dotenv_path=env_path)
 # Import from parent package
 from src.config import ModelConfig
 from src.osint_verification_chain import OSINTCOVEChain
+from src.cove_pipeline import CoVeStagePipeline
+from src.data_tools import REPLWorkerPool
+from src.adaptive_concurrency import AdaptiveConcurrencyController
+from src.evidence_memo import EvidenceMemo
+from src.evidence_clusters import EvidenceClusterIndex
+from src.verdict_store import VerdictStore
+from .checkpoint import CheckpointStore, checkpoint_path_for
 
 class ExcelProcessor:
     def __init__(self, input_file: str, sheet_name: str, timestamp_column: str):
@@ -74,7 +82,12 @@ class ExcelProcessor:
 
 class CoVeEvaluator:
     def __init__(self, data_path: str, model_config: ModelConfig, evidence_column: str = 'found_evidence', 
-                 print_config: bool = False, output_dir: str = 'results', concurrent_tasks: int = 5):
+                 print_config: bool = False, output_dir: str = 'results', concurrent_tasks: int = 5,
+                 max_concurrent_evidences: int = 1, stage_workers: Optional[Dict[str, int]] = None,
+                 early_exit: bool = False, repl_workers: Optional[int] = None,
+                 min_concurrent_tasks: int = 1, max_concurrent_tasks: Optional[int] = None,
+                 dedup_evidence: bool = True, near_duplicate_threshold: Optional[float] = None,
+                 verdict_store: Optional[VerdictStore] = None, invalidate_verdicts: bool = False):
         """
         Initialize CoVe evaluator
         
@@ -84,7 +97,18 @@ class CoVeEvaluator:
             evidence_column: Name of column containing evidence (default: found_evidence)
             print_config: Whether to print the model configuration (default: False)
             output_dir: Directory to save output files (default: results)
-            concurrent_tasks: Maximum number of concurrent tasks (default: 5)
+            concurrent_tasks: Initial number of concurrent records; adapted at runtime (default: 5)
+            max_concurrent_evidences: Maximum number of evidences per record verified in parallel (default: 1)
+            stage_workers: Workers per CoVe stage; when set, records run through the stage-pipelined scheduler (default: None)
+            early_exit: Skip the remaining evidences of a record once one is VERIFIED with HIGH confidence (default: False)
+            repl_workers: Run the ReAct analysis code in this many pre-loaded worker processes (default: None, in-process; 0 uses all CPU cores)
+            min_concurrent_tasks: Lower bound of the adaptive record concurrency (default: 1)
+            max_concurrent_tasks: Upper bound of the adaptive record concurrency (default: 4 x concurrent_tasks)
+            dedup_evidence: Verify each unique (normalised) evidence once per run and reuse its result across records (default: True)
+            near_duplicate_threshold: Share questions and ReAct analysis between evidences whose estimated Jaccard
+                similarity reaches this threshold, e.g. 0.9 (default: None, disabled)
+            verdict_store: Reuse per-evidence results of earlier runs on the same dataset and configuration (default: None)
+            invalidate_verdicts: Drop the stored verdicts of the current dataset and configuration before evaluating (default: False)
         """
         # 直接使用環境變數
         api_key = os.getenv("OPENAI_API_KEY")
@@ -102,20 +126,62 @@ class CoVeEvaluator:
         self.evidence_column = evidence_column
         self.output_dir = output_dir
         self.concurrent_tasks = concurrent_tasks
+        # AIMD 動態調整同時處理的記錄數：健康時逐步增加，遇到 Overloaded/429 或延遲暴增時減半
+        self.concurrency = AdaptiveConcurrencyController(
+            initial=concurrent_tasks,
+            min_limit=min_concurrent_tasks,
+            max_limit=max_concurrent_tasks or max(concurrent_tasks * 4, min_concurrent_tasks)
+        )
+        self.max_concurrent_evidences = max_concurrent_evidences
         os.makedirs(output_dir, exist_ok=True)
         
         # Create timestamp for this evaluation session
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.results_file = os.path.join(output_dir, f"cove_results_{self.timestamp}.xlsx")
+        # 每完成一筆記錄只追加一行 JSONL，Excel 報表在結束時才輸出
+        self.checkpoint = CheckpointStore(checkpoint_path_for(self.results_file))
         
         # 創建 OpenAI 客戶端，直接使用環境變數
         self.client = OpenAI(api_key=api_key)
         
         self.model_config = model_config
+        self.model_config.add_callback(self.concurrency.callback_handler())
         
         # 使用原始數據路徑（通常是 yt_tsai_secret.xlsx）
         self.analysis_data_path = "data/yt_tsai_secret.xlsx"
-        self.chain = OSINTCOVEChain(model_config=self.model_config, data_path=self.analysis_data_path)()
+        
+        # 多進程 REPL worker pool（可選）：worker 由 forkserver 啟動，透過記憶體映射的快取檔共享資料集
+        self.worker_pool = None
+        if repl_workers is not None:
+            self.worker_pool = REPLWorkerPool(self.analysis_data_path, workers=repl_workers or None)
+            self.worker_pool.start()
+        
+        # 同一次執行中重複出現的 evidence 只驗證一次，結果分派給所有包含它的記錄
+        self.evidence_memo = EvidenceMemo() if dedup_evidence else None
+        
+        # 近似重複的 evidence（僅空白、標點或單一數字不同）共用驗證問題與 ReAct 分析，final assessment 仍逐筆執行
+        self.cluster_index = None
+        self.analysis_memo = None
+        if near_duplicate_threshold:
+            self.cluster_index = EvidenceClusterIndex(threshold=near_duplicate_threshold)
+            self.analysis_memo = EvidenceMemo(key_function=self.cluster_index.cluster_key, name="Near-duplicate analysis reuse")
+        
+        self.cove_chain = OSINTCOVEChain(
+            model_config=self.model_config,
+            data_path=self.analysis_data_path,
+            max_concurrent_evidences=self.max_concurrent_evidences,
+            early_exit=early_exit,
+            worker_pool=self.worker_pool,
+            evidence_memo=self.evidence_memo,
+            analysis_memo=self.analysis_memo,
+            verdict_store=verdict_store
+        )
+        if verdict_store is not None and invalidate_verdicts:
+            print(f"Invalidated {self.cove_chain.invalidate_verdicts()} stored verdicts for {self.analysis_data_path}")
+        self.chain = self.cove_chain()
+        
+        # 分階段流水線排程（可選）
+        self.pipeline = CoVeStagePipeline(self.cove_chain, stage_workers) if stage_workers is not None else None
         
         # Print the configuration if requested
         if print_config:
@@ -125,13 +191,14 @@ class CoVeEvaluator:
         # Set to track processed iterations to avoid duplication
         self.processed_iterations = set()
         
-    async def process_evidence(self, evidence: Any) -> List[str]:
-        """Convert evidence to list format"""
-        print(f"Processing evidence of type: {type(evidence)}")
+    async def process_evidence(self, evidence: Any, verbose: bool = True) -> List[str]:
+        """Convert evidence to list format (verbose=False suppresses the per-item log, e.g. when indexing all records)"""
+        log = print if verbose else (lambda *args, **kwargs: None)
+        log(f"Processing evidence of type: {type(evidence)}")
         
         # Handle various evidence formats
         if evidence is None:
-            print("Evidence is None, returning empty list")
+            log("Evidence is None, returning empty list")
             return []
             
         # Handle NaN values
@@ -139,25 +206,25 @@ class CoVeEvaluator:
             if hasattr(evidence, 'any'):
                 # For Series-like objects
                 if pd.isna(evidence).any():
-                    print("Evidence contains NaN values, returning empty list")
+                    log("Evidence contains NaN values, returning empty list")
                     return []
             elif pd.isna(evidence):
-                print("Evidence is NaN, returning empty list")
+                log("Evidence is NaN, returning empty list")
                 return []
         except Exception as e:
-            print(f"Error checking for NaN: {e}, treating as non-NaN")
+            log(f"Error checking for NaN: {e}, treating as non-NaN")
             
         evidence_list = []
         
         try:
             if isinstance(evidence, str):
                 # String case - check if it can be parsed as a list/dict
-                print(f"Evidence is string of length {len(evidence)}")
+                log(f"Evidence is string of length {len(evidence)}")
                 try:
                     # Try to evaluate as a Python list/dict
                     import ast
                     evidence_parsed = ast.literal_eval(evidence)
-                    print(f"Successfully parsed as: {type(evidence_parsed)}")
+                    log(f"Successfully parsed as: {type(evidence_parsed)}")
                     
                     # Handle different evidence formats
                     if isinstance(evidence_parsed, list):
@@ -170,19 +237,19 @@ class CoVeEvaluator:
                         # For other types, convert to string
                         evidence_list = [str(evidence_parsed)]
                 except (ValueError, SyntaxError) as e:
-                    print(f"Could not parse as Python object: {e}")
+                    log(f"Could not parse as Python object: {e}")
                     # If evaluation fails, treat as a single string
                     evidence_list = [evidence]
             elif isinstance(evidence, list):
                 # List case
-                print(f"Evidence is a list with {len(evidence)} items")
+                log(f"Evidence is a list with {len(evidence)} items")
                 # Process each list item
                 for i, item in enumerate(evidence):
                     if item is None:
-                        print(f"  Item {i} is None, skipping")
+                        log(f"  Item {i} is None, skipping")
                         continue
                     if pd.isna(item):
-                        print(f"  Item {i} is NaN, skipping")
+                        log(f"  Item {i} is NaN, skipping")
                         continue
                     if isinstance(item, str):
                         evidence_list.append(item)
@@ -190,14 +257,14 @@ class CoVeEvaluator:
                         evidence_list.append(str(item))
             elif isinstance(evidence, dict):
                 # Dictionary case
-                print("Evidence is a dictionary")
+                log("Evidence is a dictionary")
                 evidence_list = [str(evidence)]
             else:
                 # Any other type
-                print(f"Evidence is of type {type(evidence)}")
+                log(f"Evidence is of type {type(evidence)}")
                 evidence_list = [str(evidence)]
         except Exception as e:
-            print(f"Error in evidence processing: {e}")
+            log(f"Error in evidence processing: {e}")
             import traceback
             traceback.print_exc()
             # Return an empty list in case of error
@@ -207,13 +274,13 @@ class CoVeEvaluator:
         filtered_list = []
         for i, item in enumerate(evidence_list):
             if not item:
-                print(f"  Item {i} is empty, skipping")
+                log(f"  Item {i} is empty, skipping")
                 continue
                 
             # Check for NaN values
             try:
                 if pd.isna(item):
-                    print(f"  Item {i} is NaN, skipping")
+                    log(f"  Item {i} is NaN, skipping")
                     continue
             except:
                 pass
@@ -223,9 +290,9 @@ class CoVeEvaluator:
                 item_str = str(item)
                 filtered_list.append(item_str)
             except Exception as e:
-                print(f"  Could not convert item {i} to string: {e}")
+                log(f"  Could not convert item {i} to string: {e}")
                 
-        print(f"Returning {len(filtered_list)} processed evidence items")
+        log(f"Returning {len(filtered_list)} processed evidence items")
         return filtered_list
         
     async def evaluate_record(self, row: pd.Series) -> Dict[str, Any]:
@@ -273,11 +340,11 @@ class CoVeEvaluator:
                 print(f"  {param}")
             
             try:
-                # 運行 CoVe 鏈
-                response = await asyncio.to_thread(
-                    self.chain.invoke,
-                    {"collected_evidence": evidence_list}
-                )
+                # 運行 CoVe 鏈（原生 async，不佔用 thread pool）
+                if self.pipeline is not None:
+                    response = await self.pipeline.submit({"collected_evidence": evidence_list})
+                else:
+                    response = await self.chain.ainvoke({"collected_evidence": evidence_list})
                 
                 print("LLM response received successfully")
                 print("Invoking CoVe chain...")
@@ -289,7 +356,11 @@ class CoVeEvaluator:
                     'evidence_list': evidence_list,
                     'verification_questions': response.get("all_verification_questions", []),
                     'verification_answers': response.get("all_verification_answers", ""),
-                    'final_assessment': response.get("final_verification_result", "")
+                    'final_assessment': response.get("final_verification_result", ""),
+                    'skipped_evidences': response.get("skipped_evidences", []),
+                    'prompt_hashes': response.get("prompt_hashes", {}),
+                    # rule 彙整模式的 LLM 摘要：inline 直接保存，deferred 保存 prompt 輸入供 narrate_deferred 之後補產生
+                    **{key: response[key] for key in ("aggregation_narrative", "aggregation_input") if key in response}
                 }
                 
             except Exception as e:
@@ -333,21 +404,16 @@ class CoVeEvaluator:
         df = pd.read_excel(self.processed_data_path)
         
         # Load existing results if continuing from previous run
+        results = []
         if continue_from and os.path.exists(continue_from):
             try:
-                existing_results = pd.read_excel(continue_from)
-                self.processed_iterations = set(existing_results['iteration'].tolist())
+                results = self.load_checkpoint(continue_from)
+                self.processed_iterations = {result['iteration'] for result in results}
                 print(f"Loaded {len(self.processed_iterations)} existing results from {continue_from}")
-                # Use the existing results file instead of creating a new one
-                self.results_file = continue_from
-                # Initialize results with existing data
-                results = existing_results.to_dict('records')
             except Exception as e:
                 print(f"Error loading existing results: {e}")
                 self.processed_iterations = set()
                 results = []
-        else:
-            results = []
         
         # 限制處理的記錄數量
         if limit is not None:
@@ -356,12 +422,19 @@ class CoVeEvaluator:
             
         print(f"Processing {len(df)} records...")
         print(f"Using analysis data path: {self.analysis_data_path}")
-        print(f"Results will be saved to {self.results_file}")
-        print(f"Maximum concurrent tasks: {self.concurrent_tasks}")
+        print(f"Results will be saved to {self.results_file} (checkpoint: {self.checkpoint.path})")
+        print(f"Adaptive concurrent tasks: start {self.concurrent_tasks}, bounds {self.concurrency.min_limit}-{self.concurrency.max_limit}")
+        print(f"Maximum concurrent evidences per record: {self.max_concurrent_evidences}")
+        if self.pipeline is not None:
+            print(f"Stage-pipelined execution with workers: {self.pipeline.stage_workers}")
+        if self.worker_pool is not None:
+            print(f"Analysis code runs in {self.worker_pool.workers} REPL worker processes")
+        
+        if self.cluster_index is not None:
+            await self.build_cluster_index(df)
         
-        # Create a semaphore to limit concurrent tasks (to avoid API rate limiting)
-        # Adjust this value based on your API limits and available resources
-        semaphore = asyncio.Semaphore(self.concurrent_tasks)  # Process up to N records simultaneously
+        # The adaptive controller limits concurrent records (AIMD on API errors and latency)
+        controller = self.concurrency
         
         # Create tasks for all records
         tasks = []
@@ -374,7 +447,7 @@ class CoVeEvaluator:
                 continue
                 
             # Create task for this record
-            task = self.process_record_with_semaphore(semaphore, i, row, len(df))
+            task = self.process_record_with_controller(controller, i, row, len(df))
             tasks.append(task)
         
         # Process all tasks in parallel
@@ -384,30 +457,65 @@ class CoVeEvaluator:
                 if result:  # Ensure we have a valid result
                     # Add to our in-memory results
                     results.append(result)
-                    # Save immediately to file
-                    self.save_intermediate_results(results)
+                    # Append to the checkpoint (one line per record)
+                    self.save_intermediate_results(result)
                     # Mark as processed
                     self.processed_iterations.add(result['iteration'])
+                    if self.pipeline is not None:
+                        print(self.pipeline.format_stats())
             except Exception as e:
                 print(f"Error processing task: {e}")
                 import traceback
                 traceback.print_exc()
         
-        # Convert results to DataFrame
-        results_df = pd.DataFrame(results)
+        if self.pipeline is not None:
+            print(f"\n{self.pipeline.format_stats()}")
+            await self.pipeline.close()
+        
+        if self.model_config.llm_cache is not None:
+            print(f"\n{self.model_config.llm_cache.format_stats()}")
+        
+        if self.model_config.rate_limiter is not None:
+            print(f"\n{self.model_config.rate_limiter.format_stats()}")
+        
+        if self.evidence_memo is not None:
+            print(f"\n{self.evidence_memo.format_stats()}")
+        if self.analysis_memo is not None:
+            print(self.analysis_memo.format_stats())
+        if self.cove_chain.verdict_store is not None:
+            print(self.cove_chain.verdict_store.format_stats())
+        
+        print(f"\n{self.concurrency.format_stats()}")
+        print(self.cove_chain.format_retry_stats())
+        
+        if self.worker_pool is not None:
+            print(f"\n{self.worker_pool.format_stats()}")
+            self.worker_pool.close()
+        
+        # Build the report from the checkpoint (one row per iteration, resumed records included)
+        results_df = self.checkpoint.to_dataframe() if self.checkpoint.exists() else pd.DataFrame(results)
         
         # Final save to ensure everything is written
         self.save_final_results(results_df)
         
         return results_df
     
-    async def process_record_with_semaphore(self, semaphore, index, row, total):
-        """Process a single record with semaphore to limit concurrency"""
-        async with semaphore:
+    async def build_cluster_index(self, df: pd.DataFrame):
+        """Index the evidences of all pending records into near-duplicate clusters before scheduling them"""
+        started = time.monotonic()
+        for i, (_, row) in enumerate(df.iterrows()):
+            if row.get('iteration', i+1) in self.processed_iterations:
+                continue
+            self.cluster_index.add_all(await self.process_evidence(row[self.evidence_column], verbose=False))
+        print(f"{self.cluster_index.format_stats()} (indexed in {time.monotonic() - started:.1f}s)")
+    
+    async def process_record_with_controller(self, controller, index, row, total):
+        """Process a single record within the adaptive concurrency limit"""
+        async with controller.slot():
             try:
-                print(f"\n===== Processing record {index+1} of {total} (Iteration {row.get('iteration', index+1)}) =====")
+                print(f"\n===== Processing record {index+1} of {total} (Iteration {row.get('iteration', index+1)}) [{controller.status()}] =====")
                 result = await self.evaluate_record(row)
-                print(f"===== Completed record {index+1} =====")
+                print(f"===== Completed record {index+1} [{controller.status()}] =====")
                 return result
             except Exception as e:
                 print(f"Error processing record {index+1}: {e}")
@@ -423,16 +531,76 @@ class CoVeEvaluator:
                     'final_assessment': f"Error processing record: {str(e)}"
                 }
     
-    def save_intermediate_results(self, results):
-        """Save intermediate results to Excel file"""
+    async def narrate_deferred(self, checkpoint_file: Optional[str] = None) -> int:
+        """
+        Generate the LLM narratives of records rule-aggregated with narrative "deferred"
+        
+        Each narrated record is appended to the checkpoint again (the last entry per iteration wins).
+        
+        Args:
+            checkpoint_file: Checkpoint (.jsonl) to narrate (default: this evaluator's checkpoint)
+            
+        Returns:
+            Number of records narrated
+        """
+        checkpoint = CheckpointStore(checkpoint_file) if checkpoint_file else self.checkpoint
+        pending = [record for record in checkpoint.load()
+                   if record.get('aggregation_input') and not record.get('aggregation_narrative')]
+        print(f"Narrating {len(pending)} deferred records in {checkpoint.path}")
+        
+        async def narrate(record):
+            # Checkpoints seeded from an Excel report hold the prompt inputs as text
+            if isinstance(record['aggregation_input'], str):
+                import ast
+                record['aggregation_input'] = ast.literal_eval(record['aggregation_input'])
+            async with self.concurrency.slot():
+                await self.cove_chain.anarrate(record)
+            checkpoint.append(record)
+        
+        narrated = 0
+        for completed_task in asyncio.as_completed([narrate(record) for record in pending]):
+            try:
+                await completed_task
+                narrated += 1
+            except Exception as e:
+                print(f"Error generating narrative: {e}")
+        print(f"Narrated {narrated} of {len(pending)} deferred records")
+        return narrated
+    
+    def load_checkpoint(self, continue_from: str) -> List[Dict[str, Any]]:
+        """
+        Resume from a checkpoint (.jsonl) or an Excel report of an earlier run
+        
+        The evaluator switches to the given run's checkpoint and report files.
+        Excel reports without a checkpoint are copied into a new checkpoint first.
+        """
+        if continue_from.endswith(".jsonl"):
+            checkpoint_file = continue_from
+            self.results_file = os.path.splitext(continue_from)[0] + ".xlsx"
+        else:
+            checkpoint_file = checkpoint_path_for(continue_from)
+            self.results_file = continue_from
+        
+        self.checkpoint = CheckpointStore(checkpoint_file)
+        if not self.checkpoint.exists() and not continue_from.endswith(".jsonl"):
+            existing_results = pd.read_excel(continue_from).to_dict('records')
+            self.checkpoint.extend(existing_results)
+            print(f"Created checkpoint {checkpoint_file} from {continue_from}")
+        
+        return self.checkpoint.load()
+    
+    def save_intermediate_results(self, result: Dict[str, Any]):
+        """Append one completed record to the checkpoint"""
         try:
-            # Convert to DataFrame and save
-            temp_df = pd.DataFrame(results)
-            temp_df.to_excel(self.results_file, index=False)
-            print(f"Saved intermediate results for {len(results)} records to {self.results_file}")
+            self.checkpoint.append(result)
+            print(f"Checkpointed iteration {result['iteration']} to {self.checkpoint.path}")
         except Exception as e:
             print(f"Error saving intermediate results: {e}")
     
+    def export_report(self, output_file: Optional[str] = None) -> str:
+        """Write the checkpointed results as an Excel (or .parquet) report on demand"""
+        return self.checkpoint.export(output_file or self.results_file)
+    
     def save_final_results(self, results_df):
         """Save final results to Excel file"""
         try:
@@ -0,0 +1,225 @@
+"""
+Persistent content-addressed LLM response cache
+
+A size-bounded SQLite store plugged into LangChain's model cache hook. Entries are
+keyed by the model's llm_string (provider class, model name, temperature,
+reasoning_effort, bound tools, ...) plus the fully rendered prompt/messages, so a
+re-run only pays for the calls whose model settings or prompt actually changed.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import warnings
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+
+DEFAULT_CACHE_PATH = ".cove_cache/llm_cache.sqlite"
+
+
+class CacheStats:
+    """Hit/miss counters for one cache view"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": round(self.hit_rate(), 3),
+        }
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed response store with LRU eviction
+
+    Usage:
+        llm_cache = LLMResponseCache(".cove_cache/llm_cache.sqlite", max_size_mb=512)
+        model_config = ModelConfig(llm_cache=llm_cache)
+        ...
+        print(llm_cache.format_stats())
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_size_mb: float = 512):
+        """
+        Args:
+            path: SQLite database file
+            max_size_mb: Upper bound for the stored responses; least recently used entries are evicted beyond it
+        """
+        self.path = path
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.evictions = 0
+        self.stage_stats: Dict[str, CacheStats] = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                llm_string TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def normalise_prompt(prompt: str) -> str:
+        """
+        Drop per-run message ids from a serialized chat prompt
+
+        LangGraph assigns a fresh uuid to every message of a ReAct run, which would
+        otherwise make identical conversations hash differently between runs.
+        """
+        try:
+            messages = json.loads(prompt)
+        except (TypeError, ValueError):
+            return prompt
+
+        def strip_ids(node):
+            if isinstance(node, dict):
+                kwargs = node.get("kwargs")
+                if node.get("lc") and isinstance(kwargs, dict):
+                    kwargs.pop("id", None)
+                for value in node.values():
+                    strip_ids(value)
+            elif isinstance(node, list):
+                for value in node:
+                    strip_ids(value)
+
+        strip_ids(messages)
+        return json.dumps(messages, sort_keys=True, ensure_ascii=False)
+
+    @classmethod
+    def make_key(cls, prompt: str, llm_string: str) -> str:
+        """Content address of one model call"""
+        return hashlib.sha256(f"{llm_string}\x00{cls.normalise_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+    def for_stage(self, stage: str) -> "StageCache":
+        """LangChain cache view for one CoVe stage with its own hit/miss counters"""
+        self.stage_stats.setdefault(stage, CacheStats())
+        return StageCache(self, stage)
+
+    def get(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        key = self.make_key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        try:
+            with warnings.catch_warnings():
+                # langchain_core.load.loads is flagged as beta
+                warnings.simplefilter("ignore")
+                return loads(row[0])
+        except Exception:
+            # Entries written by an incompatible LangChain version are treated as misses
+            return None
+
+    def put(self, prompt: str, llm_string: str, return_val: Sequence[Generation]):
+        key = self.make_key(prompt, llm_string)
+        value = dumps(list(return_val))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, llm_string, value, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, llm_string, value, len(value), time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Delete least recently used entries until the store fits max_size_bytes (lock held)"""
+        total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total_size <= self.max_size_bytes:
+            return
+
+        rows = self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC").fetchall()
+        evicted_keys = []
+        for key, size in rows:
+            if total_size <= self.max_size_bytes:
+                break
+            evicted_keys.append((key,))
+            total_size -= size
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", evicted_keys)
+        self.evictions += len(evicted_keys)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def size(self) -> Dict[str, int]:
+        with self._lock:
+            entries, total_size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        return {"entries": entries, "bytes": total_size}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-stage hit/miss counters plus store size and evictions"""
+        return {
+            "stages": {stage: stats.to_dict() for stage, stats in self.stage_stats.items()},
+            "evictions": self.evictions,
+            **self.size(),
+        }
+
+    def format_stats(self) -> str:
+        size = self.size()
+        lines = [f"LLM cache ({self.path}): {size['entries']} entries, {size['bytes'] / 1024 / 1024:.1f} MB, {self.evictions} evictions"]
+        for stage, stats in self.stage_stats.items():
+            lines.append(f"  - {stage}: hits={stats.hits}, misses={stats.misses}, hit_rate={stats.hit_rate():.0%}")
+        return "\n".join(lines)
+
+
+class StageCache(BaseCache):
+    """LangChain BaseCache adapter that counts hits and misses for one stage"""
+
+    def __init__(self, store: LLMResponseCache, stage: str):
+        self.store = store
+        self.stage = stage
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.store.stage_stats[self.stage]
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        result = self.store.get(prompt, llm_string)
+        if result is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+            # Lets the rate limiter's usage callback ignore responses that made no API request
+            for generation in result:
+                generation.generation_info = {**(generation.generation_info or {}), "cache_hit": True}
+        return result
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        self.store.put(prompt, llm_string, return_val)
+        self.stats.writes += 1
+
+    def clear(self, **kwargs: Any) -> None:
+        self.store.clear()
@@ -0,0 +1,528 @@
+"""
+Model gateway wrapping every LLM call of the CoVe chain
+
+ModelGateway is a chat model that delegates to a stage's ordered provider/model
+candidates. Transient failures (overload, rate limits, timeouts, 5xx) fail over
+to the next candidate, and a circuit breaker takes a repeatedly failing endpoint
+out of rotation for a while. Once all candidates have failed, the call is retried
+with jittered exponential backoff that honours Retry-After headers and sleeps with
+asyncio on the async path. Stages can opt into hedging: an async call that runs
+longer than a percentile of the stage's recent latency gets a duplicate request,
+and the first answer wins. Because it is itself a BaseChatModel (with bind_tools),
+it can be used in place of the stage model in prompt | model chains and in the
+ReAct agent.
+"""
+
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import Field
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable
+
+from .adaptive_concurrency import is_congestion_error
+
+
+# Transient failures worth retrying besides congestion (see adaptive_concurrency.is_congestion_error)
+RETRYABLE_STATUS_CODES = (408, 500, 502, 503, 504)
+RETRYABLE_ERROR_NAMES = ("APITimeoutError", "APIConnectionError", "InternalServerError", "TimeoutError",
+                         "ReadTimeout", "ConnectTimeout", "DeadlineExceeded", "ServiceUnavailable")
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    if is_congestion_error(error) or type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    return getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Delay requested by the provider through Retry-After / retry-after-ms, if any"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms") or headers.get("Retry-After-Ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        # HTTP-date form
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by max_delay"""
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 2.0, max_delay: float = 60.0,
+                 max_retry_after: float = 120.0):
+        """
+        Args:
+            max_retries: Retries after the first attempt of one model call
+            base_delay: Upper bound of the first backoff; doubled for every further retry
+            max_delay: Upper bound of any jittered backoff
+            max_retry_after: Upper bound for delays requested by Retry-After headers
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        """Delay before retry number attempt + 1"""
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            # A small jitter keeps callers that got the same header from retrying in lockstep
+            return min(self.max_retry_after, retry_after) + random.uniform(0, self.base_delay / 2)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class RetryStats:
+    """Retry and failover counters of one stage"""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.calls = 0
+        self.retries = 0
+        self.exhausted = 0
+        self.failovers = 0
+        self.backoff_time = 0.0
+        self.errors: Dict[str, int] = {}
+        self.served_by: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def record_retry(self, delay: float):
+        with self._lock:
+            self.retries += 1
+            self.backoff_time += delay
+
+    def record_error(self, error: BaseException):
+        with self._lock:
+            name = type(error).__name__
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def record_failover(self):
+        with self._lock:
+            self.failovers += 1
+
+    def record_success(self, candidate: str):
+        with self._lock:
+            self.served_by[candidate] = self.served_by.get(candidate, 0) + 1
+
+    def record_exhausted(self):
+        with self._lock:
+            self.exhausted += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "exhausted": self.exhausted,
+            "failovers": self.failovers,
+            "backoff_time": round(self.backoff_time, 3),
+            "errors": dict(self.errors),
+            "served_by": dict(self.served_by),
+        }
+
+
+def format_retry_stats(stats_by_stage: Dict[str, RetryStats]) -> str:
+    lines = ["Retry stats:"]
+    for stage, stats in stats_by_stage.items():
+        errors = ", ".join(f"{name}={count}" for name, count in stats.errors.items()) or "none"
+        line = (
+            f"  - {stage}: calls={stats.calls}, retries={stats.retries}, exhausted={stats.exhausted}, "
+            f"backoff={stats.backoff_time:.1f}s, errors: {errors}"
+        )
+        if stats.failovers:
+            served_by = ", ".join(f"{name}={count}" for name, count in stats.served_by.items())
+            line += f", failovers={stats.failovers} (served by {served_by})"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+class CircuitBreaker:
+    """
+    Takes a failing endpoint out of rotation for reset_timeout seconds
+
+    closed: calls allowed; failure_threshold consecutive retryable failures open the circuit
+    open: the endpoint is skipped until reset_timeout has passed
+    half_open: trial calls are allowed again; a success closes the circuit, a failure reopens it
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            return self.state != "open"
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self.trips += 1
+                print(f"Circuit opened for {self.name} for {self.reset_timeout:.0f}s after {self.failures} failures")
+
+
+class CircuitBreakerRegistry:
+    """One breaker per endpoint ("provider/model"), shared by all stages using it"""
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            if name not in self.breakers:
+                self.breakers[name] = CircuitBreaker(name, self.failure_threshold, self.reset_timeout)
+            return self.breakers[name]
+
+    def format_stats(self) -> str:
+        lines = ["Circuit breakers:"]
+        for name, breaker in self.breakers.items():
+            lines.append(f"  - {name}: {breaker.state}, trips={breaker.trips}")
+        return "\n".join(lines)
+
+
+class HedgePolicy:
+    """
+    Hedged requests for one stage
+
+    The stage's recent successful call latencies are kept in a sliding window. A
+    call still running after the configured percentile of that window gets a
+    duplicate request. At most max_rate of all calls may be hedged, which bounds
+    the extra cost.
+    """
+
+    def __init__(self, stage: str, percentile: float = 95.0, max_rate: float = 0.1,
+                 min_samples: int = 20, window: int = 200, min_delay: float = 1.0):
+        """
+        Args:
+            stage: Stage name used in logs and stats
+            percentile: Latency percentile (0-100) after which a call is hedged
+            max_rate: Upper bound of hedged calls / all calls
+            min_samples: Calls observed before hedging starts
+            window: Number of recent latencies the percentile is computed over
+            min_delay: Never hedge a call earlier than this many seconds
+        """
+        if not 0 < percentile < 100:
+            raise ValueError(f"Hedge percentile must be between 0 and 100, got {percentile}")
+        self.stage = stage
+        self.percentile = percentile
+        self.max_rate = max_rate
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.latencies = deque(maxlen=window)
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which the current call should be hedged (None while too few latencies are known)"""
+        with self._lock:
+            self.calls += 1
+            if len(self.latencies) < self.min_samples:
+                return None
+            ordered = sorted(self.latencies)
+            index = min(len(ordered) - 1, math.ceil(self.percentile / 100 * len(ordered)) - 1)
+            return max(self.min_delay, ordered[index])
+
+    def try_hedge(self) -> bool:
+        """Take one hedge from the budget if the hedge rate allows it"""
+        with self._lock:
+            if self.hedges + 1 > self.max_rate * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+    def record_latency(self, seconds: float):
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def record_hedge_win(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "percentile": self.percentile,
+            "max_rate": self.max_rate,
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+        }
+
+
+def format_hedge_stats(policies: Dict[str, HedgePolicy]) -> str:
+    lines = ["Hedged requests:"]
+    for stage, policy in policies.items():
+        rate = policy.hedges / policy.calls if policy.calls else 0.0
+        lines.append(
+            f"  - {stage}: p{policy.percentile:g} trigger, calls={policy.calls}, hedges={policy.hedges} "
+            f"({rate:.1%}, cap {policy.max_rate:.0%}), won by the hedge={policy.hedge_wins}"
+        )
+    return "\n".join(lines)
+
+
+class GatewayCandidate:
+    """One endpoint a gateway may route a call to"""
+
+    def __init__(self, name: str, model: Runnable, breaker: CircuitBreaker):
+        self.name = name
+        self.model = model
+        self.breaker = breaker
+
+
+class ModelGateway(BaseChatModel):
+    """
+    Chat model that retries and fails over the calls of a stage
+
+    Candidates are tried in order, skipping endpoints whose circuit is open. A
+    retryable error fails over to the next candidate right away. Backoff is only
+    applied once every available candidate has failed in the current round.
+
+    With a HedgePolicy, a slow async attempt is duplicated to the next available
+    candidate (or the same one when there is no other). The first successful answer
+    is used and the other request is cancelled. Sync calls are never hedged,
+    because a blocking call cannot be cancelled.
+
+    Usage:
+        gateway = ModelGateway.wrap(model_config.final_assessment_model, stage="final_assessment",
+                                    policy=RetryPolicy(max_retries=3),
+                                    fallbacks=model_config.fallback_models["final_assessment"])
+        chain = prompt | gateway
+    """
+
+    candidates: List[GatewayCandidate]
+    stage: str = "llm"
+    policy: RetryPolicy = Field(default_factory=RetryPolicy)
+    stats: Optional[RetryStats] = None
+    hedging: Optional[HedgePolicy] = None
+    # Caching and rate limiting happen in the wrapped models, once per attempt
+    cache: Optional[bool] = False
+
+    @classmethod
+    def wrap(cls, model: Runnable, stage: str, policy: Optional[RetryPolicy] = None,
+             stats: Optional[RetryStats] = None, name: Optional[str] = None,
+             fallbacks: Optional[List[Tuple[str, Runnable]]] = None,
+             breakers: Optional[CircuitBreakerRegistry] = None,
+             hedging: Optional[HedgePolicy] = None) -> "ModelGateway":
+        """
+        Args:
+            model: Primary model of the stage
+            stage: Stage name used in logs and stats
+            policy: Retry policy (default: RetryPolicy())
+            stats: Counters to update (default: new RetryStats)
+            name: Endpoint name of the primary model (default: the stage name)
+            fallbacks: Ordered (name, model) fallback candidates
+            breakers: Circuit breakers shared with other gateways (default: a private registry)
+            hedging: Hedge slow async calls according to this policy (default: no hedging)
+        """
+        breakers = breakers or CircuitBreakerRegistry()
+        endpoints = [(name or stage, model)] + list(fallbacks or [])
+        return cls(
+            candidates=[GatewayCandidate(endpoint, candidate, breakers.get(endpoint)) for endpoint, candidate in endpoints],
+            stage=stage,
+            policy=policy or RetryPolicy(),
+            stats=stats or RetryStats(stage),
+            hedging=hedging,
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return f"gateway-{self.stage}"
+
+    def bind_tools(self, tools, **kwargs: Any) -> "ModelGateway":
+        """Bind tools on every candidate and keep routing around them (used by the ReAct agent)"""
+        return self.__class__(
+            candidates=[
+                GatewayCandidate(candidate.name, candidate.model.bind_tools(tools, **kwargs), candidate.breaker)
+                for candidate in self.candidates
+            ],
+            stage=self.stage,
+            policy=self.policy,
+            stats=self.stats,
+            hedging=self.hedging,
+        )
+
+    def _call_order(self) -> List[GatewayCandidate]:
+        """Candidates whose circuit allows calls; when every circuit is open, all of them rather than failing outright"""
+        available = [candidate for candidate in self.candidates if candidate.breaker.available()]
+        return available or list(self.candidates)
+
+    def _on_success(self, candidate: GatewayCandidate):
+        candidate.breaker.record_success()
+        self.stats.record_success(candidate.name)
+
+    def _on_failure(self, candidate: GatewayCandidate, error: BaseException, has_next: bool):
+        """Record a failed attempt; non-retryable errors are raised by the caller"""
+        self.stats.record_error(error)
+        if not is_retryable_error(error):
+            return
+        candidate.breaker.record_failure()
+        if has_next:
+            self.stats.record_failover()
+            print(f"[{self.stage}] {type(error).__name__} from {candidate.name}, failing over")
+
+    async def _ainvoke_candidate(self, candidate: GatewayCandidate, candidates: List[GatewayCandidate],
+                                 messages: List[BaseMessage], stop: Optional[List[str]],
+                                 **kwargs: Any) -> Tuple[GatewayCandidate, BaseMessage]:
+        """One async attempt on a candidate, hedged when it is slow; returns the candidate that answered"""
+        started = time.monotonic()
+        if self.hedging is None:
+            return candidate, await candidate.model.ainvoke(messages, stop=stop, **kwargs)
+
+        delay = self.hedging.hedge_delay()
+        primary = asyncio.ensure_future(candidate.model.ainvoke(messages, stop=stop, **kwargs))
+        tasks = {primary: candidate}
+        try:
+            if delay is not None:
+                await asyncio.wait({primary}, timeout=delay)
+            if primary.done() or delay is None or not self.hedging.try_hedge():
+                message = await primary
+                self.hedging.record_latency(time.monotonic() - started)
+                return candidate, message
+
+            # The next candidate in call order gets the duplicate, so a slow endpoint is not asked twice
+            index = candidates.index(candidate)
+            hedge_candidate = candidates[index + 1] if index + 1 < len(candidates) else candidate
+            print(f"[{self.stage}] {candidate.name} slower than {delay:.1f}s, hedging to {hedge_candidate.name}")
+            hedge = asyncio.ensure_future(hedge_candidate.model.ainvoke(messages, stop=stop, **kwargs))
+            tasks[hedge] = hedge_candidate
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.hedging.record_latency(time.monotonic() - started)
+                        if task is hedge:
+                            self.hedging.record_hedge_win()
+                        return tasks[task], task.result()
+                for task in done:
+                    if task is hedge:
+                        # Only the primary's error is handed to the caller; account for the hedge's here
+                        self._on_failure(hedge_candidate, task.exception(), has_next=False)
+                    elif not is_retryable_error(task.exception()):
+                        raise task.exception()
+            raise primary.exception()
+        finally:
+            # Cancel the loser (or both when this call itself is cancelled)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _retry_delay(self, error: BaseException, attempt: int) -> Optional[float]:
+        """Backoff before the next round of attempts, or None when the error must be raised"""
+        if not is_retryable_error(error):
+            return None
+        if attempt >= self.policy.max_retries:
+            self.stats.record_exhausted()
+            return None
+
+        delay = self.policy.backoff(attempt, error)
+        self.stats.record_retry(delay)
+        print(f"[{self.stage}] {type(error).__name__}, retry {attempt + 1}/{self.policy.max_retries} in {delay:.1f}s")
+        return delay
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.stats.record_call()
+        attempt = 0
+        while True:
+            candidates = self._call_order()
+            for index, candidate in enumerate(candidates):
+                try:
+                    message = candidate.model.invoke(messages, stop=stop, **kwargs)
+                except Exception as error:
+                    self._on_failure(candidate, error, index + 1 < len(candidates))
+                    if not is_retryable_error(error):
+                        raise
+                    last_error = error
+                    continue
+                self._on_success(candidate)
+                return ChatResult(generations=[ChatGeneration(message=message)])
+
+            delay = self._retry_delay(last_error, attempt)
+            if delay is None:
+                raise last_error
+            time.sleep(delay)
+            attempt += 1
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.stats.record_call()
+        attempt = 0
+        while True:
+            candidates = self._call_order()
+            for index, candidate in enumerate(candidates):
+                try:
+                    served_by, message = await self._ainvoke_candidate(candidate, candidates, messages, stop, **kwargs)
+                except Exception as error:
+                    self._on_failure(candidate, error, index + 1 < len(candidates))
+                    if not is_retryable_error(error):
+                        raise
+                    last_error = error
+                    continue
+                self._on_success(served_by)
+                return ChatResult(generations=[ChatGeneration(message=message)])
+
+            delay = self._retry_delay(last_error, attempt)
+            if delay is None:
+                raise last_error
+            # Back off without blocking the event loop
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -1,7 +1,9 @@
 import os
 import json
-from typing import Any, Dict, List, Optional
-from pydantic import Extra, BaseModel, Field
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from typing_extensions import Literal
+from pydantic import Extra, BaseModel, Field, PrivateAttr
 
 from langchain_core.language_models import BaseLanguageModel
 from langchain_core.callbacks import (
@@ -15,36 +17,73 @@ from langchain_core.messages import (
 )
 from langchain.chains.base import Chain
 from langchain_core.prompts import BasePromptTemplate, PromptTemplate
-from langchain_core.runnables import RunnableSequence, RunnablePassthrough, RunnableConfig
-from langchain_experimental.tools import PythonREPLTool
+from langchain_core.runnables import RunnableSequence, RunnablePassthrough, RunnableConfig, RunnableLambda
 from langchain_openai import ChatOpenAI
 from langgraph.prebuilt import create_react_agent
 from langchain_core.tools import tool
 from langchain_core.messages import HumanMessage
 from langchain_core.output_parsers import JsonOutputParser
-import time
-from anthropic._exceptions import OverloadedError
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from .config import ModelConfig
+from .verdicts import parse_assessment, aggregate_verdicts
+from .data_tools import AnalysisSession, REPLWorkerPool, default_dataset_cache, sql_available
+from .evidence_memo import EvidenceMemo
+from .verdict_store import VerdictStore, stage_config_hash
+from .prompt_registry import PROJECT_ROOT, PromptRegistry, get_prompt_registry
+from .model_gateway import (ModelGateway, RetryPolicy, RetryStats, CircuitBreakerRegistry, HedgePolicy,
+                            format_retry_stats, format_hedge_stats)
 
 
 def read_prompt_file(file_path):
-    """Read prompt template from file"""
-    with open(file_path, 'r') as file:
+    """Read prompt template from file (relative paths resolve against the project root, not the working directory)"""
+    if not os.path.isabs(file_path) and not os.path.exists(file_path):
+        file_path = os.path.join(PROJECT_ROOT, file_path)
+    with open(file_path, 'r', encoding='utf-8') as file:
         return file.read()
 
 
+class RowFilter(BaseModel):
+    """Condition on one column of `df` used by the structured analysis tools"""
+    column: str = Field(description="Column name")
+    op: Literal["==", "!=", ">", ">=", "<", "<=", "contains", "not_contains", "in", "between", "isnull", "notnull"] = Field(
+        default="==", description="Comparison; contains is a case-insensitive substring match, between takes [low, high]")
+    value: Any = Field(default=None, description="Value to compare with (a list for in/between; timestamps as ISO strings)")
+
+
+def _filters(where: Optional[List[RowFilter]]) -> Optional[List[Dict[str, Any]]]:
+    """Plain dicts of the validated filters, so they can be sent to pool workers"""
+    if not where:
+        return None
+    return [condition.model_dump() if isinstance(condition, BaseModel) else dict(condition) for condition in where]
+
+
 class OSINTDataVerificationChain(Chain):
     """
     Implements the logic to verify OSINT information through data analysis using ReAct approach
+    
+    One instance serves every evidence: the evidence id is an optional input, and
+    the compiled agent graph is built once per toolset and reused across runs. The
+    analysis session of a run reaches the tools through config["configurable"].
     """
 
     llm: BaseLanguageModel
     input_key: str = "verification_questions"
     output_key: str = "verification_answers"
     data_path: str = "data/yt_tsai_secret.xlsx"
-    max_retries: int = 3
-    retry_delay: float = 2.0
-    evidence_id: Optional[str] = None  # Added evidence_id to track which evidence is being processed
+    max_retries: int = 3  # Retries per model call when llm is not already a ModelGateway
+    retry_delay: float = 2.0  # Base backoff of those retries
+    evidence_id: Optional[str] = None  # Default evidence id when the inputs do not contain "evidence_id"
+    worker_pool: Optional[REPLWorkerPool] = None  # Run analyze_data code in pre-loaded worker processes
+    prompts: Optional[PromptRegistry] = None  # Preloaded prompt templates (default: the shared registry)
+    structured_tools: bool = True  # Offer the typed analysis tools (time_histogram, detect_bursts, ...) next to analyze_data
+    sql_tool: bool = True  # Offer query_data (DuckDB SQL over the dataset) when duckdb is installed
+    dataset_profile: bool = True  # Put the cached dataset profile into the prompt so the agent skips schema discovery
+    
+    # Compiled ReAct graphs of this instance keyed by toolset, each with the model it was built for
+    _react_agents: Dict[Tuple[str, ...], Tuple[Any, Any]] = PrivateAttr(default_factory=dict)
+    _react_agents_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _react_gateway: Optional[ModelGateway] = PrivateAttr(default=None)
 
     class Config:
         """Configuration for this pydantic object."""
@@ -63,38 +102,115 @@ class OSINTDataVerificationChain(Chain):
     
     def setup_tools(self):
         """Set up tools for the ReAct agent to use for data analysis"""
+        # All tool calls of one ReAct run share a warm session with the dataset preloaded as `df`,
+        # passed per run as config["configurable"]["analysis_session"] so the tools can be reused
+        
+        def session(config: RunnableConfig):
+            return config["configurable"]["analysis_session"]
         
         @tool
-        def analyze_data(python_code: str):
-            """Execute Python code to analyze data and return the results."""
-            # Add matplotlib configuration to use non-interactive backend
-            setup_code = """
-import matplotlib
-matplotlib.use('Agg')
-"""
-            python_repl = PythonREPLTool()
-            # First run the setup code
-            python_repl.run(setup_code)
-            # Then run the actual analysis code
-            return python_repl.run(python_code)
-        
-        return [analyze_data]
-    
-    def _invoke_with_retry(self, react_agent, messages, config):
-        """Helper method to invoke ReAct agent with retry logic"""
-        for attempt in range(self.max_retries):
-            try:
-                return react_agent.invoke({"messages": messages}, config=config)
-            except OverloadedError:
-                if attempt == self.max_retries - 1:  # Last attempt
-                    raise  # Re-raise the exception if all retries failed
-                time.sleep(self.retry_delay * (attempt + 1))  # Exponential backoff
+        def analyze_data(python_code: str, config: RunnableConfig):
+            """Execute Python code to analyze data and return the results. The dataset is already loaded as the pandas DataFrame `df` (pandas is available as `pd`), and variables persist between calls."""
+            return session(config).run(python_code)
+        
+        # Typed tools for recurring checks: one cheap call instead of writing and debugging pandas code
+        @tool
+        def time_histogram(config: RunnableConfig, time_column: str, freq: str = "1D",
+                           where: Optional[List[RowFilter]] = None, limit: int = 50):
+            """Count rows of `df` per non-empty time window of time_column. freq is a pandas offset alias such as 10min, 1h, 1D or 1W; where filters the rows first."""
+            return session(config).call("time_histogram", {"time_column": time_column, "freq": freq,
+                                                           "where": _filters(where), "limit": limit})
+        
+        @tool
+        def detect_bursts(config: RunnableConfig, time_column: str, freq: str = "1h", z_threshold: float = 3.0,
+                          where: Optional[List[RowFilter]] = None, limit: int = 50):
+            """Find time windows of time_column whose row count is far above the typical non-empty window (robust z-score >= z_threshold), e.g. comment floods or account-creation spikes."""
+            return session(config).call("detect_bursts", {"time_column": time_column, "freq": freq, "z_threshold": z_threshold,
+                                                          "where": _filters(where), "limit": limit})
+        
+        @tool
+        def find_duplicates(config: RunnableConfig, text_column: str, by: Optional[str] = None,
+                            near_threshold: Optional[float] = None, min_count: int = 2,
+                            where: Optional[List[RowFilter]] = None, limit: int = 20):
+            """Group repeated texts of text_column: exact duplicates after normalising case, whitespace and punctuation, or near-duplicates when near_threshold (Jaccard similarity, e.g. 0.8) is set. by names a column (e.g. the author) whose distinct values are counted per group."""
+            return session(config).call("find_duplicates", {"text_column": text_column, "by": by, "near_threshold": near_threshold,
+                                                            "min_count": min_count, "where": _filters(where), "limit": limit})
+        
+        @tool
+        def group_counts(config: RunnableConfig, group_by: List[str], where: Optional[List[RowFilter]] = None,
+                         min_count: int = 1, limit: int = 20):
+            """Count rows of `df` per value combination of the group_by columns, largest groups first, with their share of the rows (top-N value_counts)."""
+            return session(config).call("group_counts", {"group_by": group_by, "where": _filters(where),
+                                                         "min_count": min_count, "limit": limit})
+        
+        @tool
+        def count_rows(config: RunnableConfig, where: Optional[List[RowFilter]] = None):
+            """Count the rows of `df` matching all conditions in where."""
+            return session(config).call("count_rows", {"where": _filters(where)})
+        
+        @tool
+        def time_window_stats(config: RunnableConfig, time_column: str, start: Optional[str] = None,
+                              end: Optional[str] = None, window: Optional[str] = None, top: int = 10):
+            """Temporal clustering of a timestamp column from a precomputed sorted index: the count in [start, end), the busiest seconds and minutes, and with window (e.g. "4s", "1min") the densest non-overlapping windows. start/end are ISO timestamps."""
+            return session(config).call("time_window_stats", {"time_column": time_column, "start": start, "end": end,
+                                                              "window": window, "top": top})
+        
+        @tool
+        def search_text(config: RunnableConfig, query: str, column: Optional[str] = None, by: Optional[str] = None,
+                        limit: int = 10):
+            """Search the text columns of `df` (or one column) with a precomputed inverted index that handles Chinese text. Terms are ANDed, "quoted phrases" match exactly, OR joins alternatives and -term excludes. Returns the matching row count, the most common matching texts and, with by (e.g. the author column), its distinct values among the matches."""
+            return session(config).call("search_text", {"query": query, "column": column, "by": by, "limit": limit})
+        
+        @tool
+        def query_data(sql: str, config: RunnableConfig, limit: int = 50):
+            """Run a read-only DuckDB SQL query over the original dataset, available as the table `df` (it does not see variables or changes made in analyze_data). Best for aggregations, GROUP BY, window functions and top-N on large data. Returns at most limit rows and the query time."""
+            return session(config).query(sql, limit)
+        
+        toolset = self._toolset()
+        tools = [analyze_data, time_histogram, detect_bursts, find_duplicates, group_counts, count_rows,
+                 time_window_stats, search_text, query_data]
+        return [analysis_tool for analysis_tool in tools if analysis_tool.name in toolset]
     
-    def invoke(
-        self,
-        inputs: Dict[str, Any],
-        run_manager: Optional[CallbackManagerForChainRun] = None,
-    ) -> Dict[str, str]:
+    def _toolset(self) -> Tuple[str, ...]:
+        """Names of the tools given to the agent, part of the compiled graph's cache key"""
+        toolset = ("analyze_data",)
+        if self.structured_tools:
+            toolset += ("time_histogram", "detect_bursts", "find_duplicates", "group_counts", "count_rows",
+                        "time_window_stats", "search_text")
+        if self.sql_tool and sql_available():
+            toolset += ("query_data",)
+        return toolset
+    
+    def _react_model(self) -> ModelGateway:
+        """The ReAct model wrapped in a retrying gateway, so a transient error only repeats one agent step"""
+        if isinstance(self.llm, ModelGateway):
+            return self.llm
+        if self._react_gateway is None:
+            self._react_gateway = ModelGateway.wrap(self.llm, stage="react", policy=RetryPolicy(max_retries=self.max_retries, base_delay=self.retry_delay))
+        return self._react_gateway
+    
+    def react_agent(self):
+        """Compiled ReAct agent graph of this chain's model and toolset, built once per instance"""
+        model = self._react_model()
+        key = self._toolset()
+        with self._react_agents_lock:
+            cached = self._react_agents.get(key)
+            if cached is None or cached[0] is not model:
+                cached = self._react_agents[key] = (model, create_react_agent(model, tools=self.setup_tools()))
+        return cached[1]
+    
+    def _dataset_profile_text(self) -> str:
+        """Profile of the analysed dataset, computed once per dataset fingerprint"""
+        if not self.dataset_profile:
+            return "Not provided; examine `df` yourself if the questions need it."
+        dataset_cache = self.worker_pool.dataset_cache if self.worker_pool is not None else default_dataset_cache
+        try:
+            return dataset_cache.profile_text(self.data_path)
+        except Exception as e:
+            return f"Unavailable ({e}); examine `df` yourself."
+    
+    def _prepare_react_run(self, inputs: Dict[str, Any]):
+        """Get the ReAct agent and build its messages and run config for the given inputs"""
         # Get verification questions from input - strictly require a list
         verification_questions = inputs[self.input_key]
         original_evidence = inputs.get("original_evidence")
@@ -106,17 +222,21 @@ matplotlib.use('Agg')
         # Format all questions into a single string
         formatted_questions = "\n".join([f"{i}. {q}" for i, q in enumerate(verification_questions, 1)])
         
-        # Read React agent prompt template
-        react_prompt_template = read_prompt_file("prompts/react_agent.txt")
+        # React agent prompt template, compiled once and reloaded only when the file changes
+        react_prompt_template = (self.prompts or get_prompt_registry()).template("react_agent")
         
-        # Set up ReAct agent with tools
-        tools = self.setup_tools()
-        react_agent = create_react_agent(self.llm, tools=tools)
+        # One analysis session per run, shared by all tool calls of the cached agent graph
+        if self.worker_pool is not None:
+            session = self.worker_pool.open_session()
+        else:
+            session = AnalysisSession(self.data_path)
+        react_agent = self.react_agent()
         
-        # Create config with increased recursion limit
+        # Create config with increased recursion limit and the run's session
         config = RunnableConfig(
             configurable={
-                "recursion_limit": 30
+                "recursion_limit": 30,
+                "analysis_session": session
             }
         )
         
@@ -124,7 +244,8 @@ matplotlib.use('Agg')
         verification_prompt = react_prompt_template.format(
             verification_question=formatted_questions,
             data_path=self.data_path,
-            original_evidence=original_evidence
+            original_evidence=original_evidence,
+            dataset_profile=self._dataset_profile_text()
         )
         
         # Set up messages for ReAct agent
@@ -133,22 +254,61 @@ matplotlib.use('Agg')
             HumanMessage(content="Please analyze the data to verify these claims.")
         ]
         
-        # Run the ReAct agent with retry mechanism
+        return verification_questions, react_agent, messages, config, session
+    
+    def _format_verification_result(self, inputs: Dict[str, Any], verification_questions: List[str], verification_result: str) -> Dict[str, str]:
+        """Prefix the ReAct output with the evidence id and question count"""
+        # Include evidence_id in the verification result if available
+        evidence_id = inputs.get("evidence_id", self.evidence_id)
+        evidence_prefix = f"[Evidence {evidence_id}] " if evidence_id else ""
+        verification_result = f"{evidence_prefix}Analysis for {len(verification_questions)} questions:\n\n{verification_result}"
+        
+        return {self.output_key: verification_result}
+    
+    @staticmethod
+    def _extract_final_answer(response) -> str:
+        """Extract the final response (last AI message) of a ReAct run"""
+        final_message = next((m for m in reversed(response["messages"]) if isinstance(m, AIMessage)), None)
+        return final_message.content if final_message else "No analysis was performed"
+    
+    def invoke(
+        self,
+        inputs: Dict[str, Any],
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> Dict[str, str]:
+        verification_questions, react_agent, messages, config, session = self._prepare_react_run(inputs)
+        
+        # Run the ReAct agent (model calls are retried by the gateway)
         try:
-            response = self._invoke_with_retry(react_agent, messages, config)
-            
-            # Extract the final response (last AI message)
-            final_message = next((m for m in reversed(response["messages"]) if isinstance(m, AIMessage)), None)
-            verification_result = final_message.content if final_message else "No analysis was performed"
-            
+            response = react_agent.invoke({"messages": messages}, config=config)
+            verification_result = self._extract_final_answer(response)
         except Exception as e:
             verification_result = f"Error during verification: {str(e)}"
+        finally:
+            session.close()
         
-        # Include evidence_id in the verification result if available
-        evidence_prefix = f"[Evidence {self.evidence_id}] " if self.evidence_id else ""
-        verification_result = f"{evidence_prefix}Analysis for {len(verification_questions)} questions:\n\n{verification_result}"
+        return self._format_verification_result(inputs, verification_questions, verification_result)
+    
+    async def ainvoke(
+        self,
+        inputs: Dict[str, Any],
+        run_manager: Optional[AsyncCallbackManagerForChainRun] = None,
+    ) -> Dict[str, str]:
+        # The first run hashes and parses the dataset for its profile; keep that off the event loop
+        verification_questions, react_agent, messages, config, session = await asyncio.to_thread(
+            self._prepare_react_run, inputs
+        )
         
-        return {self.output_key: verification_result}
+        # Run the ReAct agent on the event loop using the model's async API
+        try:
+            response = await react_agent.ainvoke({"messages": messages}, config=config)
+            verification_result = self._extract_final_answer(response)
+        except Exception as e:
+            verification_result = f"Error during verification: {str(e)}"
+        finally:
+            session.close()
+        
+        return self._format_verification_result(inputs, verification_questions, verification_result)
 
     def _call(
         self,
@@ -157,6 +317,13 @@ matplotlib.use('Agg')
     ) -> Dict[str, str]:
         return self.invoke(inputs, run_manager)
 
+    async def _acall(
+        self,
+        inputs: Dict[str, Any],
+        run_manager: Optional[AsyncCallbackManagerForChainRun] = None,
+    ) -> Dict[str, str]:
+        return await self.ainvoke(inputs, run_manager)
+
 
 class OSINTCOVEChain:
     """
@@ -164,126 +331,585 @@ class OSINTCOVEChain:
     using dataset analysis for disinformation detection
     """
     
-    def __init__(self, model_config: ModelConfig, data_path="data/yt_tsai_secret.xlsx"):
+    def __init__(self, model_config: ModelConfig, data_path="data/yt_tsai_secret.xlsx", max_concurrent_evidences: int = 1,
+                 early_exit: bool = False, worker_pool: Optional[REPLWorkerPool] = None,
+                 evidence_memo: Optional[EvidenceMemo] = None, analysis_memo: Optional[EvidenceMemo] = None,
+                 verdict_store: Optional[VerdictStore] = None, prompt_registry: Optional[PromptRegistry] = None):
+        """
+        Args:
+            model_config: Configuration for all LLM models used in different verification steps
+            data_path: Path to the dataset analysed by the ReAct agent
+            max_concurrent_evidences: Maximum number of evidences of one record verified in parallel (default: 1, sequential)
+            early_exit: Stop verifying the remaining evidences of a record once one is VERIFIED with HIGH confidence (default: False)
+            worker_pool: Execute the ReAct agent's analysis code in this process pool instead of in-process (default: None)
+            evidence_memo: Verify each unique evidence once and reuse its result for every record containing it (default: None)
+            analysis_memo: Share the verification questions and ReAct analysis between near-duplicate evidences,
+                e.g. keyed by EvidenceClusterIndex.cluster_key; the final assessment still runs per evidence (default: None)
+            verdict_store: Persistent per-evidence results from earlier runs on the same dataset and stage configuration (default: None)
+            prompt_registry: Preloaded prompt templates and composed stage chains (default: the shared registry of prompts/)
+        """
         self.model_config = model_config
         self.data_path = data_path
+        self.max_concurrent_evidences = max(1, max_concurrent_evidences)
+        self.early_exit = early_exit
+        self.worker_pool = worker_pool
+        self.evidence_memo = evidence_memo
+        self.analysis_memo = analysis_memo
+        self.verdict_store = verdict_store
+        self.prompts = prompt_registry or get_prompt_registry()
+        self._verdict_config_hash = None  # (prompt registry version, agent configuration, hash)
         
-    def __call__(self):
-        # Load prompt templates from files
-        verification_question_prompt_text = read_prompt_file("prompts/verification_question.txt")
-        final_assessment_prompt_text = read_prompt_file("prompts/final_assessment.txt")
-        aggregation_prompt_text = read_prompt_file("prompts/aggregation.txt")
+        # Every stage model is called through a gateway with retries, fallbacks and per-stage counters
+        self.retry_stats = {stage: RetryStats(stage) for stage in self.model_config.model_settings}
+        self.circuit_breakers = CircuitBreakerRegistry()
+        # Opt-in hedging of slow calls, per stage with a "hedge" setting
+        self.hedge_policies = {
+            stage: HedgePolicy(stage, **settings["hedge"])
+            for stage, settings in self.model_config.model_settings.items() if settings.get("hedge")
+        }
+        self.stage_models: Dict[str, ModelGateway] = {}
+        self.stage_chains: Dict[str, Tuple[str, Any]] = {}  # prompt name -> (template hash, composed runnable)
+        self.data_verification_chain: Optional[OSINTDataVerificationChain] = None
+        
+    def stage_model(self, stage: str) -> ModelGateway:
+        """Candidates of a stage (primary model, then fallbacks) behind its retry policy and circuit breakers"""
+        if stage not in self.stage_models:
+            settings = self.model_config.model_settings[stage]
+            (primary_name, primary_model), *fallbacks = self.model_config.candidate_models(stage)
+            self.stage_models[stage] = ModelGateway.wrap(
+                primary_model,
+                stage=stage,
+                policy=RetryPolicy(max_retries=settings.get("max_retries", 3)),
+                stats=self.retry_stats[stage],
+                name=primary_name,
+                fallbacks=fallbacks,
+                breakers=self.circuit_breakers,
+                hedging=self.hedge_policies.get(stage)
+            )
+        return self.stage_models[stage]
+    
+    def format_retry_stats(self) -> str:
+        stats = f"{format_retry_stats(self.retry_stats)}\n{self.circuit_breakers.format_stats()}"
+        if self.hedge_policies:
+            stats += f"\n{format_hedge_stats(self.hedge_policies)}"
+        return stats
+    
+    def load_prompts(self):
+        """Compile the stage prompt templates (the registry reads the files once and reloads them on change)"""
+        for name in ("verification_question", "react_agent", "final_assessment", "aggregation"):
+            self.prompts.template(name)
+        self._verdict_config_hash = None
         
         # Create verification question template chain with JSON parser
-        parser = JsonOutputParser(pydantic_object=VerificationQuestions)
+        self.parser = JsonOutputParser(pydantic_object=VerificationQuestions)
+        
+    def __call__(self):
+        self.load_prompts()
         
         # Create the combined chain
         input_runnable = RunnablePassthrough()
         
-        def process_individual_evidences(inputs):
-            """Process each evidence independently"""
-            outputs = {}
-            outputs.update(inputs)
-            
-            # Get the list of evidences
-            evidences = inputs.get("collected_evidence", [])
-            if not isinstance(evidences, list):
-                evidences = [evidences]
-            
-            all_verification_questions = []
-            all_verification_answers = []
-            all_credibility_assessments = []
-            
-            # Process each evidence independently
-            for i, evidence in enumerate(evidences, 1):
-                evidence_id = str(i)
-                
-                # Get max questions parameter
-                max_questions = self.model_config.model_settings["verification_question"].get("max_questions", 3)
-                
-                # Create verification question chain for this evidence
-                verification_question_prompt = PromptTemplate(
-                    input_variables=["collected_evidence", "max_questions"],
-                    template=verification_question_prompt_text
-                )
-                
-                evidence_input = {
-                    "collected_evidence": evidence,
-                    "max_questions": max_questions
-                }
-                
-                verification_question_chain_output = verification_question_prompt | self.model_config.verification_question_model | parser
-                verification_questions_result = verification_question_chain_output.invoke(evidence_input)
-                
-                verification_questions = verification_questions_result.verification_questions if hasattr(verification_questions_result, "verification_questions") else verification_questions_result["verification_questions"]
-                
-                # Limit to max_questions if needed
-                if len(verification_questions) > max_questions:
-                    verification_questions = verification_questions[:max_questions]
-                    print(f"Limited verification questions to maximum of {max_questions}")
-                
-                # Store questions with evidence ID
-                for q in verification_questions:
-                    all_verification_questions.append(f"[Evidence {evidence_id}] {q}")
-                
-                # Create execution verification chain for this evidence
-                execute_verification_chain = OSINTDataVerificationChain(
-                    llm=self.model_config.react_model,
-                    output_key="verification_answers",
-                    data_path=self.data_path,
-                    evidence_id=evidence_id
-                )
-                
-                verification_answers = execute_verification_chain.invoke({
-                    "verification_questions": verification_questions,
-                    "original_evidence": evidence
-                })["verification_answers"]
-                
-                all_verification_answers.append(verification_answers)
-                
-                # Create final assessment chain for this evidence
-                final_assessment_prompt = PromptTemplate(
-                    input_variables=["collected_evidence", "verification_answers"],
-                    template=final_assessment_prompt_text
-                )
-                
-                final_assessment_chain = final_assessment_prompt | self.model_config.final_assessment_model
-                
-                credibility_assessment = final_assessment_chain.invoke({
-                    "collected_evidence": evidence,
-                    "verification_answers": verification_answers
-                })
-                
-                all_credibility_assessments.append(f"[Evidence {evidence_id}] {credibility_assessment}")
-            
-            # Aggregate all results
-            outputs["all_verification_questions"] = all_verification_questions
-            outputs["all_verification_answers"] = "\n\n".join(all_verification_answers)
-            outputs["all_credibility_assessments"] = "\n\n".join(all_credibility_assessments)
-            
-            # Format all evidences for aggregation
-            formatted_evidences = "\n\n".join([f"[Evidence {i+1}] {evidence}" for i, evidence in enumerate(evidences)])
-            
-            # Run the aggregation step
-            aggregation_prompt = PromptTemplate(
-                input_variables=["all_credibility_assessments", "all_evidences"],
-                template=aggregation_prompt_text
+        osint_verification_cove_chain = input_runnable | RunnableLambda(
+            self.process_individual_evidences,
+            afunc=self.aprocess_individual_evidences
+        )
+        
+        return osint_verification_cove_chain
+    
+    def dataset_fingerprint(self) -> str:
+        """Content fingerprint of the analysed dataset (memoised on size and mtime)"""
+        dataset_cache = self.worker_pool.dataset_cache if self.worker_pool is not None else default_dataset_cache
+        return dataset_cache.fingerprint(self.data_path)
+    
+    def verdict_config_hash(self) -> str:
+        """Hash of the models, prompt files and ReAct tools that produce a per-evidence verdict (recomputed when one changes)"""
+        prompt_names = ("verification_question", "react_agent", "final_assessment")
+        for name in prompt_names:
+            self.prompts.get(name)  # Pick up edited files before comparing the registry version
+        data_verification_chain = self._data_verification_chain()
+        agent = (data_verification_chain._toolset(), data_verification_chain.dataset_profile)
+        if self._verdict_config_hash is None or self._verdict_config_hash[:2] != (self.prompts.version, agent):
+            self._verdict_config_hash = (self.prompts.version, agent, stage_config_hash(
+                {stage: self.model_config.model_settings[stage] for stage in ("verification_question", "react", "final_assessment")},
+                {f"{name}.txt": self.prompts.text(name) for name in prompt_names},
+                {"tools": list(agent[0]), "dataset_profile": agent[1]}
+            ))
+        return self._verdict_config_hash[2]
+    
+    def lookup_verdict(self, evidence_id: str, evidence: str) -> Optional[Dict[str, Any]]:
+        """Result of an earlier run for this evidence, dataset and configuration, re-tagged as [Evidence evidence_id]"""
+        if self.verdict_store is None:
+            return None
+        entry = self.verdict_store.get(evidence, self.dataset_fingerprint(), self.verdict_config_hash())
+        if entry is None:
+            return None
+        return self.retag_evidence_result(evidence_id, entry["evidence_id"], entry["result"])
+    
+    def store_verdict(self, evidence_id: str, evidence: str, evidence_result: Dict[str, Any]):
+        """Persist a freshly computed result (results of a failed ReAct run are not kept)"""
+        if self.verdict_store is None or "Error during verification:" in evidence_result["verification_answers"]:
+            return
+        self.verdict_store.put(evidence, self.dataset_fingerprint(), self.verdict_config_hash(),
+                               {"evidence_id": evidence_id, "result": evidence_result})
+    
+    async def alookup_verdict(self, evidence_id: str, evidence: str) -> Optional[Dict[str, Any]]:
+        """Async counterpart of lookup_verdict; the dataset fingerprint (hashed on first use) and SQLite run in a thread"""
+        if self.verdict_store is None:
+            return None
+        return await asyncio.to_thread(self.lookup_verdict, evidence_id, evidence)
+    
+    async def astore_verdict(self, evidence_id: str, evidence: str, evidence_result: Dict[str, Any]):
+        """Async counterpart of store_verdict"""
+        if self.verdict_store is not None:
+            await asyncio.to_thread(self.store_verdict, evidence_id, evidence, evidence_result)
+    
+    def invalidate_verdicts(self, evidences: Optional[List[str]] = None) -> int:
+        """Drop stored verdicts of the current dataset and configuration (all of them, or only the given evidences)"""
+        if self.verdict_store is None:
+            return 0
+        return self.verdict_store.invalidate(evidences, self.dataset_fingerprint(), self.verdict_config_hash())
+    
+    def stage_chain(self, prompt_name: str, compose):
+        """Runnable composed from a prompt template, built once and rebuilt only after the template changes"""
+        entry = self.prompts.get(prompt_name)
+        cached = self.stage_chains.get(prompt_name)
+        if cached is None or cached[0] != entry.content_hash:
+            cached = self.stage_chains[prompt_name] = (entry.content_hash, compose(entry.template))
+        return cached[1]
+    
+    def prompt_hashes(self) -> Dict[str, str]:
+        """Short content hashes of the stage prompts, recorded with every result as provenance"""
+        return self.prompts.hashes(("verification_question", "react_agent", "final_assessment", "aggregation"), length=12)
+    
+    def _max_questions(self) -> int:
+        """Get max questions parameter"""
+        return self.model_config.model_settings["verification_question"].get("max_questions", 3)
+    
+    def _verification_question_chain(self):
+        """Verification question chain with JSON parser, composed once per template version"""
+        return self.stage_chain("verification_question", lambda prompt: prompt | self.stage_model("verification_question") | self.parser)
+    
+    def _select_questions(self, verification_questions_result, max_questions: int) -> List[str]:
+        """Extract the question list from the parser output and enforce max_questions"""
+        verification_questions = verification_questions_result.verification_questions if hasattr(verification_questions_result, "verification_questions") else verification_questions_result["verification_questions"]
+        
+        # Limit to max_questions if needed
+        if len(verification_questions) > max_questions:
+            verification_questions = verification_questions[:max_questions]
+            print(f"Limited verification questions to maximum of {max_questions}")
+        
+        return verification_questions
+    
+    def _data_verification_chain(self) -> OSINTDataVerificationChain:
+        """Execution verification chain shared by all evidences (the evidence id is passed as input)"""
+        if self.data_verification_chain is None:
+            self.data_verification_chain = OSINTDataVerificationChain(
+                llm=self.stage_model("react"),
+                output_key="verification_answers",
+                data_path=self.data_path,
+                worker_pool=self.worker_pool,
+                prompts=self.prompts
             )
+        return self.data_verification_chain
+    
+    def _final_assessment_chain(self):
+        """Final assessment chain, composed once per template version"""
+        return self.stage_chain("final_assessment", lambda prompt: prompt | self.stage_model("final_assessment"))
+    
+    def _aggregation_mode(self) -> str:
+        """Aggregation mode: "llm" (aggregation model call) or "rule" (computed locally)"""
+        return self.model_config.model_settings["aggregation"].get("mode", "llm")
+    
+    def _aggregation_narrative(self) -> str:
+        """LLM narrative summary in rule mode: "none", "inline" or "deferred" """
+        return self.model_config.model_settings["aggregation"].get("narrative", "none")
+    
+    def _apply_rule_aggregation(self, outputs: Dict[str, Any], aggregation_input: Dict[str, str]):
+        """Compute final_verification_result from the parsed per-evidence verdicts"""
+        rule_result = aggregate_verdicts(self.evidence_list(outputs), outputs["evidence_verdicts"])
+        outputs["final_verification_result"] = json.dumps(rule_result, ensure_ascii=False, indent=2)
+        
+        # Keep the aggregation prompt inputs so the narrative can be generated later with narrate()
+        if self._aggregation_narrative() == "deferred":
+            outputs["aggregation_input"] = aggregation_input
+    
+    def aggregate(self, outputs: Dict[str, Any], aggregation_input: Dict[str, str]) -> Dict[str, Any]:
+        """Stage 4: aggregate the per-evidence assessments of a record into outputs"""
+        if self._aggregation_mode() != "rule":
+            outputs["final_verification_result"] = self._aggregation_chain().invoke(aggregation_input)
+            return outputs
+        
+        self._apply_rule_aggregation(outputs, aggregation_input)
+        if self._aggregation_narrative() == "inline":
+            outputs["aggregation_narrative"] = self._aggregation_chain().invoke(aggregation_input)
+        return outputs
+    
+    def narrate(self, outputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generate the deferred LLM narrative summary for a rule-aggregated record
+        
+        Args:
+            outputs: Chain outputs produced with aggregation narrative "deferred"
             
-            aggregation_chain = aggregation_prompt | self.model_config.aggregation_model
-            
-            final_result = aggregation_chain.invoke({
-                "all_credibility_assessments": outputs["all_credibility_assessments"],
-                "all_evidences": formatted_evidences
-            })
-            
-            outputs["final_verification_result"] = final_result
+        Returns:
+            outputs with aggregation_narrative set
+        """
+        outputs["aggregation_narrative"] = self._aggregation_chain().invoke(outputs["aggregation_input"])
+        return outputs
+    
+    def _aggregation_chain(self):
+        """Chain aggregating all per-evidence assessments, composed once per template version"""
+        return self.stage_chain("aggregation", lambda prompt: prompt | self.stage_model("aggregation"))
+    
+    @staticmethod
+    def tag_evidence_result(evidence_id: str, verification_questions: List[str], verification_answers: str, credibility_assessment) -> Dict[str, Any]:
+        """Tag the outputs of one evidence with its [Evidence i] id"""
+        return {
+            "verification_questions": [f"[Evidence {evidence_id}] {q}" for q in verification_questions],
+            "verification_answers": verification_answers,
+            "credibility_assessment": f"[Evidence {evidence_id}] {credibility_assessment}",
+            "verdict": parse_assessment(credibility_assessment)
+        }
+    
+    @staticmethod
+    def retag(text: str, source_evidence_id: str, evidence_id: str) -> str:
+        """Replace the [Evidence i] prefix of a memoised text with another record's evidence id"""
+        source_tag = f"[Evidence {source_evidence_id}] "
+        return f"[Evidence {evidence_id}] {text[len(source_tag):]}" if text.startswith(source_tag) else text
+    
+    @classmethod
+    def retag_evidence_result(cls, evidence_id: str, source_evidence_id: str, evidence_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Re-tag a memoised result computed as [Evidence source_evidence_id] for another record's [Evidence evidence_id]"""
+        def retag(text: str) -> str:
+            return cls.retag(text, source_evidence_id, evidence_id)
+        
+        return {
+            "verification_questions": [retag(q) for q in evidence_result["verification_questions"]],
+            "verification_answers": retag(evidence_result["verification_answers"]),
+            "credibility_assessment": retag(evidence_result["credibility_assessment"]),
+            "verdict": dict(evidence_result["verdict"])
+        }
+    
+    @staticmethod
+    def is_decisive(verdict: Dict[str, Any]) -> bool:
+        """A VERIFIED verdict with HIGH confidence decides the whole record under the aggregation rule"""
+        return verdict.get("status") == "VERIFIED" and verdict.get("confidence") == "HIGH"
+    
+    @staticmethod
+    def skipped_evidence_result(evidence_id: str, decided_by: str) -> Dict[str, Any]:
+        """Placeholder result for an evidence skipped by the decisive early exit"""
+        note = f"SKIPPED (decisive early exit: Evidence {decided_by} was VERIFIED with HIGH confidence)"
+        return {
+            "verification_questions": [],
+            "verification_answers": f"[Evidence {evidence_id}] {note}",
+            "credibility_assessment": f"[Evidence {evidence_id}] {note}",
+            "verdict": {"status": None, "confidence": None, "reasoning": note, "key_findings": [], "skipped": True}
+        }
+    
+    def fill_skipped(self, evidence_ids: List[str], evidence_results: List[Optional[Dict[str, Any]]], decided_by: Optional[str]):
+        """Replace the results of evidences that were never completed with skip markers"""
+        return [
+            result if result is not None else self.skipped_evidence_result(evidence_id, decided_by)
+            for evidence_id, result in zip(evidence_ids, evidence_results)
+        ]
+    
+    def process_evidence(self, evidence_id: str, evidence: str) -> Dict[str, Any]:
+        """
+        Run question generation, ReAct verification and final assessment for a single evidence
+        
+        Args:
+            evidence_id: 1-based position of the evidence inside its record
+            evidence: Evidence text to verify
             
+        Returns:
+            Dictionary with the evidence's verification questions, answers and credibility assessment
+        """
+        if self.evidence_memo is None:
+            return self._process_evidence(evidence_id, evidence)
+        
+        source_evidence_id, evidence_result = self.evidence_memo.get_or_compute(
+            evidence, lambda: (evidence_id, self._process_evidence(evidence_id, evidence))
+        )
+        return self.retag_evidence_result(evidence_id, source_evidence_id, evidence_result)
+    
+    def _process_evidence(self, evidence_id: str, evidence: str) -> Dict[str, Any]:
+        stored = self.lookup_verdict(evidence_id, evidence)
+        if stored is not None:
+            return stored
+        
+        verification_questions, verification_answers = self.verify_evidence(evidence_id, evidence)
+        
+        credibility_assessment = self._final_assessment_chain().invoke({
+            "collected_evidence": evidence,
+            "verification_answers": verification_answers
+        })
+        
+        evidence_result = self.tag_evidence_result(evidence_id, verification_questions, verification_answers, credibility_assessment)
+        self.store_verdict(evidence_id, evidence, evidence_result)
+        return evidence_result
+    
+    def verify_evidence(self, evidence_id: str, evidence: str) -> Tuple[List[str], str]:
+        """Stages 1 and 2 (questions and ReAct answers), shared with near-duplicate evidences when an analysis memo is set"""
+        if self.analysis_memo is None:
+            return self._verify_evidence(evidence_id, evidence)
+        
+        outcome = self.analysis_memo.get_or_compute(
+            evidence, lambda: (evidence_id, *self._verify_evidence(evidence_id, evidence))
+        )
+        return self.reuse_analysis(evidence_id, outcome)
+    
+    def _verify_evidence(self, evidence_id: str, evidence: str) -> Tuple[List[str], str]:
+        max_questions = self._max_questions()
+        
+        verification_questions_result = self._verification_question_chain().invoke({
+            "collected_evidence": evidence,
+            "max_questions": max_questions
+        })
+        verification_questions = self._select_questions(verification_questions_result, max_questions)
+        
+        verification_answers = self._data_verification_chain().invoke({
+            "verification_questions": verification_questions,
+            "original_evidence": evidence,
+            "evidence_id": evidence_id
+        })["verification_answers"]
+        
+        return verification_questions, verification_answers
+    
+    def reuse_analysis(self, evidence_id: str, outcome: Tuple[str, List[str], str]) -> Tuple[List[str], str]:
+        """Questions and answers of a memoised (source evidence id, questions, answers) analysis for another evidence"""
+        source_evidence_id, verification_questions, verification_answers = outcome
+        return list(verification_questions), self.retag(verification_answers, source_evidence_id, evidence_id)
+    
+    async def averify_evidence(self, evidence_id: str, evidence: str) -> Tuple[List[str], str]:
+        """Async counterpart of verify_evidence"""
+        if self.analysis_memo is None:
+            return await self._averify_evidence(evidence_id, evidence)
+        
+        async def verify():
+            return (evidence_id, *await self._averify_evidence(evidence_id, evidence))
+        
+        return self.reuse_analysis(evidence_id, await self.analysis_memo.aget_or_compute(evidence, verify))
+    
+    async def _averify_evidence(self, evidence_id: str, evidence: str) -> Tuple[List[str], str]:
+        verification_questions = await self.agenerate_questions(evidence)
+        verification_answers = await self.averify_with_data(evidence_id, evidence, verification_questions)
+        return verification_questions, verification_answers
+    
+    async def agenerate_questions(self, evidence: str) -> List[str]:
+        """Stage 1: generate the verification questions for one evidence"""
+        max_questions = self._max_questions()
+        
+        verification_questions_result = await self._verification_question_chain().ainvoke({
+            "collected_evidence": evidence,
+            "max_questions": max_questions
+        })
+        return self._select_questions(verification_questions_result, max_questions)
+    
+    async def averify_with_data(self, evidence_id: str, evidence: str, verification_questions: List[str]) -> str:
+        """Stage 2: answer the verification questions with the ReAct data analysis agent"""
+        return (await self._data_verification_chain().ainvoke({
+            "verification_questions": verification_questions,
+            "original_evidence": evidence,
+            "evidence_id": evidence_id
+        }))["verification_answers"]
+    
+    async def aassess_evidence(self, evidence: str, verification_answers: str):
+        """Stage 3: assess the credibility of one evidence from its verification answers"""
+        return await self._final_assessment_chain().ainvoke({
+            "collected_evidence": evidence,
+            "verification_answers": verification_answers
+        })
+    
+    async def aaggregate(self, outputs: Dict[str, Any], aggregation_input: Dict[str, str]) -> Dict[str, Any]:
+        """Stage 4: aggregate the per-evidence assessments of a record into outputs"""
+        if self._aggregation_mode() != "rule":
+            outputs["final_verification_result"] = await self._aggregation_chain().ainvoke(aggregation_input)
             return outputs
         
-        osint_verification_cove_chain = input_runnable | process_individual_evidences
+        self._apply_rule_aggregation(outputs, aggregation_input)
+        if self._aggregation_narrative() == "inline":
+            outputs["aggregation_narrative"] = await self._aggregation_chain().ainvoke(aggregation_input)
+        return outputs
+    
+    async def anarrate(self, outputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Async counterpart of narrate"""
+        outputs["aggregation_narrative"] = await self._aggregation_chain().ainvoke(outputs["aggregation_input"])
+        return outputs
+    
+    async def aprocess_evidence(self, evidence_id: str, evidence: str) -> Dict[str, Any]:
+        """Async counterpart of process_evidence using the models' async APIs"""
+        if self.evidence_memo is None:
+            return await self._aprocess_evidence(evidence_id, evidence)
+        
+        async def verify():
+            return evidence_id, await self._aprocess_evidence(evidence_id, evidence)
         
-        return osint_verification_cove_chain
+        source_evidence_id, evidence_result = await self.evidence_memo.aget_or_compute(evidence, verify)
+        return self.retag_evidence_result(evidence_id, source_evidence_id, evidence_result)
+    
+    async def _aprocess_evidence(self, evidence_id: str, evidence: str) -> Dict[str, Any]:
+        stored = await self.alookup_verdict(evidence_id, evidence)
+        if stored is not None:
+            return stored
+        
+        verification_questions, verification_answers = await self.averify_evidence(evidence_id, evidence)
+        credibility_assessment = await self.aassess_evidence(evidence, verification_answers)
+        
+        evidence_result = self.tag_evidence_result(evidence_id, verification_questions, verification_answers, credibility_assessment)
+        await self.astore_verdict(evidence_id, evidence, evidence_result)
+        return evidence_result
+    
+    @staticmethod
+    def evidence_list(inputs) -> List[str]:
+        """Get the list of evidences"""
+        evidences = inputs.get("collected_evidence", [])
+        if not isinstance(evidences, list):
+            evidences = [evidences]
+        return evidences
+    
+    def collect_results(self, inputs, evidences: List[str], evidence_results: List[Dict[str, Any]]):
+        """
+        Merge the per-evidence results (already in [Evidence i] order) into the chain outputs
+        
+        Returns:
+            Tuple of (outputs, aggregation_input)
+        """
+        outputs = {}
+        outputs.update(inputs)
+        
+        all_verification_questions = []
+        all_verification_answers = []
+        all_credibility_assessments = []
+        evidence_verdicts = []
+        
+        for evidence_result in evidence_results:
+            all_verification_questions.extend(evidence_result["verification_questions"])
+            all_verification_answers.append(evidence_result["verification_answers"])
+            all_credibility_assessments.append(evidence_result["credibility_assessment"])
+            evidence_verdicts.append(evidence_result["verdict"])
+        
+        # Aggregate all results
+        outputs["all_verification_questions"] = all_verification_questions
+        outputs["all_verification_answers"] = "\n\n".join(all_verification_answers)
+        outputs["all_credibility_assessments"] = "\n\n".join(all_credibility_assessments)
+        outputs["evidence_verdicts"] = evidence_verdicts
+        outputs["prompt_hashes"] = self.prompt_hashes()
+        outputs["skipped_evidences"] = [
+            str(evidence_id) for evidence_id, verdict in enumerate(evidence_verdicts, 1) if verdict.get("skipped")
+        ]
+        
+        # Format all evidences for aggregation
+        formatted_evidences = "\n\n".join([f"[Evidence {i+1}] {evidence}" for i, evidence in enumerate(evidences)])
+        
+        aggregation_input = {
+            "all_credibility_assessments": outputs["all_credibility_assessments"],
+            "all_evidences": formatted_evidences
+        }
+        
+        return outputs, aggregation_input
+    
+    def _process_with_early_exit(self, evidence_ids: List[str], evidences: List[str], max_workers: int) -> List[Dict[str, Any]]:
+        """
+        Verify evidences until one is decisive, then skip the rest
+        
+        Evidences not yet started are cancelled. Threads that are already running
+        cannot be interrupted; their results are discarded and marked as skipped.
+        """
+        evidence_results = [None] * len(evidences)
+        decided_by = None
+        
+        if max_workers <= 1:
+            for index, (evidence_id, evidence) in enumerate(zip(evidence_ids, evidences)):
+                evidence_results[index] = self.process_evidence(evidence_id, evidence)
+                if self.is_decisive(evidence_results[index]["verdict"]):
+                    decided_by = evidence_id
+                    break
+        else:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+            try:
+                futures = {
+                    executor.submit(self.process_evidence, evidence_id, evidence): index
+                    for index, (evidence_id, evidence) in enumerate(zip(evidence_ids, evidences))
+                }
+                for future in as_completed(futures):
+                    index = futures[future]
+                    evidence_results[index] = future.result()
+                    if self.is_decisive(evidence_results[index]["verdict"]):
+                        decided_by = evidence_ids[index]
+                        break
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+        
+        return self.fill_skipped(evidence_ids, evidence_results, decided_by)
+    
+    def process_individual_evidences(self, inputs):
+        """Process each evidence independently"""
+        evidences = self.evidence_list(inputs)
+        evidence_ids = [str(i) for i in range(1, len(evidences) + 1)]
+        
+        # Fan the evidences out to a bounded thread pool; map() keeps the [Evidence i] order
+        max_workers = min(self.max_concurrent_evidences, len(evidences))
+        if self.early_exit:
+            evidence_results = self._process_with_early_exit(evidence_ids, evidences, max_workers)
+        elif max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                evidence_results = list(executor.map(self.process_evidence, evidence_ids, evidences))
+        else:
+            evidence_results = [self.process_evidence(evidence_id, evidence) for evidence_id, evidence in zip(evidence_ids, evidences)]
+        
+        outputs, aggregation_input = self.collect_results(inputs, evidences, evidence_results)
+        
+        # Run the aggregation step
+        return self.aggregate(outputs, aggregation_input)
+    
+    async def _agather_with_early_exit(self, evidence_ids: List[str], coroutines) -> List[Dict[str, Any]]:
+        """Await the evidence coroutines until one is decisive, then cancel the pending and in-flight ones"""
+        tasks = {asyncio.ensure_future(coroutine): index for index, coroutine in enumerate(coroutines)}
+        evidence_results = [None] * len(tasks)
+        decided_by = None
+        pending = set(tasks)
+        
+        try:
+            while pending and decided_by is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = tasks[task]
+                    evidence_results[index] = task.result()
+                    if decided_by is None and self.is_decisive(evidence_results[index]["verdict"]):
+                        decided_by = evidence_ids[index]
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        return self.fill_skipped(evidence_ids, evidence_results, decided_by)
+    
+    async def aprocess_individual_evidences(self, inputs):
+        """Async counterpart of process_individual_evidences running every evidence on the event loop"""
+        evidences = self.evidence_list(inputs)
+        evidence_ids = [str(i) for i in range(1, len(evidences) + 1)]
+        
+        # Bound the per-record fan-out; gather() keeps the [Evidence i] order
+        semaphore = asyncio.Semaphore(self.max_concurrent_evidences)
+        
+        async def bounded_process_evidence(evidence_id, evidence):
+            async with semaphore:
+                return await self.aprocess_evidence(evidence_id, evidence)
+        
+        coroutines = [
+            bounded_process_evidence(evidence_id, evidence)
+            for evidence_id, evidence in zip(evidence_ids, evidences)
+        ]
+        if self.early_exit:
+            evidence_results = await self._agather_with_early_exit(evidence_ids, coroutines)
+        else:
+            evidence_results = await asyncio.gather(*coroutines)
+        
+        outputs, aggregation_input = self.collect_results(inputs, evidences, evidence_results)
+        
+        # Run the aggregation step
+        return await self.aaggregate(outputs, aggregation_input)
 
 
 class VerificationQuestions(BaseModel):
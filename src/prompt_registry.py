@@ -0,0 +1,127 @@
+"""
+Registry of the prompt templates under prompts/
+
+All prompt files are read once, from the project's prompts/ directory rather
+than the current working directory, and each one is compiled into a
+PromptTemplate on first use. A file whose mtime changes is reloaded on its next
+use (checked at most once per check_interval). Every template records a SHA-256
+content hash; callers key composed runnables and caches by it and store it with
+results as provenance.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from langchain_core.prompts import PromptTemplate
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+PROMPTS_DIR = PROJECT_ROOT / "prompts"
+
+
+class PromptEntry:
+    """One prompt file with its content hash and lazily compiled template"""
+
+    def __init__(self, name: str, path: Path):
+        self.name = name
+        self.path = path
+        stat = path.stat()
+        self.mtime_ns = stat.st_mtime_ns
+        self.text = path.read_text(encoding="utf-8")
+        self.content_hash = hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+        self.checked_at = time.monotonic()
+        self._template: Optional[PromptTemplate] = None
+
+    @property
+    def template(self) -> PromptTemplate:
+        if self._template is None:
+            self._template = PromptTemplate.from_template(self.text)
+        return self._template
+
+
+class PromptRegistry:
+    """
+    Compiled prompt templates with content hashes, hot-reloaded on change
+
+    Usage:
+        prompts = PromptRegistry()
+        chain = prompts.template("final_assessment") | model
+        text = prompts.template("react_agent").format(...)
+        print(prompts.hashes(length=12))
+    """
+
+    def __init__(self, prompts_dir: Optional[str] = None, check_interval: float = 1.0):
+        """
+        Args:
+            prompts_dir: Directory with the *.txt prompt files (default: prompts/ of the project)
+            check_interval: Minimum seconds between mtime checks of one file
+        """
+        self.prompts_dir = Path(prompts_dir) if prompts_dir else PROMPTS_DIR
+        self.check_interval = check_interval
+        self.version = 0  # Incremented on every reload, so dependents can refresh derived keys
+        self.reloads = 0
+        self._entries: Dict[str, PromptEntry] = {}
+        self._lock = threading.Lock()
+        self.load_all()
+
+    def load_all(self):
+        """Read every prompt file (done once at startup)"""
+        with self._lock:
+            for path in sorted(self.prompts_dir.glob("*.txt")):
+                self._entries[path.stem] = PromptEntry(path.stem, path)
+
+    def get(self, name: str) -> PromptEntry:
+        """Entry of prompts/<name>.txt, reloaded first when the file changed"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._entries[name] = PromptEntry(name, self.prompts_dir / f"{name}.txt")
+                return entry
+
+            now = time.monotonic()
+            if now - entry.checked_at < self.check_interval:
+                return entry
+            entry.checked_at = now
+            try:
+                mtime_ns = os.stat(entry.path).st_mtime_ns
+            except OSError:
+                # A file being replaced by an editor; keep serving the loaded version
+                return entry
+            if mtime_ns != entry.mtime_ns:
+                reloaded = PromptEntry(name, entry.path)
+                if reloaded.content_hash != entry.content_hash:
+                    print(f"Reloaded prompt {entry.path.name} ({entry.content_hash[:8]} -> {reloaded.content_hash[:8]})")
+                    self.version += 1
+                    self.reloads += 1
+                entry = self._entries[name] = reloaded
+            return entry
+
+    def text(self, name: str) -> str:
+        return self.get(name).text
+
+    def template(self, name: str) -> PromptTemplate:
+        return self.get(name).template
+
+    def content_hash(self, name: str) -> str:
+        return self.get(name).content_hash
+
+    def hashes(self, names=None, length: Optional[int] = None) -> Dict[str, str]:
+        """Content hash per prompt (all loaded prompts by default), optionally shortened for provenance columns"""
+        return {name: self.content_hash(name)[:length] for name in (names or list(self._entries))}
+
+
+_default_registry: Optional[PromptRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Process-wide registry of the project's prompts/ directory"""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = PromptRegistry()
+        return _default_registry
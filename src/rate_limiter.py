@@ -0,0 +1,265 @@
+"""
+Provider-aware token-bucket rate limiting for all LLM calls
+
+Each (provider, model) pair gets one limiter with a requests-per-minute and a
+tokens-per-minute bucket, shared by every stage and ReAct agent that uses that
+model. The limiter plugs into LangChain's `rate_limiter` hook, so it is consulted
+after the response cache and before every API request. A callback reconciles the
+token bucket with the usage reported by each response.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.rate_limiters import BaseRateLimiter
+
+
+class TokenBucket:
+    """Bucket refilled continuously at per_minute / 60 units per second (caller holds the lock)"""
+
+    def __init__(self, per_minute: float, burst_seconds: float = 10.0, clock: Callable[[], float] = time.monotonic):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        # Allow a burst of burst_seconds worth of budget instead of the whole minute at once
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount can be taken (0 when available now)"""
+        self._refill()
+        # Requests larger than the burst only need a full bucket
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        """Take amount; the balance may go negative when actual usage exceeds the reservation"""
+        self._refill()
+        self.tokens -= amount
+
+    def credit(self, amount: float):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class ModelRateLimiter(BaseRateLimiter):
+    """
+    RPM/TPM limiter for one provider and model
+
+    Every request reserves one request and an estimate of its tokens (a moving
+    average of the observed usage). Once the response arrives, the token bucket is
+    corrected with the actual usage.
+    """
+
+    def __init__(self, key: str, rpm: Optional[float] = None, tpm: Optional[float] = None,
+                 burst_seconds: float = 10.0, initial_token_estimate: float = 1000.0,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep,
+                 async_sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        """
+        Args:
+            key: "provider/model" this limiter is responsible for
+            rpm: Requests per minute (None for unlimited)
+            tpm: Tokens per minute (None for unlimited)
+            burst_seconds: Seconds of budget that may be spent in a burst
+            initial_token_estimate: Tokens reserved per request until usage has been observed
+            clock, sleep, async_sleep: Time source and waits (replaced by a simulated clock in tests)
+        """
+        self.key = key
+        self.requests_bucket = TokenBucket(rpm, burst_seconds, clock) if rpm else None
+        self.tokens_bucket = TokenBucket(tpm, burst_seconds, clock) if tpm else None
+        self.clock = clock
+        self.sleep = sleep
+        self.async_sleep = async_sleep
+        self.token_estimate = initial_token_estimate
+        self.requests = 0
+        self.throttled = 0
+        self.wait_time = 0.0
+        self.tokens_used = 0
+        self._lock = threading.Lock()
+
+    def _try_acquire(self) -> float:
+        """Reserve one request if both buckets allow it, otherwise return the time to wait"""
+        with self._lock:
+            wait = 0.0
+            if self.requests_bucket is not None:
+                wait = max(wait, self.requests_bucket.wait_time(1))
+            if self.tokens_bucket is not None:
+                wait = max(wait, self.tokens_bucket.wait_time(self.token_estimate))
+            if wait > 0:
+                return wait
+
+            if self.requests_bucket is not None:
+                self.requests_bucket.consume(1)
+            if self.tokens_bucket is not None:
+                self.tokens_bucket.consume(self.token_estimate)
+            self.requests += 1
+            return 0.0
+
+    def _record_wait(self, started: float):
+        waited = self.clock() - started
+        if waited > 0.001:
+            with self._lock:
+                self.throttled += 1
+                self.wait_time += waited
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        started = self.clock()
+        while True:
+            wait = self._try_acquire()
+            if wait == 0:
+                self._record_wait(started)
+                return True
+            if not blocking:
+                return False
+            # Re-check at least once per second so a refund from another call is picked up
+            self.sleep(min(wait, 1.0))
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        started = self.clock()
+        while True:
+            wait = self._try_acquire()
+            if wait == 0:
+                self._record_wait(started)
+                return True
+            if not blocking:
+                return False
+            await self.async_sleep(min(wait, 1.0))
+
+    def record_usage(self, total_tokens: int):
+        """Replace the token reservation of a finished request with its actual usage"""
+        with self._lock:
+            self.tokens_used += total_tokens
+            if self.tokens_bucket is not None:
+                self.tokens_bucket.consume(total_tokens - self.token_estimate)
+            self.token_estimate = 0.8 * self.token_estimate + 0.2 * total_tokens
+
+    def refund(self):
+        """Give back the token reservation of a failed request"""
+        with self._lock:
+            if self.tokens_bucket is not None:
+                self.tokens_bucket.credit(self.token_estimate)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rpm": self.requests_bucket.per_minute if self.requests_bucket else None,
+            "tpm": self.tokens_bucket.per_minute if self.tokens_bucket else None,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "wait_time": round(self.wait_time, 3),
+            "tokens_used": self.tokens_used,
+        }
+
+
+class RateLimitUsageCallback(BaseCallbackHandler):
+    """Feeds the token usage of every response back into its model's limiter"""
+
+    def __init__(self, limiter: ModelRateLimiter):
+        self.limiter = limiter
+
+    @staticmethod
+    def total_tokens(response: LLMResult) -> Optional[int]:
+        """Token usage of a response, None for cache hits and providers that report none"""
+        total = 0
+        found = False
+        for generations in response.generations:
+            for generation in generations:
+                if (generation.generation_info or {}).get("cache_hit"):
+                    return None
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage and usage.get("total_tokens") is not None:
+                    total += usage["total_tokens"]
+                    found = True
+        if not found:
+            token_usage = (response.llm_output or {}).get("token_usage") or {}
+            if token_usage.get("total_tokens") is not None:
+                return token_usage["total_tokens"]
+            return None
+        return total
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        total_tokens = self.total_tokens(response)
+        if total_tokens is not None:
+            self.limiter.record_usage(total_tokens)
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        self.limiter.refund()
+
+
+class RateLimiterRegistry:
+    """
+    Shared limiters keyed by provider and model
+
+    Usage:
+        rate_limiter = RateLimiterRegistry({"openai": {"rpm": 500, "tpm": 200000},
+                                            "anthropic/claude-3-5-haiku-20241022": {"rpm": 50}})
+        model_config = ModelConfig(rate_limiter=rate_limiter)
+        ...
+        print(rate_limiter.format_stats())
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, float]]] = None, burst_seconds: float = 10.0):
+        """
+        Args:
+            limits: {"provider" or "provider/model": {"rpm": ..., "tpm": ...}} overriding the provider defaults
+            burst_seconds: Seconds of budget that may be spent in a burst
+        """
+        self.limits = limits or {}
+        self.burst_seconds = burst_seconds
+        self.limiters: Dict[str, ModelRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def resolve_limits(self, provider: str, model_name: str, default_limits: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """Model-specific limits, then provider limits, then the provider defaults"""
+        limits = dict(default_limits or {})
+        limits.update(self.limits.get(provider, {}))
+        limits.update(self.limits.get(f"{provider}/{model_name}", {}))
+        return limits
+
+    def for_model(self, provider: str, model_name: str, default_limits: Optional[Dict[str, float]] = None) -> ModelRateLimiter:
+        """Limiter shared by all stages that call the same provider and model"""
+        key = f"{provider}/{model_name}"
+        with self._lock:
+            if key not in self.limiters:
+                limits = self.resolve_limits(provider, model_name, default_limits)
+                self.limiters[key] = ModelRateLimiter(
+                    key, rpm=limits.get("rpm"), tpm=limits.get("tpm"), burst_seconds=self.burst_seconds
+                )
+            return self.limiters[key]
+
+    @staticmethod
+    def parse_limits(value: str) -> Dict[str, Dict[str, float]]:
+        """Parse "openai=500/200000,anthropic/claude-3-5-haiku-20241022=50/50000" (rpm/tpm, either may be empty)"""
+        limits = {}
+        for item in filter(None, (item.strip() for item in (value or "").split(","))):
+            key, _, budget = item.partition("=")
+            rpm, _, tpm = budget.partition("/")
+            limits[key.strip()] = {
+                name: float(amount) for name, amount in (("rpm", rpm), ("tpm", tpm)) if amount.strip()
+            }
+        return limits
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {key: limiter.to_dict() for key, limiter in self.limiters.items()}
+
+    def format_stats(self) -> str:
+        lines = ["Rate limiter stats:"]
+        for key, limiter in self.limiters.items():
+            stats = limiter.to_dict()
+            lines.append(
+                f"  - {key}: rpm={stats['rpm'] or 'unlimited'}, tpm={stats['tpm'] or 'unlimited'}, "
+                f"requests={stats['requests']}, throttled={stats['throttled']} ({stats['wait_time']:.1f}s waiting), "
+                f"tokens={stats['tokens_used']}"
+            )
+        return "\n".join(lines)
@@ -7,6 +7,7 @@ import sys
 import os
 import argparse
 import asyncio
+import copy
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -22,6 +23,11 @@ sys.path.insert(0, project_root)
 # Import from the examples module
 from src.excel_processing.examples import process_knowledge_base
 from src.config import ModelConfig
+from src.llm_cache import LLMResponseCache, DEFAULT_CACHE_PATH
+from src.verdict_store import VerdictStore, DEFAULT_VERDICT_STORE_PATH
+from src.rate_limiter import RateLimiterRegistry
+from src.excel_processing.checkpoint import CheckpointStore
+from src.excel_processing.processor import CoVeEvaluator
 
 def main():
     """Main entry point for running examples"""
@@ -38,15 +44,73 @@ def main():
     parser.add_argument('--output-dir', type=str, default='results',
                         help='Output directory (default: results)')
     parser.add_argument('--continue-from', type=str, default=None,
-                        help='Path to existing results file to continue from')
+                        help='Path to the checkpoint (.jsonl) or results file (.xlsx) of a previous run to continue from')
+    parser.add_argument('--export-report', type=str, default=None, metavar='CHECKPOINT',
+                        help='Write the Excel report of a checkpoint (.jsonl) and exit, e.g. to inspect a run in progress')
+    parser.add_argument('--narrate-deferred', type=str, default=None, metavar='CHECKPOINT',
+                        help='Generate the LLM narratives of a run made with --aggregation-narrative deferred, update its checkpoint (.jsonl) and report, and exit')
     parser.add_argument('--concurrent-tasks', type=int, default=5,
-                        help='Maximum number of concurrent tasks to run (default: 5)')
+                        help='Initial number of concurrent records; adapted at runtime by AIMD (default: 5)')
+    parser.add_argument('--min-concurrent-tasks', type=int, default=1,
+                        help='Lower bound of the adaptive record concurrency (default: 1)')
+    parser.add_argument('--max-concurrent-tasks', type=int, default=None,
+                        help='Upper bound of the adaptive record concurrency (default: 4 x --concurrent-tasks; equal bounds give a fixed limit)')
+    parser.add_argument('--evidence-concurrency', type=int, default=1,
+                        help='Maximum number of evidences per record verified in parallel (default: 1)')
+    parser.add_argument('--early-exit', action='store_true',
+                        help='Skip the remaining evidences of a record once one is VERIFIED with HIGH confidence')
+    parser.add_argument('--no-evidence-dedup', action='store_true',
+                        help='Verify every evidence item separately instead of once per unique (normalised) evidence')
+    parser.add_argument('--near-duplicate-threshold', type=float, default=None,
+                        help='Share verification questions and ReAct analysis between evidences with at least this MinHash (Jaccard) similarity, e.g. 0.9 (default: disabled)')
+    parser.add_argument('--pipelined', action='store_true',
+                        help='Run records through the stage-pipelined scheduler (one worker pool per CoVe stage)')
+    parser.add_argument('--stage-workers', type=str, default=None,
+                        help='Workers per stage for --pipelined, e.g. "react=8,final_assessment=4" (default: built-in defaults)')
+    parser.add_argument('--repl-workers', type=int, default=None,
+                        help='Run the ReAct analysis code in N pre-loaded worker processes (0 = one per CPU core; default: in-process)')
     
     # Model configuration arguments
     parser.add_argument('--max-questions', type=int, default=3, 
                         help='Maximum number of verification questions to generate (default: 3)')
+    parser.add_argument('--llm-cache', nargs='?', const=DEFAULT_CACHE_PATH, default=None,
+                        help=f'Enable the persistent LLM response cache (default path when given without value: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--llm-cache-size-mb', type=float, default=512,
+                        help='Maximum size of the LLM response cache before LRU eviction (default: 512)')
+    parser.add_argument('--no-cache-stages', type=parse_stages, default='',
+                        help='Comma-separated stages that bypass the LLM cache, e.g. "react,aggregation"')
+    parser.add_argument('--verdict-store', nargs='?', const=DEFAULT_VERDICT_STORE_PATH, default=None,
+                        help=f'Reuse per-evidence verdicts of earlier runs on the same dataset and stage configuration (default path when given without value: {DEFAULT_VERDICT_STORE_PATH})')
+    parser.add_argument('--verdict-ttl-days', type=float, default=30,
+                        help='Ignore and purge stored verdicts older than this many days (default: 30, 0 keeps them forever)')
+    parser.add_argument('--invalidate-verdicts', action='store_true',
+                        help='Drop the stored verdicts of the current dataset and configuration before evaluating')
+    parser.add_argument('--fallbacks', type=parse_fallbacks, default=None,
+                        help='Ordered fallback models per stage, e.g. "react=openai/gpt-4.1-mini,google/gemini-2.0-flash;final_assessment=anthropic/claude-3-5-haiku-20241022"')
+    parser.add_argument('--hedge', type=parse_stages, default='',
+                        help='Comma-separated stages whose slow calls get a duplicate (hedged) request, e.g. "final_assessment,aggregation"')
+    parser.add_argument('--hedge-percentile', type=float, default=95,
+                        help='Hedge a call once it runs longer than this percentile of the stage\'s recent latency (default: 95)')
+    parser.add_argument('--hedge-max-rate', type=float, default=0.1,
+                        help='Maximum fraction of a stage\'s calls that may be hedged (default: 0.1)')
+    parser.add_argument('--rate-limit', action='store_true',
+                        help='Throttle every LLM request with per provider/model RPM and TPM budgets (defaults from ModelConfig.MODEL_PROVIDERS)')
+    parser.add_argument('--rate-limits', type=str, default=None,
+                        help='Override budgets (implies --rate-limit), e.g. "openai=500/200000,anthropic/claude-3-5-haiku-20241022=50/50000" (RPM/TPM)')
+    parser.add_argument('--aggregation-mode', type=str, default='llm', choices=['llm', 'rule'],
+                        help='Aggregate evidence verdicts with the aggregation model or locally by rule (default: llm)')
+    parser.add_argument('--aggregation-narrative', type=str, default='none', choices=['none', 'inline', 'deferred'],
+                        help='LLM narrative summary in rule aggregation mode (default: none)')
     
     args = parser.parse_args()
+    if args.hedge and not 0 < args.hedge_percentile < 100:
+        parser.error(f"--hedge-percentile must be between 0 and 100, got {args.hedge_percentile:g}")
+    
+    # 只輸出報表，不執行評估
+    if args.export_report:
+        report_file = CheckpointStore(args.export_report).export()
+        print(f"Report written to {report_file}")
+        return
     
     # 檢查環境變數是否存在，若不存在則提示使用者
     if not os.getenv("OPENAI_API_KEY"):
@@ -64,14 +128,32 @@ def main():
     # Convert limit to integer or None for all records
     limit = None if args.limit.lower() == 'all' else int(args.limit)
     
+    # Parse per-stage worker counts for the pipelined scheduler
+    stage_workers = None
+    if args.pipelined or args.stage_workers:
+        stage_workers = parse_stage_workers(args.stage_workers)
+    
     # 使用預設配置
-    # Create default model settings with custom max_questions
-    default_settings = ModelConfig.DEFAULTS.copy()
-    default_settings["verification_question"]["max_questions"] = args.max_questions
+    default_settings = build_model_settings(args)
+    
+    llm_cache = LLMResponseCache(args.llm_cache, max_size_mb=args.llm_cache_size_mb) if args.llm_cache else None
+    verdict_store = VerdictStore(args.verdict_store, ttl_days=args.verdict_ttl_days or None) if args.verdict_store else None
     
-    model_config = ModelConfig(model_settings=default_settings)
+    rate_limiter = None
+    if args.rate_limit or args.rate_limits:
+        rate_limiter = RateLimiterRegistry(RateLimiterRegistry.parse_limits(args.rate_limits))
+    
+    model_config = ModelConfig(model_settings=default_settings, llm_cache=llm_cache, rate_limiter=rate_limiter)
     print("Using model configuration from config.py")
     
+    # 只為 deferred 記錄補產生 narrative，不執行評估
+    if args.narrate_deferred:
+        evaluator = CoVeEvaluator(data_path=args.input_file, model_config=model_config, output_dir=args.output_dir,
+                                  concurrent_tasks=args.concurrent_tasks)
+        asyncio.run(evaluator.narrate_deferred(args.narrate_deferred))
+        print(f"Report written to {CheckpointStore(args.narrate_deferred).export()}")
+        return
+    
     print(f"\nRunning Excel processing example with {args.input_file}")
     print("This will:")
     print("1. Extract collection results from the knowledge base")
@@ -79,9 +161,20 @@ def main():
     print(f"3. Run CoVe verification on {limit if limit is not None else 'ALL'} records")
     print(f"4. Using centralized model configuration from config.py")
     print(f"5. Maximum verification questions: {args.max_questions}")
-    print(f"6. Maximum concurrent tasks: {args.concurrent_tasks}")
+    print(f"6. Concurrent tasks: start {args.concurrent_tasks}, adaptive between {args.min_concurrent_tasks} and {args.max_concurrent_tasks or args.concurrent_tasks * 4}")
+    print(f"7. Maximum concurrent evidences per record: {args.evidence_concurrency}")
+    if args.early_exit:
+        print("   Decisive early exit enabled (VERIFIED with HIGH confidence skips remaining evidences)")
+    if args.no_evidence_dedup:
+        print("   Evidence deduplication disabled (repeated evidences are verified again)")
+    if args.near_duplicate_threshold:
+        print(f"   Near-duplicate evidences (similarity >= {args.near_duplicate_threshold}) share questions and ReAct analysis")
+    if stage_workers is not None:
+        print(f"8. Stage-pipelined execution (workers: {stage_workers or 'defaults'})")
+    if args.repl_workers is not None:
+        print(f"   Analysis code runs in {args.repl_workers or 'one per CPU core'} REPL worker processes")
     if args.continue_from:
-        print(f"7. Continuing from previous run: {args.continue_from}")
+        print(f"9. Continuing from previous run: {args.continue_from}")
     print()
     print(f"Results will be saved in the '{args.output_dir}' directory")
     
@@ -97,7 +190,17 @@ def main():
             limit=limit,
             model_config=model_config,
             continue_from=args.continue_from,
-            concurrent_tasks=args.concurrent_tasks
+            concurrent_tasks=args.concurrent_tasks,
+            min_concurrent_tasks=args.min_concurrent_tasks,
+            max_concurrent_tasks=args.max_concurrent_tasks,
+            max_concurrent_evidences=args.evidence_concurrency,
+            stage_workers=stage_workers,
+            early_exit=args.early_exit,
+            repl_workers=args.repl_workers,
+            dedup_evidence=not args.no_evidence_dedup,
+            near_duplicate_threshold=args.near_duplicate_threshold,
+            verdict_store=verdict_store,
+            invalidate_verdicts=args.invalidate_verdicts
         ))
     except KeyboardInterrupt:
         print("\nProcess interrupted by user. You can continue from the latest results file.")
@@ -113,13 +216,77 @@ def main():
         if latest_file:
             print(f"To continue, use: --continue-from {latest_file}")
             
+def build_model_settings(args):
+    """Model settings of this run: a copy of ModelConfig.DEFAULTS with the command-line overrides applied"""
+    # Deep copy, so the per-stage dictionaries of the class-level defaults are never modified
+    settings = copy.deepcopy(ModelConfig.DEFAULTS)
+    settings["verification_question"]["max_questions"] = args.max_questions
+    settings["aggregation"]["mode"] = args.aggregation_mode
+    settings["aggregation"]["narrative"] = args.aggregation_narrative
+    for stage in args.no_cache_stages:
+        settings[stage]["cache"] = False
+    for stage, fallbacks in (args.fallbacks or {}).items():
+        settings[stage]["fallbacks"] = fallbacks
+    for stage in args.hedge:
+        settings[stage]["hedge"] = {"percentile": args.hedge_percentile, "max_rate": args.hedge_max_rate}
+    return settings
+
+def parse_stages(value):
+    """Parse a comma-separated list of stage names (argparse type; unknown stages are a usage error)"""
+    stages = [stage.strip() for stage in (value or '').split(',') if stage.strip()]
+    check_stages(stages)
+    return stages
+
+def check_stages(stages):
+    """Raise an argparse error naming the known stages if a stage is not one of ModelConfig.DEFAULTS"""
+    unknown = [stage for stage in stages if stage not in ModelConfig.DEFAULTS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown stage {', '.join(map(repr, unknown))} (stages: {', '.join(ModelConfig.DEFAULTS)})")
+
+def parse_stage_workers(value):
+    """Parse a "stage=workers,stage=workers" string into a dictionary"""
+    stage_workers = {}
+    if not value:
+        return stage_workers
+        
+    for item in value.split(','):
+        stage, _, workers = item.partition('=')
+        stage_workers[stage.strip()] = int(workers)
+        
+    return stage_workers
+
+def parse_fallbacks(value):
+    """Parse "stage=provider/model,provider/model;stage=..." into fallback settings per stage (argparse type)"""
+    fallbacks = {}
+    if not value:
+        return fallbacks
+        
+    for item in value.split(';'):
+        if not item.strip():
+            continue
+        stage, _, candidates = item.partition('=')
+        stage = stage.strip()
+        check_stages([stage])
+        fallbacks[stage] = []
+        for candidate in filter(None, (candidate.strip() for candidate in candidates.split(','))):
+            provider, _, model_name = candidate.partition('/')
+            if provider not in ModelConfig.MODEL_PROVIDERS or not model_name:
+                raise argparse.ArgumentTypeError(
+                    f"invalid fallback {candidate!r}, expected provider/model with provider one of "
+                    f"{', '.join(ModelConfig.MODEL_PROVIDERS)}")
+            fallbacks[stage].append({"model_provider": provider, "model_name": model_name})
+    return fallbacks
+
 def find_latest_results_file(output_dir):
     """Find the latest results file in the output directory"""
     import glob
     import os
     
-    # Find all cove_results files
-    result_files = glob.glob(os.path.join(output_dir, "cove_results_*.xlsx"))
+    # Find all cove_results checkpoints (the .xlsx report is only written at the end of a run)
+    result_files = glob.glob(os.path.join(output_dir, "cove_results_*.jsonl"))
+    if not result_files:
+        result_files = glob.glob(os.path.join(output_dir, "cove_results_*.xlsx"))
     
     if not result_files:
         return None
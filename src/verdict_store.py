@@ -0,0 +1,174 @@
+"""
+Persistent cross-run store of per-evidence verification results
+
+Unlike the LLM response cache, which is keyed by rendered prompts, entries are
+keyed by what determines a verdict:
+- the normalised evidence hash
+- the content fingerprint of the analysed dataset
+- a hash of the stage configuration (models with their fallbacks, prompt files and
+  the ReAct agent's tools and prompt inputs)
+
+A knowledge base re-evaluated against the same dataset therefore reuses last
+week's questions, ReAct answers and credibility assessments, however its
+evidences are ordered or grouped into records. Entries expire after a TTL and
+can be invalidated explicitly.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from .evidence_memo import evidence_key
+
+
+DEFAULT_VERDICT_STORE_PATH = ".cove_cache/verdicts.sqlite"
+
+
+def stage_config_hash(model_settings: Dict[str, Dict[str, Any]], prompts: Dict[str, str],
+                      agent: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Hash of everything besides the evidence and dataset that shapes a per-evidence verdict
+
+    Args:
+        model_settings: Settings of the stages producing the verdict (provider, model, temperature, fallbacks, ...)
+        prompts: Prompt template texts keyed by file name
+        agent: ReAct agent configuration, e.g. the offered tool names and whether the dataset profile is injected
+    """
+    relevant = {
+        stage: {key: settings.get(key) for key in
+                ("model_provider", "model_name", "temperature", "reasoning_effort", "max_questions", "fallbacks")}
+        for stage, settings in model_settings.items()
+    }
+    prompt_hashes = {name: hashlib.sha256(text.encode("utf-8")).hexdigest() for name, text in prompts.items()}
+    payload = json.dumps({"models": relevant, "prompts": prompt_hashes, "agent": agent or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class VerdictStore:
+    """
+    SQLite store of evidence verification results with a TTL
+
+    Usage:
+        verdict_store = VerdictStore(".cove_cache/verdicts.sqlite", ttl_days=30)
+        cove_chain = OSINTCOVEChain(model_config, data_path, verdict_store=verdict_store)
+        ...
+        print(verdict_store.format_stats())
+    """
+
+    def __init__(self, path: str = DEFAULT_VERDICT_STORE_PATH, ttl_days: Optional[float] = 30):
+        """
+        Args:
+            path: SQLite database file
+            ttl_days: Entries older than this are ignored and purged (None keeps them forever)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400 if ttl_days else None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS verdicts (
+                evidence_hash TEXT NOT NULL,
+                dataset_fingerprint TEXT NOT NULL,
+                config_hash TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created REAL NOT NULL,
+                PRIMARY KEY (evidence_hash, dataset_fingerprint, config_hash)
+            )
+            """
+        )
+        self._conn.commit()
+        self.purge_expired()
+
+    def _expiry(self) -> float:
+        return time.time() - self.ttl_seconds if self.ttl_seconds else float("-inf")
+
+    def get(self, evidence: Any, dataset_fingerprint: str, config_hash: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM verdicts WHERE evidence_hash = ? AND dataset_fingerprint = ? AND config_hash = ? "
+                "AND created >= ?",
+                (evidence_key(evidence), dataset_fingerprint, config_hash, self._expiry()),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, evidence: Any, dataset_fingerprint: str, config_hash: str, value: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO verdicts (evidence_hash, dataset_fingerprint, config_hash, value, created) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (evidence_key(evidence), dataset_fingerprint, config_hash,
+                 json.dumps(value, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+            self.writes += 1
+
+    def invalidate(self, evidences: Optional[Iterable[Any]] = None, dataset_fingerprint: Optional[str] = None,
+                   config_hash: Optional[str] = None) -> int:
+        """
+        Delete the entries matching all given filters (no filters: everything)
+
+        Returns:
+            Number of deleted entries
+        """
+        conditions, parameters = [], []
+        if dataset_fingerprint is not None:
+            conditions.append("dataset_fingerprint = ?")
+            parameters.append(dataset_fingerprint)
+        if config_hash is not None:
+            conditions.append("config_hash = ?")
+            parameters.append(config_hash)
+
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            if evidences is None:
+                deleted = self._conn.execute(f"DELETE FROM verdicts{where}", parameters).rowcount
+            else:
+                where = f"{where} AND" if where else " WHERE"
+                deleted = sum(
+                    self._conn.execute(f"DELETE FROM verdicts{where} evidence_hash = ?",
+                                       parameters + [evidence_key(evidence)]).rowcount
+                    for evidence in evidences
+                )
+            self._conn.commit()
+        return deleted
+
+    def purge_expired(self) -> int:
+        if not self.ttl_seconds:
+            return 0
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM verdicts WHERE created < ?", (self._expiry(),)).rowcount
+            self._conn.commit()
+        return deleted
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"entries": self.size(), "hits": self.hits, "misses": self.misses, "writes": self.writes}
+
+    def format_stats(self) -> str:
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups if lookups else 0.0
+        return (
+            f"Verdict store ({self.path}): {self.size()} entries, hits={self.hits}, misses={self.misses}, "
+            f"writes={self.writes}, hit_rate={hit_rate:.0%}"
+        )
@@ -0,0 +1,166 @@
+"""
+Structured verdict parsing and rule-based aggregation
+
+Implements the mechanical rule described in prompts/aggregation.txt so the
+final result of a record can be computed locally from the per-evidence final
+assessments instead of with an extra LLM call.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+
+VERDICT_STATUSES = ("VERIFIED", "UNVERIFIED", "DEBUNKED")
+CONFIDENCE_LEVELS = ("LOW", "MEDIUM", "HIGH")
+
+_STATUS_PATTERN = re.compile(r'"status"\s*:\s*"(VERIFIED|UNVERIFIED|DEBUNKED)"', re.IGNORECASE)
+_CONFIDENCE_PATTERN = re.compile(r'"confidence"\s*:\s*"(HIGH|MEDIUM|LOW)"', re.IGNORECASE)
+
+
+def message_text(message: Any) -> str:
+    """Return the text of an AIMessage-like object or the string itself"""
+    if hasattr(message, "content"):
+        content = message.content
+        if isinstance(content, list):
+            # Anthropic style content blocks
+            return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+        return str(content)
+    return str(message)
+
+
+def _extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Find the first JSON object in text (plain or inside a ```json fence)"""
+    start = text.find("{")
+    while start != -1:
+        depth = 0
+        in_string = False
+        escaped = False
+        for position in range(start, len(text)):
+            char = text[position]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    try:
+                        parsed = json.loads(text[start:position + 1])
+                    except json.JSONDecodeError:
+                        break
+                    if isinstance(parsed, dict):
+                        return parsed
+                    break
+        start = text.find("{", start + 1)
+    return None
+
+
+def parse_assessment(assessment: Any) -> Dict[str, Any]:
+    """
+    Parse the structured verdict of a final assessment
+
+    Args:
+        assessment: Final assessment model output (AIMessage or string) in the
+            JSON format requested by prompts/final_assessment.txt
+
+    Returns:
+        Dictionary with status, confidence, reasoning and key_findings.
+        status is None when no verdict could be found.
+    """
+    text = message_text(assessment)
+    parsed = _extract_json_object(text) or {}
+
+    status = str(parsed.get("status", "")).upper() or None
+    confidence = str(parsed.get("confidence", "")).upper() or None
+
+    # Fall back to pattern matching when the JSON is malformed
+    if status not in VERDICT_STATUSES:
+        match = _STATUS_PATTERN.search(text)
+        status = match.group(1).upper() if match else None
+    if confidence not in CONFIDENCE_LEVELS:
+        match = _CONFIDENCE_PATTERN.search(text)
+        confidence = match.group(1).upper() if match else None
+
+    return {
+        "status": status,
+        "confidence": confidence,
+        "reasoning": parsed.get("reasoning", ""),
+        "key_findings": parsed.get("key_findings", []),
+    }
+
+
+def aggregate_verdicts(evidences: List[str], verdicts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply the aggregation rule to per-evidence verdicts
+
+    1. If ANY evidence is VERIFIED, the final result is VERIFIED
+    2. If NONE is VERIFIED but at least one is UNVERIFIED, the final result is UNVERIFIED
+    3. If ALL evidence is DEBUNKED, the final result is DEBUNKED
+
+    Evidences whose verdict could not be parsed count as UNVERIFIED. Evidences
+    skipped by the decisive early exit are reported as SKIPPED and ignored.
+
+    Returns:
+        Dictionary in the JSON format of prompts/aggregation.txt
+    """
+    statuses = [
+        "SKIPPED" if verdict.get("skipped") else verdict.get("status") or "UNVERIFIED"
+        for verdict in verdicts
+    ]
+    assessed = [status for status in statuses if status != "SKIPPED"]
+
+    if "VERIFIED" in assessed:
+        final_result = "VERIFIED"
+    elif assessed and all(status == "DEBUNKED" for status in assessed):
+        final_result = "DEBUNKED"
+    else:
+        final_result = "UNVERIFIED"
+
+    # Confidence of the evidences that decided the result
+    deciding = [verdict for verdict, status in zip(verdicts, statuses) if status == final_result]
+    levels = [CONFIDENCE_LEVELS.index(verdict["confidence"]) for verdict in deciding if verdict.get("confidence") in CONFIDENCE_LEVELS]
+    if not levels:
+        confidence = "LOW"
+    elif final_result == "DEBUNKED":
+        confidence = CONFIDENCE_LEVELS[min(levels)]
+    else:
+        confidence = CONFIDENCE_LEVELS[max(levels)]
+
+    counts = {status: assessed.count(status) for status in VERDICT_STATUSES}
+    explanation = (
+        f"Rule-based aggregation of {len(assessed)} evidence assessments "
+        f"({counts['VERIFIED']} VERIFIED, {counts['UNVERIFIED']} UNVERIFIED, {counts['DEBUNKED']} DEBUNKED)"
+    )
+    skipped = len(statuses) - len(assessed)
+    if skipped:
+        explanation += f"; {skipped} evidence(s) skipped by decisive early exit"
+    unparsed = sum(1 for verdict in verdicts if not verdict.get("status") and not verdict.get("skipped"))
+    if unparsed:
+        explanation += f"; {unparsed} assessment(s) without a parseable verdict counted as UNVERIFIED"
+
+    return {
+        "final_result": final_result,
+        "confidence": confidence,
+        "explanation": explanation,
+        "evidence_summary": [
+            {
+                "evidence_id": str(i),
+                "original_text": evidence,
+                "status": status,
+                "key_points": verdict.get("reasoning", ""),
+            }
+            for i, (evidence, verdict, status) in enumerate(zip(evidences, verdicts, statuses), 1)
+        ],
+        "patterns": {
+            "consistencies": [],
+            "conflicts": [],
+        },
+    }